@@ -11,7 +11,7 @@ import {
     ActivityIndicator,
 } from "react-native";
 import { Menu, Button, Provider } from "react-native-paper";
-import { getDateList, getPhotoByDate, getAcneInfo } from "../../utils/api/fastapi";
+import { getDashboard } from "../../utils/api/fastapi";
 import { BarChart } from "react-native-chart-kit";
 
 export default function SkinCompareScreen({ route, onCompare }) {
@@ -19,6 +19,7 @@ export default function SkinCompareScreen({ route, onCompare }) {
     const [dates, setDates] = useState([]);
     const [selectedPreviousDate, setselectedPreviousDate] = useState(null);
     const [previousImageUri, setPreviousImageUri] = useState(null);
+    const [previousFullImageUri, setPreviousFullImageUri] = useState(null);
     const [menuVisible, setMenuVisible] = useState(false);
     const [modalVisible, setModalVisible] = useState(false);
     const [modalUrl, setModalUrl] = useState(null);
@@ -31,7 +32,7 @@ export default function SkinCompareScreen({ route, onCompare }) {
     useEffect(() => {
         async function fetchDates() {
             try {
-                const res = await getDateList();
+                const res = await getDashboard();
                 if (res.data && Array.isArray(res.data.dates)) {
                     const filteredDates = res.data.dates.filter(
                         (date) => date !== selectedDate
@@ -61,23 +62,20 @@ export default function SkinCompareScreen({ route, onCompare }) {
         setPhotoLoading(true);
 
         try {
-            const response = await getAcneInfo(date);
-            const data = response.data;
-            setPrevAcneCount(data.acne_count);
-            setPrevAcneArea(data.acne_area);
-            setPrevRednessArea(data.redness_area);
+            // 수치와 이미지 URL을 한 번에 조회 - 카드에는 썸네일, 전체 화면 모달에는 원본
+            const { data } = await getDashboard(date);
+            const day = data.data.find((item) => item.acne_date === date);
+            if (day) {
+                setPrevAcneCount(day.acne_count);
+                setPrevAcneArea(day.acne_area);
+                setPrevRednessArea(day.redness_area);
+            }
+            setPreviousImageUri(data.selected?.analysis_photo_acne_thumb_url || null);
+            setPreviousFullImageUri(data.selected?.analysis_photo_acne_url || null);
         } catch (error) {
-            console.error("데이터 불러오기 실패 (여드름):", error);
+            console.error("데이터 불러오기 실패:", error);
         } finally {
             setAcneLoading(false);
-        }
-
-        try {
-            const imageRes = await getPhotoByDate(date);
-            setPreviousImageUri(imageRes.data.analysis_photo_acne_url || null);
-        } catch (error) {
-            console.error("데이터 불러오기 실패 (이미지):", error);
-        } finally {
             setPhotoLoading(false);
         }
 
@@ -133,7 +131,7 @@ export default function SkinCompareScreen({ route, onCompare }) {
                             <TouchableOpacity
                                 onPress={() => {
                                     setModalVisible(true);
-                                    setModalUrl(previousImageUri);
+                                    setModalUrl(previousFullImageUri);
                                 }}
                             >
                                 {photoLoading ? (
@@ -70,11 +70,13 @@ export const getSkinType = async () => {
 };
 
 // 특정 날짜의 사진 가져오기
-export const getPhotoByDate = async (date) => {
+// variant: "full" | "thumb" (썸네일은 비교 화면 등 작은 미리보기용)
+export const getPhotoByDate = async (date, variant = "full") => {
   const userKey = await AsyncStorage.getItem("user_key");
   const formData = new FormData();
   formData.append("date", date);
   formData.append("user_key", userKey);
+  formData.append("variant", variant);
 
   return axios.post(`${BASE_URL}/get.data/`, formData, {
     headers: { "Content-Type": "multipart/form-data" },
@@ -82,6 +84,30 @@ export const getPhotoByDate = async (date) => {
   });
 };
 
+// 날짜 목록 + 날짜별 수치 + 선택 날짜 이미지 + 피부 타입을 한 번에 조회
+// 마지막 응답의 ETag를 기억했다가 바뀌지 않았으면(304) 저장된 응답을 그대로 사용
+const dashboardCache = {};
+export const getDashboard = async (date = null) => {
+  const userKey = await AsyncStorage.getItem("user_key");
+  const cacheKey = `${userKey}:${date || ""}`;
+  const cached = dashboardCache[cacheKey];
+
+  const res = await axios.get(`${BASE_URL}/dashboard/`, {
+    params: date ? { user_key: userKey, date } : { user_key: userKey },
+    headers: cached ? { "If-None-Match": cached.etag } : {},
+    withCredentials: true,
+    validateStatus: (status) => status === 200 || status === 304,
+  });
+
+  if (res.status === 304 && cached) {
+    return { ...res, status: 200, data: cached.data };
+  }
+  if (res.headers.etag) {
+    dashboardCache[cacheKey] = { etag: res.headers.etag, data: res.data };
+  }
+  return res;
+};
+
 // 저장된 날짜 리스트 불러오기
 export const getDateList = async () => {
   const userKey = await AsyncStorage.getItem("user_key");
@@ -106,16 +132,35 @@ export const getAcneInfo = async (date) => {
   });
 };
 
-export const getAcneDates = async () => {
+// { from_date, to_date, limit, cursor } 로 기간/페이지 지정 (응답의 next_cursor를 다음 cursor로)
+export const getAcneDates = async (range = {}) => {
   const userKey = await AsyncStorage.getItem("user_key");
   const formData = new FormData();
   formData.append("user_key", userKey);
+  Object.entries(range).forEach(([key, value]) => {
+    if (value !== undefined && value !== null) formData.append(key, String(value));
+  });
   return axios.post(`${BASE_URL}/get.dates_acne/`, formData, {
     headers: { "Content-Type": "multipart/form-data" },
     withCredentials: true,
   });
 };
 
+// 주/월 단위 추이 (period: "week" | "month", range: { from_date, to_date })
+export const getTrends = async (period = "week", range = {}) => {
+  const userKey = await AsyncStorage.getItem("user_key");
+  const formData = new FormData();
+  formData.append("user_key", userKey);
+  formData.append("period", period);
+  Object.entries(range).forEach(([key, value]) => {
+    if (value !== undefined && value !== null) formData.append(key, String(value));
+  });
+  return axios.post(`${BASE_URL}/trends/`, formData, {
+    headers: { "Content-Type": "multipart/form-data" },
+    withCredentials: true,
+  });
+};
+
 //////////////////////////////////////////////////////////////////////////////////////////////////////////////////////
 // 로그인
 export async function login(userId, password) {
@@ -1,45 +1,98 @@
-from ultralytics import YOLO
-import torch
+import os
 import cv2
+import numpy as np
 
+# 여드름 면적 계산 방식: box_sum(박스 넓이 합, 빠름) | union(박스 합집합 픽셀 수, 겹침 제외)
+ACNE_AREA_MODE = os.getenv("ACNE_AREA_MODE", "box_sum")
 
-class Analysis_acne_image:
-    def __init__(self):
-        self.model = YOLO("/home/skinview/allDAO/analysis_image/analysis_best.pt")
 
-    def draw_boxes(slef, image, results, box_color=(0, 255, 0), thickness=5):
-        for box in results[0].boxes:
-            x1, y1, x2, y2 = map(int, box.xyxy[0])
-            cv2.rectangle(image, (x1, y1), (x2, y2), box_color, thickness)
+def box_area_sum(xyxy_tensor):
+    """
+    박스 넓이 합을 텐서 연산 한 번으로 (겹치는 영역은 중복 합산)
+    """
+    if len(xyxy_tensor) == 0:
+        return 0.0
+    widths = xyxy_tensor[:, 2] - xyxy_tensor[:, 0]
+    heights = xyxy_tensor[:, 3] - xyxy_tensor[:, 1]
+    return float((widths * heights).sum())
+
+
+def box_union_area(xyxy, shape):
+    """
+    모든 박스를 crop 해상도의 마스크 하나로 래스터화한 합집합 픽셀 수
+    (2차원 차분 배열 + 누적합으로 박스 수와 무관하게 벡터 연산)
+    """
+    if len(xyxy) == 0:
+        return 0
+    h, w = shape[:2]
+    boxes = np.rint(xyxy).astype(np.int64)
+    x1, x2 = np.clip(boxes[:, 0], 0, w), np.clip(boxes[:, 2], 0, w)
+    y1, y2 = np.clip(boxes[:, 1], 0, h), np.clip(boxes[:, 3], 0, h)
+
+    diff = np.zeros((h + 1, w + 1), dtype=np.int32)
+    np.add.at(diff, (y1, x1), 1)
+    np.add.at(diff, (y1, x2), -1)
+    np.add.at(diff, (y2, x1), -1)
+    np.add.at(diff, (y2, x2), 1)
+    coverage = diff.cumsum(axis=0).cumsum(axis=1)[:h, :w]
+    return int(np.count_nonzero(coverage))
+
+
+def draw_boxes(image, xyxy, box_color=(0, 255, 0), thickness=5):
+    """
+    모든 박스를 polylines 한 번으로 그림 (cv2.rectangle을 박스마다 호출한 것과 같은 결과)
+    """
+    if len(xyxy) == 0:
         return image
+    boxes = xyxy.astype(np.int32)
+    corners = np.stack(
+        [boxes[:, [0, 1]], boxes[:, [2, 1]], boxes[:, [2, 3]], boxes[:, [0, 3]]], axis=1
+    )
+    cv2.polylines(image, corners, True, box_color, thickness)
+    return image
+
 
-    async def analysis_acne_image(self, origin_img, processed_img, area):
-        print(f"[DEBUG] 처리된 photo dtype: {processed_img.dtype}")
+class Analysis_acne_image:
+    def __init__(self, registry):
+        self.model = registry.get("acne")
+        self.device = registry.get_device("acne")
+
+    def analysis_acne_image(self, origin_img, processed_img, area):
+        return self.analysis_acne_images([origin_img], [processed_img], [area])[0]
+
+    def analysis_acne_images(self, origin_imgs, processed_imgs, areas):
+        print(f"[DEBUG] 처리된 photo 배치 크기: {len(processed_imgs)}")
 
         results = self.model.predict(
-            source=processed_img,
+            source=list(processed_imgs),
             imgsz = 640,
             conf=0.2,
             iou=0.6,
             save=False,
-            device="0" if torch.cuda.is_available() else "cpu",
+            device=self.device,
+            # 한 장일 때도 배치와 같은 640 정사각형 letterbox → 배치 구성과 무관한 결과
+            rect=False,
         )
 
-        if results:
-            boxes = results[0].boxes
+        if not results:
+            print("❌ 추론 결과가 없습니다.")
+            return [(None, 0, 0.0) for _ in processed_imgs]
+
+        outputs = []
+        for origin_img, result, area in zip(origin_imgs, results, areas):
+            boxes = result.boxes
             num_boxes = len(boxes)
 
-            total_acne_area = 0.0
-            for box in boxes.xyxy:
-                x1, y1, x2, y2 = box.tolist()
-                box_area = (x2 - x1) * (y2 - y1)
-                total_acne_area += box_area
+            xyxy = boxes.xyxy.cpu().numpy()
+            if ACNE_AREA_MODE == "union":
+                total_acne_area = box_union_area(xyxy, origin_img.shape)
+            else:
+                total_acne_area = box_area_sum(boxes.xyxy)
 
             acne_area_ratio_in_face = (total_acne_area / float(area)) * 100 if area > 0 else 0.0
 
-            res_img = self.draw_boxes(origin_img, results, box_color=(0, 255, 0), thickness=5)
-            print(f"[DEBUG] Analysis..........Done!!")
-            return res_img, num_boxes, acne_area_ratio_in_face
-        else:
-            print("❌ 추론 결과가 없습니다.")
-            return None, 0, 0.0
+            res_img = draw_boxes(origin_img, xyxy, box_color=(0, 255, 0), thickness=5)
+            outputs.append((res_img, num_boxes, acne_area_ratio_in_face))
+
+        print("[DEBUG] Analysis..........Done!!")
+        return outputs
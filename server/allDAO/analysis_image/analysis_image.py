@@ -1,21 +1,13 @@
-from ultralytics import YOLO
-import os
-import torch
-import cv2
-import numpy as np
+from allDAO.analysis_image.analysis_acne_image import ACNE_AREA_MODE, box_area_sum, box_union_area, draw_boxes
 
 
 class Analysis_image:
-    def __init__(self):
-        self.model = YOLO("/home/skinview/allDAO/analysis_image/analysis_best.pt")
+    def __init__(self, registry):
+        # analysis_best.pt를 다시 로드하지 않고 레지스트리의 여드름 모델을 공유
+        self.model = registry.get("acne")
+        self.device = registry.get_device("acne")
 
-    def draw_boxes(slef, image, results, box_color=(0, 255, 0), thickness=5):
-        for box in results[0].boxes:
-            x1, y1, x2, y2 = map(int, box.xyxy[0])
-            cv2.rectangle(image, (x1, y1), (x2, y2), box_color, thickness)
-        return image
-
-    async def analysis_image(self, photo, processed_img, area):
+    def analysis_image(self, photo, processed_img, area):
         print(f"[DEBUG] 처리된 photo dtype: {processed_img.dtype}")
 
         results = self.model.predict(
@@ -25,23 +17,23 @@ class Analysis_image:
             iou=0.6,
             save=False,
             name="acne_yolos_seg_v3_inference",
-            device="0" if torch.cuda.is_available() else "cpu",
+            device=self.device,
         )
 
         if results:
             boxes = results[0].boxes
             num_boxes = len(boxes)
 
-            total_acne_area = 0.0
-            for box in boxes.xyxy:
-                x1, y1, x2, y2 = box.tolist()
-                box_area = (x2 - x1) * (y2 - y1)
-                total_acne_area += box_area
+            xyxy = boxes.xyxy.cpu().numpy()
+            if ACNE_AREA_MODE == "union":
+                total_acne_area = box_union_area(xyxy, photo.shape)
+            else:
+                total_acne_area = box_area_sum(boxes.xyxy)
 
             acne_area_ratio_in_face = (total_acne_area / float(area)) * 100 if area > 0 else 0.0
 
-            res_img = self.draw_boxes(photo, results, box_color=(0, 255, 0), thickness=5)
-            print(f"[DEBUG] Analysis..........Done!!")
+            res_img = draw_boxes(photo, xyxy, box_color=(0, 255, 0), thickness=5)
+            print("[DEBUG] Analysis..........Done!!")
             return res_img, num_boxes, acne_area_ratio_in_face
         else:
             print("❌ 추론 결과가 없습니다.")
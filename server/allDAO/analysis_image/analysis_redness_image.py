@@ -1,61 +1,60 @@
-import torch
 import cv2
-import numpy as np
-from ultralytics import YOLO
 
+REDNESS_COLOR_HEX = "#61dafb"
+REDNESS_COLOR = [int(REDNESS_COLOR_HEX[i:i+2], 16) for i in (1, 3, 5)]  # R,G,B 정수 리스트 (채널 순서대로 더해짐)
+REDNESS_OVERLAY = tuple(0.4 * c for c in REDNESS_COLOR) + (0.0,)
 
-class Analysis_redness_image:
-    def __init__(self):
-        self.model = YOLO("/home/skinview/allDAO/analysis_image/redness_best.pt")
 
-    async def analysis_redness_image(self, origin_img, area):
-        redness_image = origin_img.copy()  # 기본값 초기화
-        ratio = 0.0
-        print(f"[DEBUG] origin_img dtype: {origin_img.dtype}")
+class Analysis_redness_image:
+    def __init__(self, registry):
+        self.model = registry.get("redness")
+        self.device = registry.get_device("redness")
+
+    def analysis_redness_image(self, origin_img, area):
+        return self.analysis_redness_images([origin_img], [area])[0]
+
+    def analysis_redness_images(self, origin_imgs, areas):
+        print(f"[DEBUG] origin_img 배치 크기: {len(origin_imgs)}")
+        # 크기가 다른 crop은 한 배치에서 정사각형으로 letterbox 되므로
+        # rect=False: 한 장일 때도 같은 640 정사각형 입력 → 배치 구성과 무관한 결과
+        # retina_masks=True: 패딩을 잘라낸 마스크를 crop 해상도로 받음
         results = self.model.predict(
-            source=origin_img,
+            source=list(origin_imgs),
             imgsz=640,
             conf=0.5,
             iou=0.6,
             save=False,
-            device="0" if torch.cuda.is_available() else "cpu",
+            device=self.device,
+            rect=False,
+            retina_masks=True,
         ) 
 
-        if results:
-            for r in results:
-                print(r.names)
-                print(r.masks)
-                print(r.boxes.conf)
+        return [self._redness_result(origin_img, r, area) for origin_img, r, area in zip(origin_imgs, results, areas)]
 
-                masks = r.masks
-                if masks is None:
-                    continue
+    def _redness_result(self, origin_img, r, area):
+        print(r.names)
+        print(r.boxes.conf)
 
-                for mask_tensor in masks.data:
-                    mask = mask_tensor.cpu().numpy().astype(np.uint8)
+        masks = r.masks
+        if masks is None or len(masks.data) == 0:
+            return origin_img.copy(), 0.0  # 기본값
 
-                    mask_resized = cv2.resize(mask, (origin_img.shape[1], origin_img.shape[0]))
-                    mask_resized = (mask_resized > 0.5).astype(np.uint8)  # 이진 마스크 변환
+        # 모든 마스크를 디바이스에서 하나의 합집합 마스크로 줄인 뒤 한 번만 복사 (이미 crop 해상도, 0/1 이진 마스크)
+        mask_resized = masks.data.amax(dim=0).byte().cpu().numpy()
 
-                    # 면적 계산 (픽셀 단위)
-                    mask_pixels = np.sum(mask_resized)
-                    print(f"세그멘테이션 영역 픽셀 수: {mask_pixels}")
+        # 면적 계산 (픽셀 단위, 겹치는 영역은 한 번만)
+        mask_pixels = cv2.countNonZero(mask_resized)
+        print(f"세그멘테이션 영역 픽셀 수: {mask_pixels}")
 
-                    if area > 0:
-                        ratio = (mask_pixels / area) * 100
-                        print(f"얼굴 대비 홍조 비율 : {ratio:.2f}%")
-                    else:
-                        ratio = 0
-                        print("홍조 없음")
+        if area > 0:
+            ratio = (mask_pixels / area) * 100
+            print(f"얼굴 대비 홍조 비율 : {ratio:.2f}%")
+        else:
+            ratio = 0
+            print("홍조 없음")
 
-                    color_hex = "#61dafb"
-                    color = [int(color_hex[i:i+2], 16) for i in (1, 3, 5)]  # R,G,B 정수 리스트
+        # origin + 0.4 * color 를 마스크 영역에만 한 번에 더함 (addWeighted와 동일한 결과)
+        redness_image = origin_img.copy()
+        cv2.add(origin_img, REDNESS_OVERLAY, dst=redness_image, mask=mask_resized)
 
-                    colored_mask = np.zeros_like(origin_img, dtype=np.uint8)
-                    for c in range(3):
-                        colored_mask[:, :, c] = mask_resized * color[c]
-
-                    redness_image = cv2.addWeighted(origin_img, 1.0, colored_mask, 0.4, 0)
-      
         return redness_image, ratio
-
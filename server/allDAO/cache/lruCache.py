@@ -0,0 +1,35 @@
+import time
+from collections import OrderedDict
+
+
+class LRUCache:
+    """
+    프로세스 내 L1 캐시: 최대 개수 + TTL, 가장 오래 안 쓴 항목부터 제거
+    """
+    def __init__(self, max_size: int, ttl: float):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.items = OrderedDict()
+
+    def get(self, key):
+        item = self.items.get(key)
+        if item is None:
+            return None
+        value, expires_at = item
+        if expires_at < time.monotonic():
+            del self.items[key]
+            return None
+        self.items.move_to_end(key)
+        return value
+
+    def set(self, key, value):
+        self.items[key] = (value, time.monotonic() + self.ttl)
+        self.items.move_to_end(key)
+        while len(self.items) > self.max_size:
+            self.items.popitem(last=False)
+
+    def delete(self, key):
+        self.items.pop(key, None)
+
+    def __len__(self):
+        return len(self.items)
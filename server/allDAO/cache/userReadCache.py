@@ -0,0 +1,138 @@
+import os
+import json
+import time
+from allDAO.cache.lruCache import LRUCache
+
+# L1에 담아 둘 최대 사용자 수
+READ_CACHE_SIZE = int(os.getenv("READ_CACHE_SIZE", "10000"))
+# L1은 다른 워커의 무효화를 모르므로 짧게, Redis는 길게
+READ_CACHE_L1_TTL = int(os.getenv("READ_CACHE_L1_TTL", "5"))
+READ_CACHE_TTL = int(os.getenv("READ_CACHE_TTL", "600"))
+
+# 무효화 이후 시작된 조회만 저장 - 조회 전에 읽은 세대(gen)가 그대로일 때만 HSET
+SET_IF_CURRENT = """
+if (redis.call('GET', KEYS[2]) or '0') == ARGV[1] then
+    redis.call('HSET', KEYS[1], ARGV[2], ARGV[3])
+    redis.call('EXPIRE', KEYS[1], ARGV[4])
+    return 1
+end
+return 0
+"""
+
+
+class UserReadCache:
+    """
+    사용자별 조회 결과 캐시 (L1 + Redis 해시 read:{user_key})
+    필드: dates, history, skin_type, acne:{date} - 쓰기 쪽은 커밋 후 invalidate(user_key)
+    L1은 사용자별 {필드: (값, 만료 시각)} 한 항목 → 무효화는 항목 하나 삭제
+    """
+    def __init__(self, redis_conn=None):
+        self.redis = redis_conn
+        self.l1 = LRUCache(READ_CACHE_SIZE, READ_CACHE_L1_TTL)
+        self.set_if_current = redis_conn.register_script(SET_IF_CURRENT) if redis_conn is not None else None
+
+        # 지표
+        self.l1_hits = 0
+        self.redis_hits = 0
+        self.misses = 0
+        self.stale_skips = 0
+        self.invalidations = 0
+
+    def _keys(self, user_key: str):
+        return f"read:{user_key}", f"read:{user_key}:gen"
+
+    def _l1_get(self, user_key: str, field: str):
+        fields = self.l1.get(user_key)
+        item = fields.get(field) if fields is not None else None
+        if item is None:
+            return None
+        value, expires_at = item
+        if expires_at < time.monotonic():
+            del fields[field]
+            return None
+        return value
+
+    def _l1_set(self, user_key: str, field: str, value):
+        fields = self.l1.get(user_key)
+        if fields is None:
+            fields = {}
+        # 필드마다 만료 시각을 따로 두어 사용자 항목이 갱신돼도 오래된 필드가 살아남지 않음
+        fields[field] = (value, time.monotonic() + READ_CACHE_L1_TTL)
+        self.l1.set(user_key, fields)
+
+    async def get_or_load(self, user_key: str, field: str, loader):
+        """
+        캐시에 있으면 그대로, 없으면 loader() 결과를 저장 후 반환 (None은 저장하지 않음)
+        """
+        value = self._l1_get(user_key, field)
+        if value is not None:
+            self.l1_hits += 1
+            return value
+
+        data_key, gen_key = self._keys(user_key)
+        gen = "0"
+        if self.redis is not None:
+            try:
+                async with self.redis.pipeline(transaction=False) as pipe:
+                    pipe.hget(data_key, field)
+                    pipe.get(gen_key)
+                    raw, gen = await pipe.execute()
+                gen = gen or "0"
+                if raw is not None:
+                    self.redis_hits += 1
+                    value = json.loads(raw)
+                    self._l1_set(user_key, field, value)
+                    return value
+            except Exception as e:
+                print(f"[WARN] 조회 캐시 Redis 조회 실패: {e}")
+
+        self.misses += 1
+        value = await loader()
+        if value is not None:
+            await self._set(user_key, field, value, gen)
+        return value
+
+    async def _set(self, user_key: str, field: str, value, gen: str):
+        if self.redis is None:
+            self._l1_set(user_key, field, value)
+            return
+        data_key, gen_key = self._keys(user_key)
+        try:
+            stored = await self.set_if_current(
+                keys=[data_key, gen_key], args=[gen, field, json.dumps(value, ensure_ascii=False), READ_CACHE_TTL]
+            )
+        except Exception as e:
+            print(f"[WARN] 조회 캐시 Redis 저장 실패: {e}")
+            return
+        if stored:
+            self._l1_set(user_key, field, value)
+        else:
+            # 조회하는 동안 쓰기가 커밋됨 - 이전 값일 수 있으므로 저장하지 않음
+            self.stale_skips += 1
+
+    async def invalidate(self, user_key: str):
+        self.invalidations += 1
+        self.l1.delete(user_key)
+        if self.redis is None:
+            return
+        data_key, gen_key = self._keys(user_key)
+        try:
+            async with self.redis.pipeline(transaction=True) as pipe:
+                pipe.incr(gen_key)
+                pipe.expire(gen_key, READ_CACHE_TTL * 2)
+                pipe.delete(data_key)
+                await pipe.execute()
+        except Exception as e:
+            print(f"[WARN] 조회 캐시 무효화 실패: {e}")
+
+    def get_stats(self):
+        lookups = self.l1_hits + self.redis_hits + self.misses
+        return {
+            "l1_hits": self.l1_hits,
+            "redis_hits": self.redis_hits,
+            "misses": self.misses,
+            "hit_ratio": round((self.l1_hits + self.redis_hits) / lookups, 3) if lookups else None,
+            "stale_skips": self.stale_skips,
+            "invalidations": self.invalidations,
+            "l1_users": len(self.l1),
+        }
@@ -1,66 +1,189 @@
 from fastapi.responses import JSONResponse
-from ultralytics import YOLO
-import torch
+from concurrent.futures import ThreadPoolExecutor
+import os
 import numpy as np
 import cv2
 from allDAO.image.iPPC import Preprocess_img
 from allDAO.analysis_image.analysis_redness_image import Analysis_redness_image
 
-analysis_redness_image = Analysis_redness_image()
+# 홍조 / 여드름 분기를 동시에 실행할지, 실행한다면 분기 모델당 intra-op 스레드 수
+PARALLEL_BRANCHES = os.getenv("INFERENCE_PARALLEL_BRANCHES", "1") == "1"
+BRANCH_THREADS = int(os.getenv(
+    "INFERENCE_BRANCH_THREADS",
+    str(max(1, (os.cpu_count() or 2) // int(os.getenv("INFERENCE_WORKERS", "1")) // 2)),
+))
+# 얼굴 검출 방식: adaptive(저해상도 먼저, 실패 시 1280) | full(항상 1280)
+FACE_DETECTION_MODE = os.getenv("FACE_DETECTION_MODE", "adaptive")
+FACE_COARSE_IMGSZ = int(os.getenv("FACE_COARSE_IMGSZ", "640"))
+FACE_FULL_IMGSZ = 1280
+FACE_CONF = 0.6
+# 저해상도 결과를 그대로 쓸 최소 confidence
+FACE_COARSE_CONF = float(os.getenv("FACE_COARSE_CONF", "0.75"))
+# 검출 직후 분석할 얼굴 선택 방식: largest | confidence | center | all
+FACE_SELECTION = os.getenv("FACE_SELECTION", "largest")
+# 병렬로 도는 분기 모델 (얼굴 검출은 분기 전에 전체 스레드로 실행)
+BRANCH_MODELS = ("redness", "acne")
+
+
+def select_faces(xyxy, conf, image_shape, policy=FACE_SELECTION):
+    """
+    검출된 박스 중 분석할 얼굴의 인덱스 목록 (첫 번째가 대표 얼굴)
+    """
+    if len(xyxy) == 0:
+        return []
+
+    widths = xyxy[:, 2] - xyxy[:, 0]
+    heights = xyxy[:, 3] - xyxy[:, 1]
+    areas = widths * heights
+
+    if policy == "all":
+        # 모든 얼굴을 분석하되 가장 큰 얼굴을 대표로
+        return [int(i) for i in np.argsort(-areas, kind="stable")]
+    if policy == "confidence":
+        return [int(np.argmax(conf))]
+    if policy == "center":
+        h, w = image_shape[:2]
+        cx = (xyxy[:, 0] + xyxy[:, 2]) / 2 - w / 2
+        cy = (xyxy[:, 1] + xyxy[:, 3]) / 2 - h / 2
+        return [int(np.argmin(cx * cx + cy * cy))]
+    return [int(np.argmax(areas))]
 
-preprocess_photo = Preprocess_img()
 
 class Check_face:
-    def __init__(self):
-        self.model = YOLO("/home/skinview/allDAO/check_face/check_face_best.pt")
-
-    async def check_face(self, photo):
-
-        image = await photo.read()
-        np_arr = np.frombuffer(image, np.uint8)
-    
-        # OpenCV 이미지로 디코딩
-        decode_image = cv2.imdecode(np_arr, cv2.IMREAD_COLOR)
-        # print(f"[DEBUG] 처리된 decode_image dtype: {decode_image.dtype}")
-
-        predict_result = self.model.predict(
-            source=decode_image,
-            imgsz=1280,
-            conf=0.6, 
+    def __init__(self, registry):
+        # 모델은 레지스트리에서 공유 (프로세스당 1회 로드 + 워밍업)
+        self.registry = registry
+        self.model = registry.get("face")
+        self.device = registry.get_device("face")
+        self.analysis_redness_image = Analysis_redness_image(registry)
+        self.preprocess_photo = Preprocess_img(registry)
+
+        # 두 분기가 코어를 나눠 쓰도록 분기 모델 세션의 intra-op 스레드를 절반씩 배정
+        # (torch 모델은 스레드 수가 프로세스 전역이라 check_faces에서 분기가 도는 동안만 줄임)
+        self.branch_pool = None
+        if PARALLEL_BRANCHES:
+            registry.set_session_threads(BRANCH_MODELS, BRANCH_THREADS)
+            self.branch_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="branch")
+
+    def check_face(self, decode_image, mode=None):
+        return self.check_faces([decode_image], mode)[0]
+
+    def _predict_faces(self, frames, imgsz):
+        return self.model.predict(
+            source=list(frames),
+            imgsz=imgsz,
+            conf=FACE_CONF, 
             iou=0.5,
             save=False,  # 저장하지 않음
-            device="0" if torch.cuda.is_available() else "cpu"
+            device=self.device
         )
 
-        if len(predict_result) > 0:
-            boxes = predict_result[0].boxes
-            print(f"탐지된 객체 수: {len(boxes)}")
-            if len(boxes) > 0:
-                faces = []
-                for box in boxes:
-                    # box.xyxy: tensor 형태. 1x4 크기, (xmin, ymin, xmax, ymax)
-                    xyxy = box.xyxy[0].cpu().numpy().astype(int)  # numpy 배열로 변환
-                    xmin, ymin, xmax, ymax = xyxy
-
-                    width = xmax - xmin
-                    height = ymax - ymin
-                    area = width * height
-                    print(f"바운딩 박스 넓이: {area} (가로: {width}, 세로: {height})")
-
-                    # 원본 이미지에서 얼굴 부분 crop
-                    face_crop = decode_image[ymin:ymax, xmin:xmax]
-                    
-                    redness_image, redness_area = await analysis_redness_image.analysis_redness_image(face_crop, area)
-                    # 필요 시 후처리
-                    processed_face, acne_count, acne_area = await preprocess_photo.apply_clahe_and_white_balance(face_crop, area)
-                    
-                    faces.append(processed_face)
-                
-                # 만약 여러 얼굴 중 첫 번째 얼굴만 반환하려면
-                return faces[0], redness_image, acne_count, acne_area, redness_area
-            else:
-                return None
-            # 혹은 모든 얼굴 리스트를 반환하거나, 별도 처리 가능
-        else:
+    def detect_faces(self, decode_images, mode=None):
+        """
+        프레임별 (xyxy int 배열, confidence 배열) - 좌표는 원본 해상도 기준
+        """
+        mode = mode or FACE_DETECTION_MODE
+        detections = [None] * len(decode_images)
+        pending = list(range(len(decode_images)))
+
+        if mode == "adaptive":
+            # 가이드 카메라 사진은 얼굴이 크므로 축소본으로 먼저 검출
+            coarse_frames, scales = [], []
+            for image in decode_images:
+                scale = min(1.0, FACE_COARSE_IMGSZ / max(image.shape[:2]))
+                if scale < 1.0:
+                    image = cv2.resize(image, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+                coarse_frames.append(image)
+                scales.append(scale)
+
+            pending = []
+            for idx, result in enumerate(self._predict_faces(coarse_frames, FACE_COARSE_IMGSZ)):
+                conf = result.boxes.conf.cpu().numpy()
+                if len(conf) == 0 or conf.max() < FACE_COARSE_CONF:
+                    pending.append(idx)
+                    continue
+                # 축소본 좌표를 원본 해상도로 되돌림
+                h, w = decode_images[idx].shape[:2]
+                xyxy = result.boxes.xyxy.cpu().numpy() / scales[idx]
+                xyxy = np.clip(np.rint(xyxy), 0, [w, h, w, h]).astype(int)
+                detections[idx] = (xyxy, conf)
+
+        # 확신할 만한 얼굴이 없던 프레임만 1280으로 다시 검출
+        if pending:
+            results = self._predict_faces([decode_images[idx] for idx in pending], FACE_FULL_IMGSZ)
+            for idx, result in zip(pending, results):
+                detections[idx] = (result.boxes.xyxy.cpu().numpy().astype(int), result.boxes.conf.cpu().numpy())
+
+        return detections
+
+    def check_faces(self, decode_images, mode=None):
+        # 추론 워커 프로세스에서 동기 실행 (디코딩된 BGR 프레임 여러 장을 한 번에 받음)
+        detections = self.detect_faces(decode_images, mode)
+
+        # 선택된 얼굴만 crop해서 모아 홍조/여드름 모델을 한 번씩만 돌림
+        crops, areas, owners, boxes_info = [], [], [], []
+        for idx, (decode_image, (xyxy_all, conf_all)) in enumerate(zip(decode_images, detections)):
+            print(f"탐지된 객체 수: {len(xyxy_all)}")
+
+            for face_idx in select_faces(xyxy_all, conf_all, decode_image.shape):
+                # (xmin, ymin, xmax, ymax)
+                xmin, ymin, xmax, ymax = xyxy_all[face_idx]
+
+                width = xmax - xmin
+                height = ymax - ymin
+                area = width * height
+                print(f"바운딩 박스 넓이: {area} (가로: {width}, 세로: {height})")
+
+                # 원본 이미지에서 얼굴 부분 crop
+                crops.append(decode_image[ymin:ymax, xmin:xmax])
+                areas.append(area)
+                owners.append(idx)
+                boxes_info.append({
+                    "box": [int(xmin), int(ymin), int(xmax), int(ymax)],
+                    "confidence": round(float(conf_all[face_idx]), 4),
+                })
+
+        if not crops:
             print("결과가 없습니다.")
-            return None
\ No newline at end of file
+            return [None] * len(decode_images)
+
+        # 여드름 박스는 crop 위에 그려지므로 홍조 분기와 버퍼를 공유하지 않도록 복사본 전달
+        acne_crops = [crop.copy() for crop in crops]
+
+        if self.branch_pool is not None:
+            # 두 분기는 crop만 공유하므로 병렬 실행 후 합침 → max(홍조, 여드름) 시간
+            with self.registry.torch_threads(BRANCH_MODELS, BRANCH_THREADS):
+                redness_future = self.branch_pool.submit(self.analysis_redness_image.analysis_redness_images, crops, areas)
+                acne_future = self.branch_pool.submit(self.preprocess_photo.apply_clahe_and_white_balance_batch, acne_crops, areas)
+                redness_results = redness_future.result()
+                acne_results = acne_future.result()
+        else:
+            redness_results = self.analysis_redness_image.analysis_redness_images(crops, areas)
+            # 필요 시 후처리
+            acne_results = self.preprocess_photo.apply_clahe_and_white_balance_batch(acne_crops, areas)
+
+        faces = [[] for _ in decode_images]
+        for owner, info, (redness_image, redness_area), (acne_image, acne_count, acne_area) in zip(owners, boxes_info, redness_results, acne_results):
+            faces[owner].append({
+                **info,
+                "acne_image": acne_image,
+                "redness_image": redness_image,
+                "acne_count": acne_count,
+                "acne_area": acne_area,
+                "redness_area": redness_area,
+            })
+
+        results = []
+        for face_list in faces:
+            if not face_list:
+                results.append(None)
+                continue
+            # 대표 얼굴의 이미지/수치를 반환, all 모드면 얼굴별 수치도 함께
+            result = dict(face_list[0])
+            if FACE_SELECTION == "all":
+                result["faces"] = [
+                    {k: v for k, v in face.items() if k not in ("acne_image", "redness_image")}
+                    for face in face_list
+                ]
+            results.append(result)
+        return results
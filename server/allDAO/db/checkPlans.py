@@ -0,0 +1,150 @@
+"""
+자주 실행되는 조회를 EXPLAIN 해서 순차 스캔(Seq Scan)으로 떨어지는 쿼리가 있으면 실패 (종료 코드 1)
+기본은 enable_seqscan = off 로 확인 - 테이블 크기와 상관없이 쓸 수 있는 인덱스가 있는지만 봄
+
+사용법 (server 디렉터리에서, 마이그레이션 적용 후):
+    python -m allDAO.db.checkPlans
+    python -m allDAO.db.checkPlans --planner-defaults
+"""
+import sys
+import json
+import asyncio
+import argparse
+import asyncpg
+from allDAO.db.dbConfig import DB_CONFIG
+
+# (이름, 조회 SQL, 파라미터로 쓸 실제 값 한 행을 가져오는 SQL)
+HOT_QUERIES = [
+    (
+        "analysis_photo by user+date",
+        """SELECT analysis_photo_acne_url, analysis_photo_redness_url FROM analysis_photo_tbl
+           WHERE analysis_photo_user_key = $1 AND analysis_photo_date = $2""",
+        "SELECT analysis_photo_user_key, analysis_photo_date FROM analysis_photo_tbl LIMIT 1",
+    ),
+    (
+        "analysis_photo history page",
+        """SELECT analysis_photo_date, analysis_photo_acne_count FROM analysis_photo_tbl
+           WHERE analysis_photo_user_key = $1 AND analysis_photo_date < $2
+           ORDER BY analysis_photo_date DESC LIMIT 31""",
+        "SELECT analysis_photo_user_key, analysis_photo_date FROM analysis_photo_tbl LIMIT 1",
+    ),
+    (
+        "survey by user",
+        "SELECT survey_skin_type FROM survey_tbl WHERE survey_user_key = $1",
+        "SELECT survey_user_key FROM survey_tbl WHERE survey_user_key IS NOT NULL LIMIT 1",
+    ),
+    (
+        "user by user_id",
+        "SELECT user_key, user_password FROM user_tbl WHERE user_id = $1",
+        "SELECT user_id FROM user_tbl WHERE user_id IS NOT NULL LIMIT 1",
+    ),
+    (
+        "user by user_email",
+        "SELECT 1 FROM user_tbl WHERE user_email = $1",
+        "SELECT user_email FROM user_tbl WHERE user_email IS NOT NULL LIMIT 1",
+    ),
+    (
+        "user by user_phone_number",
+        "SELECT 1 FROM user_tbl WHERE user_phone_number = $1",
+        "SELECT user_phone_number FROM user_tbl WHERE user_phone_number IS NOT NULL LIMIT 1",
+    ),
+    (
+        "products by product_type",
+        "SELECT product_name, product_image FROM products_tbl WHERE product_type = $1",
+        "SELECT product_type FROM products_tbl WHERE product_type IS NOT NULL LIMIT 1",
+    ),
+    (
+        "products by embedding",
+        "SELECT product_name FROM products_tbl ORDER BY product_embedding <=> $1::text::vector LIMIT 7",
+        "SELECT product_embedding::text FROM products_tbl WHERE product_embedding IS NOT NULL LIMIT 1",
+    ),
+    (
+        "presets by user",
+        """SELECT preset_id, preset_product_name FROM preset_tbl
+           WHERE preset_user_key = $1 ORDER BY preset_date DESC""",
+        "SELECT preset_user_key FROM preset_tbl WHERE preset_user_key IS NOT NULL LIMIT 1",
+    ),
+    (
+        "skin trends by user",
+        """SELECT * FROM skin_trend_tbl
+           WHERE skin_trend_user_key = $1 AND skin_trend_period = $2 ORDER BY skin_trend_period_start""",
+        "SELECT skin_trend_user_key, skin_trend_period FROM skin_trend_tbl LIMIT 1",
+    ),
+]
+
+
+def plan_scans(plan: dict):
+    """
+    실행 계획 트리의 모든 스캔 노드 [(노드 종류, 테이블, 인덱스)] - Bitmap Index Scan 은 테이블 없이 인덱스만
+    """
+    scans = []
+    if "Relation Name" in plan or "Index Name" in plan:
+        scans.append((plan["Node Type"], plan.get("Relation Name", ""), plan.get("Index Name")))
+    for child in plan.get("Plans", []):
+        scans += plan_scans(child)
+    return scans
+
+
+async def check_query(conn, sql: str, sample_sql: str, planner_defaults: bool):
+    """
+    (스캔 목록, 건너뛴 이유) - 파라미터로 쓸 데이터가 없으면 건너뜀
+    """
+    sample = await conn.fetchrow(sample_sql)
+    if sample is None:
+        return None, "데이터 없음"
+    async with conn.transaction():
+        if not planner_defaults:
+            await conn.execute("SET LOCAL enable_seqscan = off")
+        raw = await conn.fetchval(f"EXPLAIN (FORMAT JSON) {sql}", *sample.values())
+    plan = (json.loads(raw) if isinstance(raw, str) else raw)[0]["Plan"]
+    return plan_scans(plan), None
+
+
+async def check_plans(db_config: dict = DB_CONFIG, planner_defaults: bool = False) -> list:
+    """
+    순차 스캔으로 실행되는 쿼리 이름 목록 반환
+    """
+    conn = await asyncpg.connect(**db_config)
+    failed = []
+    try:
+        for name, sql, sample_sql in HOT_QUERIES:
+            try:
+                scans, skipped = await check_query(conn, sql, sample_sql, planner_defaults)
+            except asyncpg.PostgresError as e:
+                # 테이블/컬럼이 없는 등 쿼리 자체가 실패해도 실패로 처리
+                print(f"{'ERROR':8} {name}: {e}")
+                failed.append(name)
+                continue
+            if skipped:
+                print(f"{'skip':8} {name}: {skipped}")
+                continue
+
+            seq_scans = [table for node, table, _ in scans if node == "Seq Scan"]
+            detail = ", ".join(" ".join(filter(None, (node, table, index and f"using {index}"))) for node, table, index in scans)
+            if seq_scans:
+                failed.append(name)
+                print(f"{'SEQSCAN':8} {name}: {detail}")
+            else:
+                print(f"{'ok':8} {name}: {detail}")
+    finally:
+        await conn.close()
+    return failed
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--planner-defaults", action="store_true",
+        help="enable_seqscan을 끄지 않고 실제 통계대로 확인 (작은 테이블은 순차 스캔이 더 싸서 실패할 수 있음)",
+    )
+    args = parser.parse_args()
+
+    failed = asyncio.run(check_plans(planner_defaults=args.planner_defaults))
+    if failed:
+        print(f"[CheckPlans] 순차 스캔 {len(failed)}개: {', '.join(failed)}")
+        sys.exit(1)
+    print("[CheckPlans] 모든 조회가 인덱스를 사용")
+
+
+if __name__ == "__main__":
+    main()
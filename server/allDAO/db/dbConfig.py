@@ -0,0 +1,13 @@
+import os
+
+# DB 연결 정보는 여기서만 읽음 (asyncpg 키 이름)
+DB_CONFIG = {
+    "database": os.getenv("DB_NAME", "ai_skinview"),
+    "user": os.getenv("DB_USER", "admin"),
+    "password": os.getenv("DB_PASSWORD"),
+    "host": os.getenv("DB_HOST", "localhost"),
+    "port": int(os.getenv("DB_PORT", "5432")),
+}
+
+# 같은 설정을 psycopg2 키 이름으로 (main.py의 동기 엔드포인트용)
+PSYCOPG2_DB_CONFIG = {("dbname" if key == "database" else key): value for key, value in DB_CONFIG.items()}
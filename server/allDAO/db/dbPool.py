@@ -0,0 +1,77 @@
+import os
+import time
+import asyncio
+from collections import deque
+import asyncpg
+from allDAO.db.dbConfig import DB_CONFIG
+
+DB_POOL_MIN_SIZE = int(os.getenv("DB_POOL_MIN_SIZE", "2"))
+DB_POOL_MAX_SIZE = int(os.getenv("DB_POOL_MAX_SIZE", "10"))
+# 연결별 prepared statement 캐시 (0이면 비활성화 - pgbouncer transaction 모드 등)
+DB_STATEMENT_CACHE_SIZE = int(os.getenv("DB_STATEMENT_CACHE_SIZE", "100"))
+DB_POOL_ACQUIRE_TIMEOUT = float(os.getenv("DB_POOL_ACQUIRE_TIMEOUT", "10"))
+DB_POOL_MAX_IDLE = float(os.getenv("DB_POOL_MAX_IDLE", "300"))
+
+
+class DBPool:
+    """
+    앱 전체에서 공유하는 asyncpg 풀 - lifespan에서 open/close, DAO에는 이 객체를 주입
+    acquire()/release()는 기존 connect()/close() 자리에 그대로 사용
+    """
+    def __init__(self, db_config: dict = DB_CONFIG, min_size: int = DB_POOL_MIN_SIZE, max_size: int = DB_POOL_MAX_SIZE,
+                 statement_cache_size: int = DB_STATEMENT_CACHE_SIZE, acquire_timeout: float = DB_POOL_ACQUIRE_TIMEOUT):
+        self.db_config = db_config
+        self.min_size = min_size
+        self.max_size = max_size
+        self.statement_cache_size = statement_cache_size
+        self.acquire_timeout = acquire_timeout
+        self.pool = None
+
+        # 지표
+        self.acquires = 0
+        self.timeouts = 0
+        self.recent_waits = deque(maxlen=1000)
+
+    async def open(self):
+        self.pool = await asyncpg.create_pool(
+            **self.db_config,
+            min_size=self.min_size,
+            max_size=self.max_size,
+            statement_cache_size=self.statement_cache_size,
+            max_inactive_connection_lifetime=DB_POOL_MAX_IDLE,
+        )
+        print(f"✅ [DB] 연결 풀 생성 ({self.min_size}~{self.max_size})")
+
+    async def acquire(self):
+        start = time.perf_counter()
+        try:
+            conn = await self.pool.acquire(timeout=self.acquire_timeout)
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            raise
+        self.acquires += 1
+        self.recent_waits.append((time.perf_counter() - start) * 1000)
+        return conn
+
+    async def release(self, conn):
+        await self.pool.release(conn)
+
+    async def close(self):
+        if self.pool is not None:
+            await self.pool.close()
+            self.pool = None
+
+    def get_stats(self):
+        waits = sorted(self.recent_waits)
+        return {
+            "size": self.pool.get_size() if self.pool else 0,
+            "idle": self.pool.get_idle_size() if self.pool else 0,
+            "min_size": self.min_size,
+            "max_size": self.max_size,
+            "statement_cache_size": self.statement_cache_size,
+            "acquires": self.acquires,
+            "acquire_timeouts": self.timeouts,
+            "avg_acquire_ms": round(sum(waits) / len(waits), 2) if waits else 0.0,
+            "p95_acquire_ms": round(waits[min(len(waits) - 1, int(len(waits) * 0.95))], 2) if waits else 0.0,
+            "max_acquire_ms": round(waits[-1], 2) if waits else 0.0,
+        }
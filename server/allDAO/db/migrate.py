@@ -0,0 +1,106 @@
+"""
+버전 번호가 붙은 SQL 마이그레이션(allDAO/db/migrations/NNNN_이름.sql)을 순서대로 적용
+
+사용법 (server 디렉터리에서):
+    python -m allDAO.db.migrate
+    python -m allDAO.db.migrate --status
+"""
+import os
+import re
+import asyncio
+import argparse
+import asyncpg
+from allDAO.db.dbConfig import DB_CONFIG
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "migrations")
+MIGRATION_FILE = re.compile(r"^(\d+)_(\w+)\.sql$")
+# 여러 uvicorn 워커가 동시에 시작해도 한 곳에서만 적용
+MIGRATION_LOCK_ID = 0x5C1A7E
+
+
+def load_migrations(directory: str = MIGRATIONS_DIR):
+    """
+    [(version, name, sql)] 버전 순
+    """
+    migrations = []
+    for filename in os.listdir(directory):
+        match = MIGRATION_FILE.match(filename)
+        if not match:
+            continue
+        with open(os.path.join(directory, filename), encoding="utf-8") as f:
+            migrations.append((int(match.group(1)), match.group(2), f.read()))
+    migrations.sort()
+
+    versions = [version for version, _, _ in migrations]
+    assert len(versions) == len(set(versions)), f"중복된 마이그레이션 버전: {versions}"
+    return migrations
+
+
+async def applied_versions(conn) -> set:
+    await conn.execute("""
+        CREATE TABLE IF NOT EXISTS schema_migrations_tbl (
+            migration_version INTEGER PRIMARY KEY,
+            migration_name TEXT NOT NULL,
+            migration_applied_at TIMESTAMPTZ NOT NULL DEFAULT now()
+        )
+    """)
+    rows = await conn.fetch("SELECT migration_version FROM schema_migrations_tbl")
+    return {row["migration_version"] for row in rows}
+
+
+async def migrate(conn, directory: str = MIGRATIONS_DIR) -> list:
+    """
+    아직 적용되지 않은 마이그레이션을 각각 하나의 트랜잭션으로 적용하고 적용한 버전 목록 반환
+    """
+    await conn.execute("SELECT pg_advisory_lock($1)", MIGRATION_LOCK_ID)
+    try:
+        done = await applied_versions(conn)
+        applied = []
+        for version, name, sql in load_migrations(directory):
+            if version in done:
+                continue
+            async with conn.transaction():
+                await conn.execute(sql)
+                await conn.execute(
+                    "INSERT INTO schema_migrations_tbl (migration_version, migration_name) VALUES ($1, $2)",
+                    version, name,
+                )
+            print(f"✅ [Migrate] {version:04d}_{name}")
+            applied.append(version)
+        return applied
+    finally:
+        await conn.execute("SELECT pg_advisory_unlock($1)", MIGRATION_LOCK_ID)
+
+
+async def run_migrations(db_config: dict = DB_CONFIG) -> list:
+    conn = await asyncpg.connect(**db_config)
+    try:
+        return await migrate(conn)
+    finally:
+        await conn.close()
+
+
+async def print_status(db_config: dict = DB_CONFIG):
+    conn = await asyncpg.connect(**db_config)
+    try:
+        done = await applied_versions(conn)
+    finally:
+        await conn.close()
+    for version, name, _ in load_migrations():
+        print(f"{'applied' if version in done else 'pending':8} {version:04d}_{name}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--status", action="store_true", help="적용 여부만 출력")
+    args = parser.parse_args()
+
+    if args.status:
+        asyncio.run(print_status())
+    else:
+        applied = asyncio.run(run_migrations())
+        print(f"[Migrate] {len(applied)}개 적용")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,17 @@
+-- 교체되었거나 DB 저장에 실패한 분석 이미지의 삭제 대기열
+-- regImage가 DB 변경과 같은 트랜잭션에서 기록하고, BlobSweeper가 배치로 삭제
+CREATE TABLE IF NOT EXISTS blob_delete_tbl (
+    blob_delete_id BIGSERIAL PRIMARY KEY,
+    blob_delete_container TEXT NOT NULL,
+    blob_delete_name TEXT NOT NULL,
+    -- replaced | failed | orphan
+    blob_delete_reason TEXT NOT NULL,
+    blob_delete_attempts INTEGER NOT NULL DEFAULT 0,
+    blob_delete_error TEXT,
+    blob_delete_not_before TIMESTAMPTZ NOT NULL DEFAULT now(),
+    blob_delete_created_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+    UNIQUE (blob_delete_container, blob_delete_name)
+);
+
+CREATE INDEX IF NOT EXISTS blob_delete_due_idx
+    ON blob_delete_tbl (blob_delete_not_before, blob_delete_id);
@@ -0,0 +1,31 @@
+-- regImage / regSurvey 의 INSERT ... ON CONFLICT 대상이 되는 유니크 키
+-- 예전 SELECT 후 INSERT 경쟁으로 생긴 중복 행이 있으면 임의로 지우지 않고 실패
+-- (python -m allDAO.image.blobSweeper dedupe 가 기본 키가 가장 큰 행만 남기고, 지운 행의 이미지는 삭제 대기열로 보냄)
+DO $$
+DECLARE
+    photo_duplicates BIGINT;
+    survey_duplicates BIGINT;
+BEGIN
+    SELECT count(*) INTO photo_duplicates FROM (
+        SELECT 1 FROM analysis_photo_tbl
+        GROUP BY analysis_photo_user_key, analysis_photo_date
+        HAVING count(*) > 1
+    ) d;
+    SELECT count(*) INTO survey_duplicates FROM (
+        SELECT 1 FROM survey_tbl
+        GROUP BY survey_user_key
+        HAVING count(*) > 1
+    ) d;
+
+    IF photo_duplicates > 0 OR survey_duplicates > 0 THEN
+        RAISE EXCEPTION '중복 행이 있어 유니크 키를 만들 수 없습니다: analysis_photo_tbl (user_key, date) %건, survey_tbl (survey_user_key) %건',
+            photo_duplicates, survey_duplicates
+            USING HINT = 'server 디렉터리에서 python -m allDAO.image.blobSweeper dedupe --dry-run 으로 확인하고 dedupe 로 정리한 뒤 다시 시작하세요.';
+    END IF;
+END $$;
+
+CREATE UNIQUE INDEX IF NOT EXISTS analysis_photo_user_date_key
+    ON analysis_photo_tbl (analysis_photo_user_key, analysis_photo_date);
+
+CREATE UNIQUE INDEX IF NOT EXISTS survey_user_key_key
+    ON survey_tbl (survey_user_key);
@@ -0,0 +1,3 @@
+-- 대시보드 ETag 용 마지막 분석 시각 (regImage 업서트가 갱신)
+ALTER TABLE analysis_photo_tbl
+    ADD COLUMN IF NOT EXISTS analysis_photo_updated_at TIMESTAMPTZ NOT NULL DEFAULT now();
@@ -0,0 +1,38 @@
+-- 사용자별 주/월 단위 분석 수치 집계 (평균은 sum / days 로 조회 시 계산)
+-- regImage 업서트와 같은 트랜잭션에서 allDAO.image.skinTrends 가 갱신
+CREATE TABLE IF NOT EXISTS skin_trend_tbl (
+    skin_trend_user_key TEXT NOT NULL,
+    -- week | month
+    skin_trend_period TEXT NOT NULL,
+    skin_trend_period_start DATE NOT NULL,
+    skin_trend_days INTEGER NOT NULL,
+    skin_trend_acne_count_sum BIGINT NOT NULL,
+    skin_trend_acne_count_min INTEGER NOT NULL,
+    skin_trend_acne_count_max INTEGER NOT NULL,
+    skin_trend_acne_area_sum DOUBLE PRECISION NOT NULL,
+    skin_trend_acne_area_min DOUBLE PRECISION NOT NULL,
+    skin_trend_acne_area_max DOUBLE PRECISION NOT NULL,
+    skin_trend_redness_area_sum DOUBLE PRECISION NOT NULL,
+    skin_trend_redness_area_min DOUBLE PRECISION NOT NULL,
+    skin_trend_redness_area_max DOUBLE PRECISION NOT NULL,
+    skin_trend_updated_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+    PRIMARY KEY (skin_trend_user_key, skin_trend_period, skin_trend_period_start)
+);
+
+-- 기존 기록으로 한 번 채움 (이후 재구성은 python -m allDAO.image.skinTrends backfill)
+INSERT INTO skin_trend_tbl (
+    skin_trend_user_key, skin_trend_period, skin_trend_period_start, skin_trend_days,
+    skin_trend_acne_count_sum, skin_trend_acne_count_min, skin_trend_acne_count_max,
+    skin_trend_acne_area_sum, skin_trend_acne_area_min, skin_trend_acne_area_max,
+    skin_trend_redness_area_sum, skin_trend_redness_area_min, skin_trend_redness_area_max
+)
+SELECT a.analysis_photo_user_key, p.period, date_trunc(p.period, a.analysis_photo_date)::date, count(*),
+       sum(a.analysis_photo_acne_count), min(a.analysis_photo_acne_count), max(a.analysis_photo_acne_count),
+       sum(a.analysis_photo_acne_area), min(a.analysis_photo_acne_area), max(a.analysis_photo_acne_area),
+       sum(a.analysis_photo_redness_area), min(a.analysis_photo_redness_area), max(a.analysis_photo_redness_area)
+FROM analysis_photo_tbl a, unnest(ARRAY['week', 'month']) AS p(period)
+WHERE a.analysis_photo_acne_count IS NOT NULL
+  AND a.analysis_photo_acne_area IS NOT NULL
+  AND a.analysis_photo_redness_area IS NOT NULL
+GROUP BY 1, 2, 3
+ON CONFLICT DO NOTHING;
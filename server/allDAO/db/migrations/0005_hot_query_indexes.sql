@@ -0,0 +1,13 @@
+-- 자주 실행되는 조회용 B-tree 인덱스 (python -m allDAO.db.checkPlans 로 확인)
+-- analysis_photo_tbl (user_key, date) 와 survey_tbl (survey_user_key) 는 0002 의 유니크 인덱스가 담당
+
+-- 아이디/이메일/전화번호 중복 확인, 로그인
+CREATE INDEX IF NOT EXISTS user_id_idx ON user_tbl (user_id);
+CREATE INDEX IF NOT EXISTS user_email_idx ON user_tbl (user_email);
+CREATE INDEX IF NOT EXISTS user_phone_number_idx ON user_tbl (user_phone_number);
+
+-- 피부 타입별 제품 목록
+CREATE INDEX IF NOT EXISTS product_type_idx ON products_tbl (product_type);
+
+-- 사용자별 루틴 목록 (최신순)
+CREATE INDEX IF NOT EXISTS preset_user_date_idx ON preset_tbl (preset_user_key, preset_date DESC);
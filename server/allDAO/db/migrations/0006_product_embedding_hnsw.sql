@@ -0,0 +1,6 @@
+-- 제품 추천 벡터 검색 (ORDER BY product_embedding <=> $1 LIMIT n) 용 pgvector HNSW 인덱스
+-- <=> 는 코사인 거리이므로 vector_cosine_ops, IVFFlat 과 달리 데이터가 없어도 만들 수 있고 재학습이 필요 없음
+-- (pgvector 0.5.0 이상, 검색 정확도는 세션의 hnsw.ef_search 로 조정 - 기본 40)
+CREATE INDEX IF NOT EXISTS product_embedding_hnsw_idx
+    ON products_tbl USING hnsw (product_embedding vector_cosine_ops)
+    WITH (m = 16, ef_construction = 64);
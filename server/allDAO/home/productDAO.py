@@ -1,19 +1,12 @@
 from fastapi.responses import JSONResponse
 from openai import AzureOpenAI
-import asyncpg
 import json
 from datetime import date
 
 class ProductDAO:
-    def __init__(self, client: AzureOpenAI, embedding_model_name: str):
-        # DB 설정
-        self.db_config = {
-            "user": "admin",
-            "password": "qwe123",
-            "database": "ai_skinview",
-            "host": "20.81.185.103",
-            "port": 5432,
-        }
+    def __init__(self, client: AzureOpenAI, embedding_model_name: str, db):
+        # 공유 DB 연결 풀 (allDAO.db.dbPool.DBPool)
+        self.db = db
         # [수정] Azure OpenAI 클라이언트 및 모델명 초기화
         self.client = client
         self.embedding_model_name = embedding_model_name
@@ -21,7 +14,7 @@ class ProductDAO:
     async def get_product(self, skin_type: str):
         conn = None
         try:
-            conn = await asyncpg.connect(**self.db_config)
+            conn = await self.db.acquire()
             query = """
                 SELECT product_name, product_description, product_image, product_link, product_type, product_brand
                 FROM products_tbl WHERE product_type = $1
@@ -35,13 +28,13 @@ class ProductDAO:
             return JSONResponse(content={"error": str(e)}, status_code=500)
         finally:
             if conn:
-                await conn.close()
+                await self.db.release(conn)
 
     # [수정] 맞춤형 제품 추천
     async def get_advanced_recommendations(self, user_key: str):
         conn = None
         try:
-            conn = await asyncpg.connect(**self.db_config)
+            conn = await self.db.acquire()
             print(f"[INFO] 고급 추천 로직 시작 (User: {user_key})")
 
             # 1. DB에서 사용자 프로필(개인정보, 설문, 사진 분석 결과) 종합적으로 조회
@@ -80,7 +73,7 @@ class ProductDAO:
             return JSONResponse(content={"error": str(e)}, status_code=500)
         finally:
             if conn:
-                await conn.close()
+                await self.db.release(conn)
 
     async def _get_user_profile(self, conn, user_key: str):
         """헬퍼 메서드: user_key로 여러 테이블에서 사용자 정보를 조회하고 종합합니다."""
@@ -202,7 +195,7 @@ class ProductDAO:
     async def search_products_by_name(self, keyword: str):
         conn = None
         try:
-            conn = await asyncpg.connect(**self.db_config)
+            conn = await self.db.acquire()
 
             query = """
                 SELECT product_name, product_description, product_image, product_link, product_type
@@ -230,4 +223,4 @@ class ProductDAO:
 
         finally:
             if conn:
-                await conn.close()
\ No newline at end of file
+                await self.db.release(conn)
\ No newline at end of file
@@ -0,0 +1,324 @@
+"""
+blob_delete_tbl 삭제 대기열을 배치로 비우는 스위퍼 + DB에서 참조하지 않는 이미지를 찾는 정합성 검사
+dedupe: 0002 마이그레이션 전에 (user_key, date) / survey_user_key 중복 행 정리
+
+사용법 (server 디렉터리에서):
+    python -m allDAO.image.blobSweeper sweep
+    python -m allDAO.image.blobSweeper reconcile --dry-run
+    python -m allDAO.image.blobSweeper dedupe --dry-run
+"""
+import os
+import time
+import asyncio
+import argparse
+import datetime
+from allDAO.image.imageEncoder import VARIANTS, variant_url
+
+BLOB_SWEEP_INTERVAL = float(os.getenv("BLOB_SWEEP_INTERVAL", "30"))
+BLOB_SWEEP_BATCH = int(os.getenv("BLOB_SWEEP_BATCH", "100"))
+BLOB_DELETE_MAX_ATTEMPTS = int(os.getenv("BLOB_DELETE_MAX_ATTEMPTS", "10"))
+# 업로드 직후 DB 반영 전인 이미지를 고아로 오인하지 않도록 이 시간보다 오래된 것만 검사
+BLOB_ORPHAN_GRACE = int(os.getenv("BLOB_ORPHAN_GRACE", "3600"))
+# 스위퍼가 reconcile을 도는 주기 (저장소 전체를 나열하므로 길게, 0이면 끔)
+BLOB_RECONCILE_INTERVAL = float(os.getenv("BLOB_RECONCILE_INTERVAL", "21600"))
+# 여러 워커 중 하나만 reconcile 하도록 잡는 advisory lock
+BLOB_RECONCILE_LOCK_ID = 0x5C1A7F
+
+ENQUEUE_SQL = """
+    INSERT INTO blob_delete_tbl (blob_delete_container, blob_delete_name, blob_delete_reason)
+    SELECT * FROM unnest($1::text[], $2::text[], $3::text[])
+    ON CONFLICT (blob_delete_container, blob_delete_name) DO NOTHING
+"""
+
+
+async def primary_key(conn, table: str) -> str:
+    """
+    단일 컬럼 기본 키 이름 - 중복 행 중 남길 행을 정하는 기준
+    """
+    rows = await conn.fetch("""
+        SELECT a.attname FROM pg_index i
+        JOIN pg_attribute a ON a.attrelid = i.indrelid AND a.attnum = ANY(i.indkey)
+        WHERE i.indrelid = $1::regclass AND i.indisprimary
+    """, table)
+    if len(rows) != 1:
+        raise RuntimeError(f"{table}에 단일 컬럼 기본 키가 없어 남길 행을 정할 수 없습니다. 중복 행을 직접 정리하세요.")
+    return rows[0]["attname"]
+
+
+async def enqueue_blob_deletes(conn, blobs, reason: str):
+    """
+    [(container, name)]을 삭제 대기열에 기록 - 호출 쪽 트랜잭션 안에서 실행하면 DB 변경과 함께 커밋
+    """
+    if not blobs:
+        return
+    containers, names = zip(*blobs)
+    await conn.execute(ENQUEUE_SQL, list(containers), list(names), [reason] * len(blobs))
+
+
+class BlobSweeper:
+    def __init__(self, storage, db, containers: dict):
+        # {컨테이너 이름: 해당 URL을 저장하는 analysis_photo_tbl 컬럼}
+        self.storage = storage
+        self.db = db
+        self.containers = containers
+        self.task = None
+
+        # 지표
+        self.sweeps = 0
+        self.deleted = 0
+        self.failed = 0
+        self.last_sweep_ms = None
+        self.last_error = None
+        self.reconciles = 0
+        self.last_reconcile_orphans = None
+        self.last_reconcile_ms = None
+
+    async def sweep_once(self, batch: int = BLOB_SWEEP_BATCH) -> int:
+        """
+        기한이 지난 항목을 batch개씩 잠그고(SKIP LOCKED) 동시에 삭제, 실패한 항목은 지수 백오프로 재시도
+        """
+        start = time.perf_counter()
+        conn = await self.db.acquire()
+        try:
+            async with conn.transaction():
+                rows = await conn.fetch("""
+                    SELECT blob_delete_id, blob_delete_container, blob_delete_name, blob_delete_attempts
+                    FROM blob_delete_tbl
+                    WHERE blob_delete_not_before <= now() AND blob_delete_attempts < $1
+                    ORDER BY blob_delete_not_before, blob_delete_id
+                    LIMIT $2
+                    FOR UPDATE SKIP LOCKED
+                """, BLOB_DELETE_MAX_ATTEMPTS, batch)
+                if not rows:
+                    return 0
+
+                results = await asyncio.gather(
+                    *(self.storage.delete(row["blob_delete_container"], row["blob_delete_name"]) for row in rows),
+                    return_exceptions=True,
+                )
+                done = [row["blob_delete_id"] for row, r in zip(rows, results) if not isinstance(r, Exception)]
+                retry = [(row, r) for row, r in zip(rows, results) if isinstance(r, Exception)]
+
+                if done:
+                    await conn.execute("DELETE FROM blob_delete_tbl WHERE blob_delete_id = ANY($1::bigint[])", done)
+                if retry:
+                    await conn.executemany("""
+                        UPDATE blob_delete_tbl
+                        SET blob_delete_attempts = blob_delete_attempts + 1,
+                            blob_delete_error = $2,
+                            blob_delete_not_before = now() + make_interval(secs => $3)
+                        WHERE blob_delete_id = $1
+                    """, [
+                        (row["blob_delete_id"], str(error)[:500], float(min(2 ** row["blob_delete_attempts"] * 60, 86400)))
+                        for row, error in retry
+                    ])
+                    for row, error in retry:
+                        print(f"[WARN] blob 삭제 실패 {row['blob_delete_container']}/{row['blob_delete_name']}: {error}")
+
+            self.deleted += len(done)
+            self.failed += len(retry)
+            return len(done)
+        finally:
+            await self.db.release(conn)
+            self.sweeps += 1
+            self.last_sweep_ms = round((time.perf_counter() - start) * 1000, 2)
+
+    async def sweep_all(self) -> int:
+        total = 0
+        while deleted := await self.sweep_once():
+            total += deleted
+        return total
+
+    async def reconcile(self, dry_run: bool = False, grace: int = BLOB_ORPHAN_GRACE) -> list:
+        """
+        저장소에는 있지만 analysis_photo_tbl이 참조하지 않는 이미지를 찾아 삭제 대기열(orphan)에 등록
+        """
+        conn = await self.db.acquire()
+        try:
+            referenced = set()
+            columns = ", ".join(self.containers.values())
+            async with conn.transaction():
+                async for row in conn.cursor(f"SELECT {columns} FROM analysis_photo_tbl"):
+                    for container, column in self.containers.items():
+                        if row[column]:
+                            referenced.update(
+                                (container, self.storage.name_from_url(container, variant_url(row[column], variant)))
+                                for variant in VARIANTS
+                            )
+            queued = {
+                (row["blob_delete_container"], row["blob_delete_name"])
+                for row in await conn.fetch("SELECT blob_delete_container, blob_delete_name FROM blob_delete_tbl")
+            }
+
+            cutoff = datetime.datetime.now(datetime.timezone.utc) - datetime.timedelta(seconds=grace)
+            orphans = []
+            for container in self.containers:
+                async for name, last_modified in self.storage.list(container):
+                    if last_modified > cutoff or (container, name) in queued:
+                        continue
+                    if (container, name) not in referenced:
+                        orphans.append((container, name))
+
+            print(f"[Reconcile] 참조 {len(referenced)}개, 고아 {len(orphans)}개")
+            if dry_run:
+                for container, name in orphans:
+                    print(f"  {container}/{name}")
+            if orphans and not dry_run:
+                await enqueue_blob_deletes(conn, orphans, "orphan")
+            return orphans
+        finally:
+            await self.db.release(conn)
+
+    async def dedupe(self, dry_run: bool = False) -> int:
+        """
+        analysis_photo_tbl (user_key, date) / survey_tbl (survey_user_key) 중복 중 기본 키가 가장 큰 행만 남김
+        지운 분석 행의 이미지는 같은 트랜잭션에서 삭제 대기열(duplicate)에 등록 (남은 행이 참조하는 이미지는 제외)
+        """
+        columns = list(self.containers.values())
+        conn = await self.db.acquire()
+        try:
+            transaction = conn.transaction()
+            await transaction.start()
+            try:
+                photo_key = await primary_key(conn, "analysis_photo_tbl")
+                survey_key = await primary_key(conn, "survey_tbl")
+                deleted = await conn.fetch(f"""
+                    DELETE FROM analysis_photo_tbl a
+                    USING (
+                        SELECT {photo_key}, row_number() OVER (
+                            PARTITION BY analysis_photo_user_key, analysis_photo_date ORDER BY {photo_key} DESC
+                        ) AS rn
+                        FROM analysis_photo_tbl
+                    ) d
+                    WHERE a.{photo_key} = d.{photo_key} AND d.rn > 1
+                    RETURNING {", ".join(f"a.{column}" for column in columns)}
+                """)
+                survey_status = await conn.execute(f"""
+                    DELETE FROM survey_tbl s
+                    USING (
+                        SELECT {survey_key}, row_number() OVER (PARTITION BY survey_user_key ORDER BY {survey_key} DESC) AS rn
+                        FROM survey_tbl
+                    ) d
+                    WHERE s.{survey_key} = d.{survey_key} AND d.rn > 1
+                """)
+
+                urls = {column: {row[column] for row in deleted if row[column]} for column in columns}
+                for column in columns:
+                    # 같은 URL을 남은 행이 참조하면 이미지는 지우지 않음
+                    kept = await conn.fetch(
+                        f"SELECT {column} FROM analysis_photo_tbl WHERE {column} = ANY($1::text[])", list(urls[column])
+                    )
+                    urls[column] -= {row[column] for row in kept}
+                blobs = [
+                    (container, self.storage.name_from_url(container, variant_url(url, variant)))
+                    for container, column in self.containers.items()
+                    for url in urls[column]
+                    for variant in VARIANTS
+                ]
+                blobs = list(dict.fromkeys(blobs))
+
+                print(f"[Dedupe] analysis_photo_tbl {len(deleted)}행, survey_tbl {survey_status.split()[-1]}행, 이미지 {len(blobs)}개")
+                if dry_run:
+                    for container, name in blobs:
+                        print(f"  {container}/{name}")
+                    await transaction.rollback()
+                    return len(deleted)
+
+                await enqueue_blob_deletes(conn, blobs, "duplicate")
+            except BaseException:
+                await transaction.rollback()
+                raise
+            await transaction.commit()
+            return len(deleted)
+        finally:
+            await self.db.release(conn)
+
+    async def reconcile_locked(self) -> bool:
+        """
+        다른 워커가 reconcile 중이면 건너뜀 - 실행했으면 True
+        """
+        conn = await self.db.acquire()
+        try:
+            if not await conn.fetchval("SELECT pg_try_advisory_lock($1)", BLOB_RECONCILE_LOCK_ID):
+                return False
+            try:
+                start = time.perf_counter()
+                orphans = await self.reconcile()
+                self.reconciles += 1
+                self.last_reconcile_orphans = len(orphans)
+                self.last_reconcile_ms = round((time.perf_counter() - start) * 1000, 2)
+                return True
+            finally:
+                await conn.execute("SELECT pg_advisory_unlock($1)", BLOB_RECONCILE_LOCK_ID)
+        finally:
+            await self.db.release(conn)
+
+    async def _run(self, interval: float, reconcile_interval: float):
+        # 서버 시작 직후 부하를 피해 첫 reconcile은 한 주기 뒤
+        next_reconcile = time.monotonic() + reconcile_interval
+        while True:
+            try:
+                if reconcile_interval > 0 and time.monotonic() >= next_reconcile:
+                    next_reconcile = time.monotonic() + reconcile_interval
+                    await self.reconcile_locked()
+                await self.sweep_all()
+                self.last_error = None
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.last_error = str(e)
+                print(f"[WARN] blob 스위퍼 실패: {e}")
+            await asyncio.sleep(interval)
+
+    def start(self, interval: float = BLOB_SWEEP_INTERVAL, reconcile_interval: float = BLOB_RECONCILE_INTERVAL):
+        self.task = asyncio.create_task(self._run(interval, reconcile_interval))
+
+    async def stop(self):
+        if self.task is not None:
+            self.task.cancel()
+            await asyncio.gather(self.task, return_exceptions=True)
+            self.task = None
+
+    def get_stats(self):
+        return {
+            "sweeps": self.sweeps,
+            "deleted": self.deleted,
+            "failed": self.failed,
+            "last_sweep_ms": self.last_sweep_ms,
+            "last_error": self.last_error,
+            "reconciles": self.reconciles,
+            "last_reconcile_orphans": self.last_reconcile_orphans,
+            "last_reconcile_ms": self.last_reconcile_ms,
+        }
+
+
+async def run(command: str, dry_run: bool):
+    from allDAO.db.dbPool import DBPool
+    from allDAO.image.imageDAO import ImageDAO
+
+    db = DBPool(min_size=1, max_size=2)
+    await db.open()
+    dao = ImageDAO(db)
+    sweeper = BlobSweeper(dao.storage, db, dao.blob_columns())
+    try:
+        if command == "dedupe":
+            await sweeper.dedupe(dry_run=dry_run)
+        if command == "reconcile":
+            await sweeper.reconcile(dry_run=dry_run)
+        if command == "sweep" or (command in ("reconcile", "dedupe") and not dry_run):
+            print(f"[Sweep] {await sweeper.sweep_all()}개 삭제")
+    finally:
+        await dao.close()
+        await db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("command", choices=["sweep", "reconcile", "dedupe"])
+    parser.add_argument("--dry-run", action="store_true", help="reconcile/dedupe: 대상만 출력하고 변경하지 않음")
+    args = parser.parse_args()
+    asyncio.run(run(args.command, args.dry_run))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,45 +1,89 @@
+import threading
 import cv2
 import numpy as np
 
 from allDAO.analysis_image.analysis_acne_image import Analysis_acne_image
 
-analysis_acne_image = Analysis_acne_image()
 
 class Preprocess_img:
-    async def apply_clahe_and_white_balance(self, photo, face_area):
+    def __init__(self, registry):
+        self.analysis_acne_image = Analysis_acne_image(registry)
 
-        # 디버깅을 위한 데이터 타입 및 형태 출력 (문제 발생 시 유용)
+    def apply_clahe_and_white_balance(self, photo, face_area):
+        return self.apply_clahe_and_white_balance_batch([photo], [face_area])[0]
 
-        # (여기에 전처리 작업)
-        # BGR을 LAB로 변환하고 float32로 캐스팅
-        lab = cv2.cvtColor(photo, cv2.COLOR_BGR2LAB).astype(np.float32)
-        # 화이트 밸런싱 로직
-        avg_a = lab[:, :, 1].mean()
-        avg_b = lab[:, :, 2].mean()
+    def apply_clahe_and_white_balance_batch(self, photos, face_areas):
+        # 전처리는 crop마다, 여드름 추론은 한 번의 배치 predict로
+        processed_imgs = [self.preprocess(photo) for photo in photos]
 
-        lab[:, :, 1] -= ((avg_a - 128) * (lab[:, :, 0] / 255.0) * 1.1)
-        lab[:, :, 2] -= ((avg_b - 128) * (lab[:, :, 0] / 255.0) * 1.1)
+        results = self.analysis_acne_image.analysis_acne_images(photos, processed_imgs, face_areas)
+        print("[DEBUG] iPPC..........Done!!")
+        return results
 
-        # 결과값을 0-255 범위로 클리핑하고 uint8로 다시 캐스팅
-        lab = np.clip(lab, 0, 255).astype(np.uint8)
+    @staticmethod
+    def preprocess(photo):
+        """
+        화이트밸런스(L 가중 a/b 보정) + L 채널 CLAHE, 결과 BGR 이미지만 새로 할당
+        """
+        h, w = photo.shape[:2]
+        buffers = _thread_buffers(h * w)
+        lab = buffers["lab"][:h * w * 3].reshape(h, w, 3)
+        l = buffers["l"][:h * w].reshape(h, w)
+        channel = buffers["channel"][:h * w].reshape(h, w)
+        index = buffers["index"][:h * w].reshape(h, w)
 
+        # BGR → LAB (미리 잡아 둔 버퍼에)
+        cv2.cvtColor(photo, cv2.COLOR_BGR2LAB, dst=lab)
+        cv2.extractChannel(lab, 0, dst=l)
+        _, avg_a, avg_b, _ = cv2.mean(lab)
 
-        # # CLAHE 적용을 위한 LAB 변환
-        l, a, b = cv2.split(lab)
+        # 화이트 밸런싱: 보정량이 (L, a) 값에만 의존하므로 256x256 LUT 한 번 조회로 처리
+        # index = L * 256 + a|b
+        for coi, avg in ((1, avg_a), (2, avg_b)):
+            np.left_shift(l, 8, out=index, dtype=np.intp)
+            np.add(index, lab[:, :, coi], out=index)
+            np.take(_white_balance_lut(avg), index, out=channel)
+            cv2.insertChannel(channel, lab, coi)
 
-        # CLAHE 객체 생성 및 L 채널에 적용
-        clahe = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8, 8))
-        cl = clahe.apply(l)
-
-        # CLAHE 적용된 L 채널과 원본 a, b 채널을 다시 병합
-        final = cv2.merge((cl, a, b))
+        # CLAHE는 스레드별로 한 번만 생성해 L 채널에 적용
+        buffers["clahe"].apply(l, dst=l)
+        cv2.insertChannel(l, lab, 0)
 
         # 최종 LAB를 BGR로 변환
-        processed_img = cv2.cvtColor(final, cv2.COLOR_LAB2BGR)
+        processed_img = cv2.cvtColor(lab, cv2.COLOR_LAB2BGR)
+
+        return processed_img
+
+
+# 워커 스레드별 CLAHE 객체 / 작업 버퍼 (필요할 때만 키움)
+_local = threading.local()
+
+
+def _thread_buffers(pixels: int) -> dict:
+    buffers = getattr(_local, "buffers", None)
+    if buffers is None:
+        buffers = _local.buffers = {
+            "clahe": cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8, 8)),
+            "capacity": 0,
+        }
+
+    if buffers["capacity"] < pixels:
+        buffers.update({
+            "capacity": pixels,
+            "lab": np.empty(pixels * 3, dtype=np.uint8),
+            "l": np.empty(pixels, dtype=np.uint8),
+            "channel": np.empty(pixels, dtype=np.uint8),
+            "index": np.empty(pixels, dtype=np.intp),
+        })
+    return buffers
+
+
+_L = np.arange(256, dtype=np.float32)
 
-        # 처리된 이미지를 JPG 형식으로 인코딩
 
-        analy_img, acne_count, acne_area = await analysis_acne_image.analysis_acne_image(photo, processed_img, face_area)
-        print(f"[DEBUG] iPPC..........Done!!")
-        # 인코딩된 바이트 반환
-        return analy_img, acne_count, acne_area
\ No newline at end of file
+def _white_balance_lut(avg: float):
+    """
+    lut[L * 256 + v] = clip(v - (avg - 128) * (L / 255) * 1.1, 0, 255) - 기존 float32 계산과 같은 순서
+    """
+    shift = (np.float32(avg) - 128) * (_L / 255.0) * 1.1
+    return np.clip(_L[None, :] - shift[:, None], 0, 255).astype(np.uint8).ravel()
@@ -1,37 +1,35 @@
+import os
 import uuid
+import asyncio
 import datetime
 import traceback
-import asyncpg
-from azure.storage.blob import BlobServiceClient
-from fastapi.responses import JSONResponse
-import cv2
-from torch import hamming_window
+import json
+from allDAO.storage.imageStorage import create_storage
+from allDAO.image.imageEncoder import ImageEncoder, VARIANTS, variant_name, variant_url
+from allDAO.image.blobSweeper import enqueue_blob_deletes
+from allDAO.image.skinTrends import TREND_PERIODS, update_skin_trends
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+
+# 한 페이지 최대 개수 / NDJSON 스트림에서 한 번에 가져오는 행 수
+HISTORY_MAX_LIMIT = int(os.getenv("HISTORY_MAX_LIMIT", "366"))
+HISTORY_STREAM_PREFETCH = int(os.getenv("HISTORY_STREAM_PREFETCH", "500"))
 
 
 class ImageDAO:
-    def __init__(self):
-        # ✅ .env에서 Azure Blob 연결 문자열 읽기
-        self.connect_str = os.getenv("AZURE_STORAGE_CONNECTION_STRING")
-        assert self.connect_str, "AZURE_STORAGE_CONNECTION_STRING 환경변수를 설정하세요."
+    def __init__(self, db, storage=None, encoder=None, read_cache=None):
+        # 공유 DB 연결 풀 (allDAO.db.dbPool.DBPool)
+        self.db = db
+        # 이미지 저장소 (IMAGE_STORAGE=azure|local)
+        self.storage = storage or create_storage()
+        # 결과 이미지 인코딩 (IMAGE_FORMAT=jpeg|webp)
+        self.encoder = encoder or ImageEncoder()
+        # 사용자별 조회 캐시 (allDAO.cache.userReadCache.UserReadCache) - 없으면 매번 DB 조회
+        self.read_cache = read_cache
 
         # 컨테이너 이름도 env로 빼면 더 깔끔 (선택)
         self.acne_container_name = os.getenv("AZURE_ACNE_CONTAINER", "acneimage")
         self.redness_container_name = os.getenv("AZURE_REDNESS_CONTAINER", "rednessimage")
 
-        self.blob_service_client = BlobServiceClient.from_connection_string(
-            self.connect_str
-        )
-
-
-        # DB 설정
-        self.db_config = {
-            "user": "admin",
-            "password": "qwe123",
-            "database": "ai_skinview",
-            "host": "20.81.185.103",
-            "port": 5432,
-        }
-
     ###########################################################################################################################################################################
     async def regSurvey(self, user_key, skin_do:float, skin_sr:float, skin_pn:float, skin_wt:float, skin_combination_type:bool):
         headers = {
@@ -49,42 +47,31 @@ class ImageDAO:
             print(f"[DEBUG] {user_key}의 피부타입은: {skin_combination_type}")
 
 
-            conn = await asyncpg.connect(**self.db_config)
-
-            # 수정
-            select_sql = """
-                SELECT survey_user_key FROM survey_tbl
-                WHERE survey_user_key = $1
+            conn = await self.db.acquire()
+
+            # 한 문장으로 추가/수정 - xmax = 0 이면 새로 추가된 행
+            upsert_sql = """
+                INSERT INTO survey_tbl (survey_user_key, survey_skin_do, survey_skin_sr, survey_skin_pn, survey_skin_wt, survey_skin_type, survey_skin_combination_type)
+                VALUES ($1, $2, $3, $4, $5, $6, $7)
+                ON CONFLICT (survey_user_key) DO UPDATE
+                SET survey_skin_do = EXCLUDED.survey_skin_do,
+                    survey_skin_sr = EXCLUDED.survey_skin_sr,
+                    survey_skin_pn = EXCLUDED.survey_skin_pn,
+                    survey_skin_wt = EXCLUDED.survey_skin_wt,
+                    survey_skin_type = EXCLUDED.survey_skin_type,
+                    survey_skin_combination_type = EXCLUDED.survey_skin_combination_type
+                RETURNING (xmax = 0) AS inserted
             """
-            existing = await conn.fetchrow(select_sql, user_key)
-            print(f"[DEBUG] Existing data: {existing}")
-
-            if existing:
-                update_sql = """
-                    UPDATE survey_tbl
-                    SET survey_skin_do = $1,
-                        survey_skin_sr = $2,
-                        survey_skin_pn = $3,
-                        survey_skin_wt = $4,
-                        survey_skin_type = $5,
-                        survey_skin_combination_type = $6
-                    WHERE survey_user_key = $7
-                """
-                await conn.execute(
-                    update_sql, skin_do, skin_sr, skin_pn, skin_wt, skin_type, skin_combination_type, user_key, 
-                )
-                print("[DEBUG] DB record updated")
-                return JSONResponse({"result": "설문조사 수정 성공"}, headers=headers)
-            else:
-                insert_sql = """
-                    INSERT INTO survey_tbl (survey_user_key, survey_skin_do, survey_skin_sr, survey_skin_pn, survey_skin_wt, survey_skin_type, survey_skin_combination_type)
-                    VALUES ($1, $2, $3, $4, $5, $6, $7)
-                """
-                await conn.execute(
-                    insert_sql, user_key, skin_do, skin_sr, skin_pn, skin_wt, skin_type, skin_combination_type
-                )
+            inserted = await conn.fetchval(
+                upsert_sql, user_key, skin_do, skin_sr, skin_pn, skin_wt, skin_type, skin_combination_type
+            )
+            await self._invalidate(user_key)
+
+            if inserted:
                 print("[DEBUG] DB record inserted")
                 return JSONResponse({"result": "설문조사 성공"}, headers=headers)
+            print("[DEBUG] DB record updated")
+            return JSONResponse({"result": "설문조사 수정 성공"}, headers=headers)
 
         except Exception as e:
             print("[ERROR] 저장 중 오류:\n" + traceback.format_exc())
@@ -94,7 +81,7 @@ class ImageDAO:
         #     return JSONResponse({"error": str(e)}, status_code=500)
         finally:
             if conn:
-                await conn.close()
+                await self.db.release(conn)
 
     def calculate_survey_result(self, skin_do:float, skin_sr:float, skin_pn:float, skin_wt:float):
         calculate = [
@@ -136,59 +123,25 @@ class ImageDAO:
             "Access-Control-Allow-Origin": "*",
             "Access-Control-Allow-Credentials": "true",
         }
-        conn = None
-        try:
-            conn = await asyncpg.connect(**self.db_config)
-
-            select_sql = """
-                SELECT DISTINCT survey_skin_type
-                FROM survey_tbl
-                WHERE survey_user_key = $1
-            """
+        select_sql = """
+            SELECT DISTINCT survey_skin_type
+            FROM survey_tbl
+            WHERE survey_user_key = $1
+        """
 
-            rows = await conn.fetch(select_sql, user_key)
+        async def load():
+            rows = await self._fetch(select_sql, user_key)
             skin_type = [str(rows[0]["survey_skin_type"])]
             print(f"[DEBUG] DB에서 받은 값: {skin_type}")
+            return {"skin_type": skin_type}
 
-            return JSONResponse({"skin_type": skin_type}, headers=h)
-
-        except Exception as e:
-            print("DB Error:", e)
-            return JSONResponse({"result": "DB 오류: " + str(e)}, headers=h)
-
-        finally:
-            if conn:
-                await conn.close()
-
-    async def get_skin_type_by_user(self, user_key):
-        h = {
-            "Access-Control-Allow-Origin": "*",
-            "Access-Control-Allow-Credentials": "true",
-        }
-        conn = None
         try:
-            conn = await asyncpg.connect(**self.db_config)
-
-            select_sql = """
-                SELECT DISTINCT survey_skin_type
-                FROM survey_tbl
-                WHERE survey_user_key = $1
-            """
-
-            rows = await conn.fetch(select_sql, user_key)
-            skin_type = [str(rows[0]["survey_skin_type"])]
-            print(f"[DEBUG] DB에서 받은 값: {skin_type}")
-
-            return JSONResponse({"skin_type": skin_type}, headers=h)
+            return JSONResponse(await self._cached(user_key, "skin_type", load), headers=h)
 
         except Exception as e:
             print("DB Error:", e)
             return JSONResponse({"result": "DB 오류: " + str(e)}, headers=h)
 
-        finally:
-            if conn:
-                await conn.close()
-
 ###########################################################################################################################################################################
 
     async def regImage(
@@ -200,6 +153,7 @@ class ImageDAO:
         acne_count,
         acne_area,
         redness_area,
+        faces=None,
     ):
         h = {
             "Access-Control-Allow-Origin": "*",
@@ -213,122 +167,74 @@ class ImageDAO:
             # 문자열 → datetime.date 변환
             date_obj = datetime.date.fromisoformat(date)
 
-            # DB 연결
-            conn = await asyncpg.connect(**self.db_config)
-
             # 파일 읽기
             # image = await photo.read()
-            success1, encoded_acne_image = cv2.imencode(".jpg", acne_image)
-            success2, encoded_redness_image = cv2.imencode(".jpg", redness_image)
-            if not (success1 and success2):
-                raise RuntimeError("이미지를 다시 JPG로 인코딩하지 못했습니다.")
-            acne_data = encoded_acne_image.tobytes()
-            redness_data = encoded_redness_image.tobytes()
+            # full + thumb 인코딩 (워커 스레드)
+            encoded_acne, encoded_redness = await self.encoder.encode(acne_image, redness_image)
 
-            print(f"[DEBUG] Blob data size: {len(acne_data)} bytes")
-            print(f"[DEBUG] Blob data size: {len(redness_data)} bytes")
+            print(f"[DEBUG] Blob data size: {len(encoded_acne['full'])} bytes")
+            print(f"[DEBUG] Blob data size: {len(encoded_redness['full'])} bytes")
 
             # 새 파일 이름 및 업로드
-            acne_filename = f"{uuid.uuid4()}.jpg"
-            redness_filename = f"{uuid.uuid4()}.jpg"
+            acne_stem = str(uuid.uuid4())
+            redness_stem = str(uuid.uuid4())
+            ext = self.encoder.ext
+            uploads = [
+                (self.acne_container_name, variant_name(acne_stem, variant, ext), data)
+                for variant, data in encoded_acne.items()
+            ] + [
+                (self.redness_container_name, variant_name(redness_stem, variant, ext), data)
+                for variant, data in encoded_redness.items()
+            ]
+            new_blobs = [(container, name) for container, name, _ in uploads]
 
-            acne_blob_client = self.blob_service_client.get_blob_client(
-                container=self.acne_container_name, blob=acne_filename
+            # 모든 variant를 동시에 업로드
+            uploaded = await asyncio.gather(
+                *(self.storage.put(container, name, data, self.encoder.content_type) for container, name, data in uploads),
+                return_exceptions=True,
             )
-            redness_blob_client = self.blob_service_client.get_blob_client(
-                container=self.redness_container_name, blob=redness_filename
-            )
-
-            acne_blob_client.upload_blob(acne_data, overwrite=True)
-            redness_blob_client.upload_blob(redness_data, overwrite=True)
+            failed = [r for r in uploaded if isinstance(r, Exception)]
+            if failed:
+                # 일부만 올라간 경우 남은 쪽 정리
+                await self._queue_deletes([blob for blob, r in zip(new_blobs, uploaded) if not isinstance(r, Exception)])
+                raise failed[0]
 
-            acne_url = f"https://{self.blob_service_client.account_name}.blob.core.windows.net/{self.acne_container_name}/{acne_filename}"
-            redness_url = f"https://{self.blob_service_client.account_name}.blob.core.windows.net/{self.redness_container_name}/{redness_filename}"
+            acne_url = self.storage.url(self.acne_container_name, variant_name(acne_stem, "full", ext))
+            redness_url = self.storage.url(self.redness_container_name, variant_name(redness_stem, "full", ext))
 
             # acne_url = acne_blob_client.url
             # redness_url = redness_blob_client.url
 
             # print(f"[DEBUG] Blob uploaded: {url}")
 
-            # 기존 이미지 조회
-            select_sql = """
-                SELECT analysis_photo_user_key, analysis_photo_date, analysis_photo_acne_url, analysis_photo_redness_url FROM analysis_photo_tbl
-                WHERE analysis_photo_user_key = $1 AND analysis_photo_date = $2
-            """
-            existing = await conn.fetchrow(select_sql, user_key, date_obj)
-            print(f"[DEBUG] Existing data: {existing}")
-
-            if existing:
-                # 기존 Blob 삭제
-                old_acne_url = existing["analysis_photo_acne_url"]
-                old_redness_url = existing["analysis_photo_redness_url"]
-
-                old_acne_blob_name = old_acne_url.split(
-                    f"/{self.acne_container_name}/"
-                )[-1].split("?")[0]
-                old_redness_blob_name = old_redness_url.split(
-                    f"/{self.redness_container_name}/"
-                )[-1].split("?")[0]
-
-                old_acne_blob_client = self.blob_service_client.get_blob_client(
-                    container=self.acne_container_name, blob=old_acne_blob_name
-                )
-                old_redness_blob_client = self.blob_service_client.get_blob_client(
-                    container=self.redness_container_name, blob=old_redness_blob_name
-                )
-
-                # print(f"[DEBUG] Old blob deleted: {old_acne_blob_name}")
-                # print(f"[DEBUG] Old blob deleted: {old_redness_blob_name}")
-
-                # DB 업데이트
-                try:
-                    update_sql = """
-                                UPDATE analysis_photo_tbl
-                                SET analysis_photo_acne_url = $1,
-                                    analysis_photo_redness_url = $2,
-                                    analysis_photo_acne_count = $3,
-                                    analysis_photo_acne_area = $4,
-                                    analysis_photo_redness_area = $5
-                                WHERE analysis_photo_user_key = $6 AND analysis_photo_date = $7
-                            """
-
-                    await conn.execute(
-                        update_sql,
-                        acne_url,
-                        redness_url,
-                        acne_count,
-                        acne_area,
-                        redness_area,
-                        existing["analysis_photo_user_key"],
-                        existing["analysis_photo_date"],
-                    )
-                    # print("[DEBUG] DB record updated")
-                    old_acne_blob_client.delete_blob()
-                    old_redness_blob_client.delete_blob()
-                except Exception as e:
-                    print(f"[ERROR] DB업데이트 실패: {e}")
-                    try:
-                        acne_blob_client.delete_blob()
-                    except Exception as ex:
-                        print(f"[WARN] 새 acne blob 삭제 실패: {ex}")
-                    try:
-                        redness_blob_client.delete_blob()
-                    except Exception as ex:
-                        print(f"[WARN] 새 redness blob 삭제 실패: {ex}")
-                    raise
+            # 업로드가 끝난 뒤에만 풀에서 연결을 빌림
+            conn = await self.db.acquire()
 
-                return JSONResponse(
-                    {"result": f"{acne_url, redness_url} 업데이트 성공"}, headers=h
+            # 한 문장으로 추가/교체 - xmax <> 0 이면 기존 행을 교체, prev CTE는 문장 시작 시점의 이전 URL
+            # (FOR UPDATE를 붙이면 RETURNING 시점에 자기 UPDATE로 바뀐 행을 건너뛰어 항상 NULL이 됨)
+            upsert_sql = """
+                WITH prev AS (
+                    SELECT analysis_photo_acne_url, analysis_photo_redness_url FROM analysis_photo_tbl
+                    WHERE analysis_photo_user_key = $1 AND analysis_photo_date = $2
                 )
-            else:
-                # DB 추가
-                try:
-                    insert_sql = """
-                        INSERT INTO analysis_photo_tbl (analysis_photo_user_key, analysis_photo_date, analysis_photo_acne_url, analysis_photo_redness_url, analysis_photo_acne_count, analysis_photo_acne_area, analysis_photo_redness_area)
-                        VALUES ($1, $2, $3, $4, $5, $6, $7)
-                    """
-                    await conn.execute(
-                        insert_sql,
+                INSERT INTO analysis_photo_tbl (analysis_photo_user_key, analysis_photo_date, analysis_photo_acne_url, analysis_photo_redness_url, analysis_photo_acne_count, analysis_photo_acne_area, analysis_photo_redness_area)
+                VALUES ($1, $2, $3, $4, $5, $6, $7)
+                ON CONFLICT (analysis_photo_user_key, analysis_photo_date) DO UPDATE
+                SET analysis_photo_acne_url = EXCLUDED.analysis_photo_acne_url,
+                    analysis_photo_redness_url = EXCLUDED.analysis_photo_redness_url,
+                    analysis_photo_acne_count = EXCLUDED.analysis_photo_acne_count,
+                    analysis_photo_acne_area = EXCLUDED.analysis_photo_acne_area,
+                    analysis_photo_redness_area = EXCLUDED.analysis_photo_redness_area,
+                    analysis_photo_updated_at = now()
+                RETURNING (xmax <> 0) AS replaced,
+                          (SELECT analysis_photo_acne_url FROM prev) AS old_acne_url,
+                          (SELECT analysis_photo_redness_url FROM prev) AS old_redness_url
+            """
+            try:
+                # 주/월 집계(skin_trend_tbl)도 같은 트랜잭션에서 갱신
+                async with conn.transaction():
+                    row = await conn.fetchrow(
+                        upsert_sql,
                         user_key,
                         date_obj,
                         acne_url,
@@ -337,44 +243,116 @@ class ImageDAO:
                         acne_area,
                         redness_area,
                     )
-                except Exception as e:
-                    print(f"[ERROR] DB삽입 실패: {e}")
-
-                    try:
-                        acne_blob_client.delete_blob()
-                    except Exception as ex:
-                        print(f"[WARN] 새 acne blob 삭제 실패: {ex}")
-                    try:
-                        redness_blob_client.delete_blob()
-                    except Exception as ex:
-                        print(f"[WARN] 새 redness blob 삭제 실패: {ex}")
-                    raise
+                    # 동시에 들어온 첫 업로드와 겹치면 교체인데 prev가 비어 있을 수 있음 - 그래도 교체로 처리
+                    # (그 업로드의 이미지는 이전 URL을 알 수 없으므로 reconcile이 고아로 정리)
+                    replaced = row["replaced"]
+                    await update_skin_trends(conn, user_key, date_obj, acne_count, acne_area, redness_area, replaced)
+
+                    # 교체된 기존 Blob은 업서트와 같은 트랜잭션에서 삭제 대기열로 → BlobSweeper가 응답 경로 밖에서 삭제
+                    old_blobs = []
+                    if row["old_acne_url"]:
+                        old_blobs += self._variant_blobs(self.acne_container_name, row["old_acne_url"])
+                    if row["old_redness_url"]:
+                        old_blobs += self._variant_blobs(self.redness_container_name, row["old_redness_url"])
+                    await enqueue_blob_deletes(conn, old_blobs, "replaced")
+            except Exception as e:
+                print(f"[ERROR] DB저장 실패: {e}")
+                await self._queue_deletes(new_blobs)
+                raise
+            print(f"[DEBUG] Previous data: {row}")
+            await self._invalidate(user_key)
+
+            if not replaced:
                 print("[DEBUG] DB record inserted")
                 return JSONResponse(
-                    {"result": f"{acne_url, redness_url} 추가 성공"}, headers=h
+                    self._with_faces({"result": f"{acne_url, redness_url} 추가 성공"}, faces), headers=h
                 )
 
+            # print("[DEBUG] DB record updated")
+
+            return JSONResponse(
+                self._with_faces({"result": f"{acne_url, redness_url} 업데이트 성공"}, faces), headers=h
+            )
+
         except Exception as e:
             print("[ERROR]", e)
             traceback.print_exc()
-            return JSONResponse({"result": "DB 오류: " + str(e)}, headers=h)
+            return JSONResponse({"result": "DB 오류: " + str(e)}, status_code=500, headers=h)
+        finally:
+            if conn:
+                await self.db.release(conn)
+
+    def _variant_blobs(self, container, url):
+        # 저장된 full URL에 딸린 모든 variant 파일 (이전 형식이면 원본 하나)
+        names = {self.storage.name_from_url(container, variant_url(url, variant)) for variant in VARIANTS}
+        return [(container, name) for name in names]
+
+    async def _queue_deletes(self, blobs, reason: str = "failed"):
+        # DB 저장에 실패해 남은 새 이미지 - 기록마저 실패하면 reconcile이 고아로 찾아 정리
+        if not blobs:
+            return
+        conn = None
+        try:
+            conn = await self.db.acquire()
+            await enqueue_blob_deletes(conn, blobs, reason)
+        except Exception as e:
+            print(f"[WARN] 삭제 대기열 기록 실패 {blobs}: {e}")
         finally:
             if conn:
-                await conn.close()
+                await self.db.release(conn)
+
+    def blob_columns(self) -> dict:
+        # 컨테이너별로 이미지 URL을 저장하는 컬럼 (BlobSweeper.reconcile 용)
+        return {
+            self.acne_container_name: "analysis_photo_acne_url",
+            self.redness_container_name: "analysis_photo_redness_url",
+        }
+
+    async def close(self):
+        await self.storage.close()
+
+    async def _cached(self, user_key, field, loader):
+        # 조회 캐시가 있으면 캐시를 거쳐서, 없으면 바로 loader() (loader는 JSON으로 저장 가능한 dict 반환)
+        if self.read_cache is None:
+            return await loader()
+        return await self.read_cache.get_or_load(user_key, field, loader)
+
+    async def _invalidate(self, user_key):
+        # 쓰기가 커밋된 뒤 호출 - 이 사용자의 캐시된 조회 결과 전체 무효화
+        if self.read_cache is not None:
+            await self.read_cache.invalidate(user_key)
+
+    async def _fetch(self, sql, *args):
+        conn = await self.db.acquire()
+        try:
+            return await conn.fetch(sql, *args)
+        finally:
+            await self.db.release(conn)
+
+    def _with_faces(self, content: dict, faces):
+        # FACE_SELECTION=all 일 때 얼굴별 분석 수치를 응답에 포함
+        if faces:
+            content["faces"] = [
+                {**face, "acne_area": round(face["acne_area"], 2), "redness_area": round(float(face["redness_area"]), 2)}
+                for face in faces
+            ]
+        return content
 
 ###########################################################################################################################################################################
 
-    async def select(self, user_key, date: str):
+    async def select(self, user_key, date: str, variant: str = "full"):
         h = {
             "Access-Control-Allow-Origin": "*",
             "Access-Control-Allow-Credentials": "true",
         }
+        if variant not in VARIANTS:
+            return JSONResponse({"result": f"variant는 {'|'.join(VARIANTS)} 중 하나여야 합니다."}, status_code=400, headers=h)
         conn = None
         try:
             # 문자열 → datetime.date 변환
             date_obj = datetime.date.fromisoformat(date)
 
-            conn = await asyncpg.connect(**self.db_config)
+            conn = await self.db.acquire()
 
             select_sql = """
                 SELECT analysis_photo_acne_url, analysis_photo_redness_url FROM analysis_photo_tbl
@@ -386,8 +364,8 @@ class ImageDAO:
             if row:
                 return JSONResponse(
                     {
-                        "analysis_photo_acne_url": row["analysis_photo_acne_url"],
-                        "analysis_photo_redness_url": row["analysis_photo_redness_url"],
+                        "analysis_photo_acne_url": variant_url(row["analysis_photo_acne_url"], variant),
+                        "analysis_photo_redness_url": variant_url(row["analysis_photo_redness_url"], variant),
                     },
                     headers=h,
                 )
@@ -399,38 +377,20 @@ class ImageDAO:
             return JSONResponse({"result": "DB 오류: " + str(e)}, headers=h)
         finally:
             if conn:
-                await conn.close()
+                await self.db.release(conn)
 
     ###########################################################################################################################################################################
 
-    async def get_dates_by_user(self, user_key):
+    async def get_dates_by_user(self, user_key, from_date: str = None, to_date: str = None,
+                                cursor: str = None, limit: int = None, stream: bool = False):
         h = {
             "Access-Control-Allow-Origin": "*",
             "Access-Control-Allow-Credentials": "true",
         }
-        conn = None
-        try:
-            conn = await asyncpg.connect(**self.db_config)
-
-            select_sql = """
-                SELECT DISTINCT analysis_photo_date
-                FROM analysis_photo_tbl
-                WHERE analysis_photo_user_key = $1
-                ORDER BY analysis_photo_date DESC
-            """
-
-            rows = await conn.fetch(select_sql, user_key)
-            dates = [str(row["analysis_photo_date"]) for row in rows]
-
-            return JSONResponse({"dates": dates}, headers=h)
-
-        except Exception as e:
-            print("DB Error:", e)
-            return JSONResponse({"result": "DB 오류: " + str(e)}, headers=h)
-
-        finally:
-            if conn:
-                await conn.close()
+        return await self._history(
+            "analysis_photo_date", lambda row: str(row["analysis_photo_date"]), "dates",
+            user_key, from_date, to_date, cursor, limit, stream, h,
+        )
 
     ###########################################################################################################################################################################
 
@@ -442,74 +402,281 @@ class ImageDAO:
             "Access-Control-Allow-Origin": "*",
             "Access-Control-Allow-Credentials": "true",
         }
-        conn = None
+        select_sql = """
+            SELECT analysis_photo_acne_count, analysis_photo_acne_area, analysis_photo_redness_area 
+            FROM analysis_photo_tbl 
+            WHERE analysis_photo_user_key = $1 AND analysis_photo_date = $2
+        """
         try:
             date_obj = datetime.date.fromisoformat(date)
-            conn = await asyncpg.connect(**self.db_config)
 
-            select_sql = """
-                SELECT analysis_photo_acne_count, analysis_photo_acne_area, analysis_photo_redness_area 
-                FROM analysis_photo_tbl 
-                WHERE analysis_photo_user_key = $1 AND analysis_photo_date = $2
-            """
-            row = await conn.fetchrow(select_sql, user_key, date_obj)
-            print(f"[DEBUG] get_acne result: {row}")
+            async def load():
+                rows = await self._fetch(select_sql, user_key, date_obj)
+                print(f"[DEBUG] get_acne result: {rows}")
+                if not rows:
+                    # 없는 날짜는 캐시하지 않음
+                    return None
+                return {
+                    "acne_count": rows[0]["analysis_photo_acne_count"],
+                    "acne_area": float(rows[0]["analysis_photo_acne_area"]),
+                    "redness_area": float(rows[0]["analysis_photo_redness_area"]),
+                }
 
-            if row:
-                return JSONResponse(
-                    {
-                        "acne_count": row["analysis_photo_acne_count"],
-                        "acne_area": float(row["analysis_photo_acne_area"]),
-                        "redness_area": float(row["analysis_photo_redness_area"]),
-                    },
-                    headers=h,
-                )
+            content = await self._cached(user_key, f"acne:{date_obj}", load)
+            if content:
+                return JSONResponse(content, headers=h)
             else:
                 return JSONResponse({"result": "해당 데이터 없음"}, headers=h)
         except Exception as e:
             print("[ERROR]", e)
             return JSONResponse({"result": "DB 오류: " + str(e)}, headers=h)
-        finally:
-            if conn:
-                await conn.close()
 
     ############################################################################################################################
 
-    async def get_dates_with_acne_info(self, user_key: str):
+    async def get_dates_with_acne_info(self, user_key: str, from_date: str = None, to_date: str = None,
+                                       cursor: str = None, limit: int = None, stream: bool = False):
         """
-        특정 user_key에 대한 날짜, 여드름 개수, 여드름 면적 정보를 모두 조회
+        특정 user_key에 대한 날짜, 여드름 개수, 여드름 면적 정보 조회 (from/to 범위, cursor 이전 날짜부터 limit개)
         """
         h = {
             "Access-Control-Allow-Origin": "*",
             "Access-Control-Allow-Credentials": "true",
         }
-        conn = None
+        return await self._history(
+            "analysis_photo_date, analysis_photo_acne_count, analysis_photo_acne_area, analysis_photo_redness_area",
+            lambda row: {
+                "acne_date": str(row["analysis_photo_date"]),
+                "acne_count": row["analysis_photo_acne_count"],
+                "acne_area": float(row["analysis_photo_acne_area"]),
+                "redness_area": float(row["analysis_photo_redness_area"]),
+            },
+            "data",
+            user_key, from_date, to_date, cursor, limit, stream, h,
+        )
+
+    def _history_sql(self, columns: str, user_key, from_date, to_date, cursor, limit):
+        """
+        최신 날짜부터 내려가는 keyset 페이지 - cursor는 이전 페이지의 마지막 날짜 (analysis_photo_date < cursor)
+        limit+1개를 읽어 다음 페이지 여부를 판단
+        """
+        conditions = ["analysis_photo_user_key = $1"]
+        args = [user_key]
+        for op, value in ((">=", from_date), ("<=", to_date), ("<", cursor)):
+            if value:
+                args.append(datetime.date.fromisoformat(value))
+                conditions.append(f"analysis_photo_date {op} ${len(args)}")
+
+        sql = f"""
+            SELECT {columns}
+            FROM analysis_photo_tbl
+            WHERE {" AND ".join(conditions)}
+            ORDER BY analysis_photo_date DESC
+        """
+        if limit is not None:
+            if not 1 <= limit <= HISTORY_MAX_LIMIT:
+                raise ValueError(f"limit은 1~{HISTORY_MAX_LIMIT} 사이여야 합니다.")
+            args.append(limit + 1)
+            sql += f" LIMIT ${len(args)}"
+        return sql, args
+
+    async def _history(self, columns, to_item, key, user_key, from_date, to_date, cursor, limit, stream, h):
         try:
-            conn = await asyncpg.connect(**self.db_config)
+            sql, args = self._history_sql(columns, user_key, from_date, to_date, cursor, limit)
+            if stream:
+                # 내보내기용 NDJSON - 서버 측 커서로 한 줄씩 전송해 전체 목록을 메모리에 만들지 않음 (캐시하지 않음)
+                return StreamingResponse(
+                    self._stream_history(sql, args, to_item, limit), media_type="application/x-ndjson", headers=h
+                )
 
-            select_sql = """
-                SELECT analysis_photo_date, analysis_photo_acne_count, analysis_photo_acne_area, analysis_photo_redness_area 
-                FROM analysis_photo_tbl
-                WHERE analysis_photo_user_key = $1
-                ORDER BY analysis_photo_date DESC
+            async def load():
+                rows = await self._fetch(sql, *args)
+                next_cursor = None
+                if limit is not None and len(rows) > limit:
+                    rows = rows[:limit]
+                    next_cursor = str(rows[-1]["analysis_photo_date"])
+                return {key: [to_item(row) for row in rows], "next_cursor": next_cursor}
+
+            # 필드 이름에 조회 조건을 모두 포함 (예: dates:::: / data:2025-01-01:::30)
+            field = ":".join([key, from_date or "", to_date or "", cursor or "", str(limit or "")])
+            return JSONResponse(await self._cached(user_key, field, load), headers=h)
+
+        except ValueError as e:
+            return JSONResponse({"result": "요청 형식 오류: " + str(e)}, status_code=400, headers=h)
+        except Exception as e:
+            print("[ERROR]", e)
+            return JSONResponse({"result": "DB 오류: " + str(e)}, headers=h)
+
+    async def _stream_history(self, sql, args, to_item, limit):
+        conn = await self.db.acquire()
+        try:
+            async with conn.transaction():
+                count = 0
+                async for row in conn.cursor(sql, *args, prefetch=HISTORY_STREAM_PREFETCH):
+                    # LIMIT은 다음 페이지 확인용으로 1개 더 읽음
+                    if limit is not None and count == limit:
+                        break
+                    count += 1
+                    yield json.dumps(to_item(row), ensure_ascii=False) + "\n"
+        finally:
+            await self.db.release(conn)
+
+    async def get_trends(self, user_key: str, period: str = "week", from_date: str = None, to_date: str = None):
+        """
+        주/월 단위 여드름 개수, 여드름 면적, 붉은기 면적의 평균/최소/최대 (skin_trend_tbl, 오래된 기간부터)
+        """
+        h = {
+            "Access-Control-Allow-Origin": "*",
+            "Access-Control-Allow-Credentials": "true",
+        }
+        if period not in TREND_PERIODS:
+            return JSONResponse({"result": f"period는 {'|'.join(TREND_PERIODS)} 중 하나여야 합니다."}, status_code=400, headers=h)
+        try:
+            conditions = ["skin_trend_user_key = $1", "skin_trend_period = $2"]
+            args = [user_key, period]
+            # from_date가 기간 중간이면 그 날짜가 속한 기간부터
+            for op, value in ((">=", from_date), ("<=", to_date)):
+                if value:
+                    args.append(datetime.date.fromisoformat(value))
+                    conditions.append(f"skin_trend_period_start {op} date_trunc($2, ${len(args)}::date)::date")
+
+            trends_sql = f"""
+                SELECT * FROM skin_trend_tbl
+                WHERE {" AND ".join(conditions)}
+                ORDER BY skin_trend_period_start
             """
-            rows = await conn.fetch(select_sql, user_key)
 
-            result = [
-                {
-                    "acne_date": str(row["analysis_photo_date"]),
-                    "acne_count": row["analysis_photo_acne_count"],
-                    "acne_area": float(row["analysis_photo_acne_area"]),
-                    "redness_area": float(row["analysis_photo_redness_area"]),
+            def stats(row, metric):
+                days = row["skin_trend_days"]
+                return {
+                    "mean": round(row[f"skin_trend_{metric}_sum"] / days, 2),
+                    "min": row[f"skin_trend_{metric}_min"],
+                    "max": row[f"skin_trend_{metric}_max"],
+                }
+
+            async def load():
+                rows = await self._fetch(trends_sql, *args)
+                return {
+                    "period": period,
+                    "trends": [
+                        {
+                            "period_start": str(row["skin_trend_period_start"]),
+                            "days": row["skin_trend_days"],
+                            "acne_count": stats(row, "acne_count"),
+                            "acne_area": stats(row, "acne_area"),
+                            "redness_area": stats(row, "redness_area"),
+                        }
+                        for row in rows
+                    ],
                 }
-                for row in rows
-            ]
 
-            return JSONResponse({"data": result}, headers=h)
+            field = f"trends:{period}:{from_date or ''}:{to_date or ''}"
+            return JSONResponse(await self._cached(user_key, field, load), headers=h)
 
+        except ValueError as e:
+            return JSONResponse({"result": "날짜 형식 오류: " + str(e)}, status_code=400, headers=h)
         except Exception as e:
             print("[ERROR]", e)
-            return JSONResponse({"result": "DB 오류: " + str(e)}, headers=h)
+            return JSONResponse({"result": "DB 오류: " + str(e)}, status_code=500, headers=h)
+
+    ############################################################################################################################
+
+    async def get_dashboard(self, user_key: str, date: str = None, if_none_match: str = None):
+        """
+        날짜 목록, 날짜별 수치, 선택한 날짜의 이미지 URL, 피부 타입을 한 번의 쿼리로 조회
+        ETag는 마지막 분석 시각 + 기록 수 + 피부 타입으로 만들고, 같으면 목록을 만들지 않고 304
+        """
+        h = {
+            "Access-Control-Allow-Origin": "*",
+            "Access-Control-Allow-Credentials": "true",
+        }
+        conn = None
+        try:
+            date_obj = datetime.date.fromisoformat(date) if date else None
+            client_version = self._dashboard_version(if_none_match, date)
+
+            conn = await self.db.acquire()
+
+            dashboard_sql = """
+                WITH stamp AS (
+                    SELECT max(analysis_photo_updated_at) AS last_updated, count(*) AS days
+                    FROM analysis_photo_tbl
+                    WHERE analysis_photo_user_key = $1
+                ),
+                skin AS (
+                    SELECT (SELECT survey_skin_type FROM survey_tbl WHERE survey_user_key = $1 LIMIT 1) AS skin_type
+                ),
+                version AS (
+                    SELECT md5(concat_ws('|', stamp.last_updated, stamp.days, skin.skin_type)) AS version, skin.skin_type
+                    FROM stamp, skin
+                )
+                SELECT version.version, version.skin_type,
+                    CASE WHEN version.version IS DISTINCT FROM $3 THEN (
+                        SELECT coalesce(json_agg(json_build_object(
+                            'acne_date', analysis_photo_date,
+                            'acne_count', analysis_photo_acne_count,
+                            'acne_area', analysis_photo_acne_area,
+                            'redness_area', analysis_photo_redness_area,
+                            'acne_url', CASE WHEN analysis_photo_date = $2 THEN analysis_photo_acne_url END,
+                            'redness_url', CASE WHEN analysis_photo_date = $2 THEN analysis_photo_redness_url END
+                        ) ORDER BY analysis_photo_date DESC), '[]'::json)
+                        FROM analysis_photo_tbl
+                        WHERE analysis_photo_user_key = $1
+                    ) END AS days
+                FROM version
+            """
+            row = await conn.fetchrow(dashboard_sql, user_key, date_obj, client_version)
+
+            h["ETag"] = f'"{row["version"]}.{date or ""}"'
+            # 매번 재검증하되 바뀌지 않았으면 304
+            h["Cache-Control"] = "private, no-cache"
+            if row["days"] is None:
+                return Response(status_code=304, headers=h)
+
+            data, selected = [], None
+            for day in json.loads(row["days"]):
+                acne_url, redness_url = day.pop("acne_url"), day.pop("redness_url")
+                if acne_url or redness_url:
+                    selected = {
+                        "date": day["acne_date"],
+                        "analysis_photo_acne_url": acne_url,
+                        "analysis_photo_redness_url": redness_url,
+                        "analysis_photo_acne_thumb_url": variant_url(acne_url, "thumb"),
+                        "analysis_photo_redness_thumb_url": variant_url(redness_url, "thumb"),
+                    }
+                data.append({
+                    "acne_date": day["acne_date"],
+                    "acne_count": day["acne_count"],
+                    "acne_area": float(day["acne_area"]),
+                    "redness_area": float(day["redness_area"]),
+                })
+
+            return JSONResponse(
+                {
+                    "dates": [day["acne_date"] for day in data],
+                    "data": data,
+                    "selected": selected,
+                    "skin_type": row["skin_type"],
+                },
+                headers=h,
+            )
+
+        except ValueError as e:
+            return JSONResponse({"result": "날짜 형식 오류: " + str(e)}, status_code=400, headers=h)
+        except Exception as e:
+            print("[ERROR]", e)
+            traceback.print_exc()
+            return JSONResponse({"result": "DB 오류: " + str(e)}, status_code=500, headers=h)
         finally:
             if conn:
-                await conn.close()
+                await self.db.release(conn)
+
+    def _dashboard_version(self, if_none_match: str, date: str):
+        # If-None-Match: "버전.날짜" - 같은 날짜에 대해 받은 ETag일 때만 버전 비교
+        if not if_none_match:
+            return None
+        for tag in if_none_match.split(","):
+            tag = tag.strip().removeprefix("W/").strip('"')
+            version, _, tag_date = tag.partition(".")
+            if tag_date == (date or ""):
+                return version
+        return None
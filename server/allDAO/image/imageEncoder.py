@@ -0,0 +1,104 @@
+import os
+import time
+import asyncio
+import cv2
+
+# jpeg | webp
+IMAGE_FORMAT = os.getenv("IMAGE_FORMAT", "jpeg")
+IMAGE_QUALITY = int(os.getenv("IMAGE_QUALITY", "85"))
+# 썸네일 긴 변 길이 (캘린더/비교 화면용)
+THUMBNAIL_SIZE = int(os.getenv("THUMBNAIL_SIZE", "320"))
+THUMBNAIL_QUALITY = int(os.getenv("THUMBNAIL_QUALITY", "75"))
+
+VARIANTS = ("full", "thumb")
+FORMATS = {
+    "jpeg": (".jpg", "image/jpeg", cv2.IMWRITE_JPEG_QUALITY),
+    "webp": (".webp", "image/webp", cv2.IMWRITE_WEBP_QUALITY),
+}
+
+
+def encode_image(image, fmt: str, quality: int) -> bytes:
+    ext, _, quality_flag = FORMATS[fmt]
+    success, encoded = cv2.imencode(ext, image, [quality_flag, quality])
+    if not success:
+        raise RuntimeError(f"이미지를 {fmt}로 인코딩하지 못했습니다.")
+    return encoded.tobytes()
+
+
+def make_thumbnail(image, size: int):
+    h, w = image.shape[:2]
+    scale = size / max(h, w)
+    if scale >= 1:
+        return image
+    return cv2.resize(image, (max(1, round(w * scale)), max(1, round(h * scale))), interpolation=cv2.INTER_AREA)
+
+
+def variant_name(stem: str, variant: str, ext: str) -> str:
+    return f"{stem}.{variant}{ext}"
+
+
+def variant_url(url: str, variant: str) -> str:
+    """
+    저장된 full URL에서 요청한 variant URL 계산
+    variant 이름 규칙 이전에 저장된 이미지({uuid}.jpg)는 썸네일이 없으므로 원본 URL 그대로 반환
+    """
+    if not url or variant == "full" or ".full." not in url:
+        return url
+    return url.replace(".full.", f".{variant}.", 1)
+
+
+class ImageEncoder:
+    """
+    분석 결과 이미지를 full + thumb 두 가지로 한 번에 인코딩 (워커 스레드에서 실행)
+    """
+    def __init__(self, fmt: str = IMAGE_FORMAT, quality: int = IMAGE_QUALITY,
+                 thumb_size: int = THUMBNAIL_SIZE, thumb_quality: int = THUMBNAIL_QUALITY):
+        if fmt not in FORMATS:
+            raise ValueError(f"지원하지 않는 IMAGE_FORMAT: {fmt} ({'|'.join(FORMATS)})")
+        self.fmt = fmt
+        self.quality = quality
+        self.thumb_size = thumb_size
+        self.thumb_quality = thumb_quality
+        self.ext, self.content_type, _ = FORMATS[fmt]
+
+        # 지표
+        self.images = 0
+        self.total_encode_ms = 0.0
+        self.total_bytes = {variant: 0 for variant in VARIANTS}
+
+    def encode_variants(self, image) -> dict:
+        return {
+            "full": encode_image(image, self.fmt, self.quality),
+            "thumb": encode_image(make_thumbnail(image, self.thumb_size), self.fmt, self.thumb_quality),
+        }
+
+    def _encode_all(self, images):
+        start = time.perf_counter()
+        encoded = [self.encode_variants(image) for image in images]
+        elapsed_ms = (time.perf_counter() - start) * 1000
+
+        self.images += len(images)
+        self.total_encode_ms += elapsed_ms
+        for variants in encoded:
+            for variant, data in variants.items():
+                self.total_bytes[variant] += len(data)
+        return encoded
+
+    async def encode(self, *images):
+        """
+        이미지별 {"full": bytes, "thumb": bytes} 리스트
+        """
+        return await asyncio.to_thread(self._encode_all, images)
+
+    def get_stats(self):
+        return {
+            "format": self.fmt,
+            "quality": self.quality,
+            "thumb_size": self.thumb_size,
+            "images": self.images,
+            "avg_encode_ms": round(self.total_encode_ms / self.images, 2) if self.images else None,
+            "avg_bytes": {
+                variant: round(total / self.images) if self.images else None
+                for variant, total in self.total_bytes.items()
+            },
+        }
@@ -0,0 +1,174 @@
+import io
+import os
+import time
+import hashlib
+import asyncio
+import resource
+import numpy as np
+import cv2
+from PIL import Image
+
+# 업로드 최대 크기 (바이트)
+MAX_UPLOAD_BYTES = int(os.getenv("MAX_UPLOAD_BYTES", str(15 * 1024 * 1024)))
+# 디코딩 후 긴 변이 최소 이 정도는 남도록 축소 배율을 고름 (얼굴 검출 최대 해상도)
+INGEST_TARGET_SIZE = int(os.getenv("INGEST_TARGET_SIZE", "1280"))
+CHUNK_SIZE = 1024 * 1024
+# JPEG 헤더(EXIF/SOF)만 읽기 위한 앞부분 길이
+PROBE_BYTES = 256 * 1024
+
+# libjpeg 축소 디코딩 (배율이 큰 것부터)
+REDUCED_FLAGS = [
+    (8, cv2.IMREAD_REDUCED_COLOR_8),
+    (4, cv2.IMREAD_REDUCED_COLOR_4),
+    (2, cv2.IMREAD_REDUCED_COLOR_2),
+]
+
+
+class PhotoTooLargeError(Exception):
+    """업로드 크기가 MAX_UPLOAD_BYTES를 넘는 경우"""
+
+
+class PhotoDecodeError(Exception):
+    """이미지로 디코딩할 수 없는 경우"""
+
+
+def probe_photo(data):
+    """
+    헤더만 읽어 (가로, 세로, EXIF orientation) 반환, 실패하면 None
+    """
+    try:
+        with Image.open(io.BytesIO(data[:PROBE_BYTES])) as img:
+            width, height = img.size
+            orientation = img.getexif().get(0x0112, 1)
+        return width, height, orientation
+    except Exception:
+        return None
+
+
+def apply_orientation(frame, orientation):
+    if orientation == 2:
+        return cv2.flip(frame, 1)
+    if orientation == 3:
+        return cv2.rotate(frame, cv2.ROTATE_180)
+    if orientation == 4:
+        return cv2.flip(frame, 0)
+    if orientation == 5:
+        return cv2.transpose(frame)
+    if orientation == 6:
+        return cv2.rotate(frame, cv2.ROTATE_90_CLOCKWISE)
+    if orientation == 7:
+        return cv2.flip(cv2.transpose(frame), -1)
+    if orientation == 8:
+        return cv2.rotate(frame, cv2.ROTATE_90_COUNTERCLOCKWISE)
+    return frame
+
+
+def decode_photo(data, target_size: int = INGEST_TARGET_SIZE):
+    """
+    목표 해상도에 맞춰 축소 디코딩 + EXIF 회전 적용, (frame, 디코딩 정보) 반환
+    """
+    start = time.perf_counter()
+    probe = probe_photo(data)
+
+    flag, factor = cv2.IMREAD_COLOR, 1
+    if probe is None:
+        orientation = None  # 헤더를 못 읽으면 OpenCV 기본 EXIF 처리에 맡김
+    else:
+        width, height, orientation = probe
+        for reduced_factor, reduced_flag in REDUCED_FLAGS:
+            if max(width, height) // reduced_factor >= target_size:
+                flag, factor = reduced_flag, reduced_factor
+                break
+        flag |= cv2.IMREAD_IGNORE_ORIENTATION
+
+    # np.frombuffer는 업로드 버퍼를 복사하지 않음
+    frame = cv2.imdecode(np.frombuffer(data, np.uint8), flag)
+    if frame is None:
+        raise PhotoDecodeError("이미지를 디코딩하지 못했습니다.")
+    if orientation is not None:
+        frame = apply_orientation(frame, orientation)
+
+    info = {
+        "decode_ms": round((time.perf_counter() - start) * 1000, 2),
+        "raw_bytes": len(data),
+        "scale": factor,
+        "shape": list(frame.shape),
+        # 디코딩 시점에 동시에 살아 있는 버퍼 = 압축 원본 + 프레임 1장
+        "peak_bytes": len(data) + frame.nbytes,
+    }
+    return frame, info
+
+
+class PendingPhoto:
+    """
+    압축 원본을 들고 있다가 디코딩하면 바로 놓는 래퍼
+    (재시도 클로저 / 작업 큐처럼 여러 곳이 참조해도 추론 중에는 디코딩된 프레임만 남음)
+    """
+    def __init__(self, data):
+        self.data = data
+        self.frame = None
+
+    def release(self):
+        self.data = None
+        self.frame = None
+
+
+class PhotoIngest:
+    """
+    UploadFile을 크기 제한을 걸며 스트리밍으로 읽고, 스레드에서 축소 디코딩
+    """
+    def __init__(self, max_bytes: int = MAX_UPLOAD_BYTES, target_size: int = INGEST_TARGET_SIZE):
+        self.max_bytes = max_bytes
+        self.target_size = target_size
+
+        # 지표
+        self.photos = 0
+        self.rejected = 0
+        self.total_decode_ms = 0.0
+        self.max_decode_ms = 0.0
+        self.max_peak_bytes = 0
+
+    async def read(self, photo):
+        """
+        (압축 원본 bytearray, sha256 hex) - 해시는 스트리밍하면서 함께 계산
+        """
+        if photo.size is not None and photo.size > self.max_bytes:
+            self.rejected += 1
+            raise PhotoTooLargeError(f"사진은 최대 {self.max_bytes // (1024 * 1024)}MB까지 업로드할 수 있습니다.")
+
+        data = bytearray()
+        digest = hashlib.sha256()
+        while chunk := await photo.read(CHUNK_SIZE):
+            if len(data) + len(chunk) > self.max_bytes:
+                self.rejected += 1
+                raise PhotoTooLargeError(f"사진은 최대 {self.max_bytes // (1024 * 1024)}MB까지 업로드할 수 있습니다.")
+            data += chunk
+            digest.update(chunk)
+        return data, digest.hexdigest()
+
+    async def decode(self, data):
+        frame, info = await asyncio.to_thread(decode_photo, data, self.target_size)
+
+        self.photos += 1
+        self.total_decode_ms += info["decode_ms"]
+        self.max_decode_ms = max(self.max_decode_ms, info["decode_ms"])
+        self.max_peak_bytes = max(self.max_peak_bytes, info["peak_bytes"])
+        print(f"[DEBUG] 사진 디코딩: {info}")
+        return frame
+
+    async def decode_pending(self, photo: PendingPhoto):
+        # 한 번만 디코딩 (503 후 재시도는 프레임을 그대로 씀)
+        if photo.frame is None:
+            photo.frame = await self.decode(photo.data)
+            photo.data = None
+        return photo.frame
+
+    def get_stats(self) -> dict:
+        return {
+            "photos": self.photos,
+            "rejected_too_large": self.rejected,
+            "avg_decode_ms": round(self.total_decode_ms / self.photos, 2) if self.photos else 0.0,
+            "max_decode_ms": self.max_decode_ms,
+            "max_peak_bytes": self.max_peak_bytes,
+            "max_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        }
@@ -0,0 +1,17 @@
+import os
+import cv2
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".webp")
+
+
+def load_images(folder, limit=None):
+    """
+    폴더의 이미지를 이름순으로 BGR 프레임 목록으로 읽음
+    """
+    names = sorted(name for name in os.listdir(folder) if name.lower().endswith(IMAGE_EXTENSIONS))
+    images = []
+    for name in names[:limit]:
+        image = cv2.imread(os.path.join(folder, name), cv2.IMREAD_COLOR)
+        if image is not None:
+            images.append(image)
+    return images
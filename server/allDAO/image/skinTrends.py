@@ -0,0 +1,134 @@
+"""
+skin_trend_tbl 주/월 집계 - regImage가 업서트와 같은 트랜잭션에서 갱신, 기존 기록은 backfill로 재구성
+
+사용법 (server 디렉터리에서):
+    python -m allDAO.image.skinTrends backfill
+    python -m allDAO.image.skinTrends backfill --user-key <user_key>
+"""
+import asyncio
+import argparse
+
+TREND_PERIODS = ("week", "month")
+
+TREND_COLUMNS = """
+    skin_trend_user_key, skin_trend_period, skin_trend_period_start, skin_trend_days,
+    skin_trend_acne_count_sum, skin_trend_acne_count_min, skin_trend_acne_count_max,
+    skin_trend_acne_area_sum, skin_trend_acne_area_min, skin_trend_acne_area_max,
+    skin_trend_redness_area_sum, skin_trend_redness_area_min, skin_trend_redness_area_max
+"""
+
+# 새 날짜 추가: 해당 주/월 행에 한 건을 더함 (없으면 생성)
+ADD_DAY_SQL = f"""
+    INSERT INTO skin_trend_tbl AS t ({TREND_COLUMNS})
+    SELECT $1::text, p.period, date_trunc(p.period, $2::date)::date, 1,
+           $3::integer, $3::integer, $3::integer,
+           $4::float8, $4::float8, $4::float8,
+           $5::float8, $5::float8, $5::float8
+    FROM unnest($6::text[]) AS p(period)
+    ON CONFLICT (skin_trend_user_key, skin_trend_period, skin_trend_period_start) DO UPDATE
+    SET skin_trend_days = t.skin_trend_days + 1,
+        skin_trend_acne_count_sum = t.skin_trend_acne_count_sum + EXCLUDED.skin_trend_acne_count_sum,
+        skin_trend_acne_count_min = least(t.skin_trend_acne_count_min, EXCLUDED.skin_trend_acne_count_min),
+        skin_trend_acne_count_max = greatest(t.skin_trend_acne_count_max, EXCLUDED.skin_trend_acne_count_max),
+        skin_trend_acne_area_sum = t.skin_trend_acne_area_sum + EXCLUDED.skin_trend_acne_area_sum,
+        skin_trend_acne_area_min = least(t.skin_trend_acne_area_min, EXCLUDED.skin_trend_acne_area_min),
+        skin_trend_acne_area_max = greatest(t.skin_trend_acne_area_max, EXCLUDED.skin_trend_acne_area_max),
+        skin_trend_redness_area_sum = t.skin_trend_redness_area_sum + EXCLUDED.skin_trend_redness_area_sum,
+        skin_trend_redness_area_min = least(t.skin_trend_redness_area_min, EXCLUDED.skin_trend_redness_area_min),
+        skin_trend_redness_area_max = greatest(t.skin_trend_redness_area_max, EXCLUDED.skin_trend_redness_area_max),
+        skin_trend_updated_at = now()
+"""
+
+# analysis_photo_tbl 에서 집계를 다시 계산 - {where}로 범위 지정 (한 사용자의 주/월 하나 ~ 전체)
+REBUILD_SQL = f"""
+    INSERT INTO skin_trend_tbl ({TREND_COLUMNS})
+    SELECT a.analysis_photo_user_key, p.period, date_trunc(p.period, a.analysis_photo_date)::date, count(*),
+           sum(a.analysis_photo_acne_count), min(a.analysis_photo_acne_count), max(a.analysis_photo_acne_count),
+           sum(a.analysis_photo_acne_area), min(a.analysis_photo_acne_area), max(a.analysis_photo_acne_area),
+           sum(a.analysis_photo_redness_area), min(a.analysis_photo_redness_area), max(a.analysis_photo_redness_area)
+    FROM analysis_photo_tbl a, unnest($1::text[]) AS p(period)
+    WHERE a.analysis_photo_acne_count IS NOT NULL
+      AND a.analysis_photo_acne_area IS NOT NULL
+      AND a.analysis_photo_redness_area IS NOT NULL
+      {{where}}
+    GROUP BY 1, 2, 3
+    ON CONFLICT (skin_trend_user_key, skin_trend_period, skin_trend_period_start) DO UPDATE
+    SET skin_trend_days = EXCLUDED.skin_trend_days,
+        skin_trend_acne_count_sum = EXCLUDED.skin_trend_acne_count_sum,
+        skin_trend_acne_count_min = EXCLUDED.skin_trend_acne_count_min,
+        skin_trend_acne_count_max = EXCLUDED.skin_trend_acne_count_max,
+        skin_trend_acne_area_sum = EXCLUDED.skin_trend_acne_area_sum,
+        skin_trend_acne_area_min = EXCLUDED.skin_trend_acne_area_min,
+        skin_trend_acne_area_max = EXCLUDED.skin_trend_acne_area_max,
+        skin_trend_redness_area_sum = EXCLUDED.skin_trend_redness_area_sum,
+        skin_trend_redness_area_min = EXCLUDED.skin_trend_redness_area_min,
+        skin_trend_redness_area_max = EXCLUDED.skin_trend_redness_area_max,
+        skin_trend_updated_at = now()
+"""
+
+# 교체된 날짜가 속한 주/월만 - 날짜 범위 조건으로 (user, date) 인덱스 사용
+REBUILD_DAY_SQL = REBUILD_SQL.format(where="""
+      AND a.analysis_photo_user_key = $2
+      AND a.analysis_photo_date >= least(date_trunc('week', $3::date), date_trunc('month', $3::date))::date
+      AND a.analysis_photo_date < greatest(date_trunc('week', $3::date) + interval '1 week',
+                                           date_trunc('month', $3::date) + interval '1 month')::date
+      AND date_trunc(p.period, a.analysis_photo_date) = date_trunc(p.period, $3::date)
+""")
+
+REBUILD_USER_SQL = REBUILD_SQL.format(where="AND a.analysis_photo_user_key = $2")
+REBUILD_ALL_SQL = REBUILD_SQL.format(where="")
+
+
+async def update_skin_trends(conn, user_key: str, date_obj, acne_count, acne_area, redness_area, replaced: bool):
+    """
+    regImage 업서트 직후 같은 트랜잭션에서 호출
+    추가된 날짜는 증분 반영, 교체된 날짜는 min/max를 되돌릴 수 없으므로 해당 주/월만 다시 계산
+    """
+    # 같은 사용자의 동시 업로드가 서로의 증분을 덮어쓰지 않도록 사용자 단위로 직렬화
+    await conn.execute("SELECT pg_advisory_xact_lock(hashtext($1))", user_key)
+    if replaced or any(value is None for value in (acne_count, acne_area, redness_area)):
+        await conn.execute(REBUILD_DAY_SQL, list(TREND_PERIODS), user_key, date_obj)
+    else:
+        await conn.execute(
+            ADD_DAY_SQL, user_key, date_obj, int(acne_count), float(acne_area), float(redness_area), list(TREND_PERIODS)
+        )
+
+
+async def backfill(conn, user_key: str = None) -> int:
+    """
+    기존 analysis_photo_tbl 전체(또는 한 사용자)로 집계를 다시 만듦 - GROUP BY 한 문장, 기존 집계는 교체
+    """
+    async with conn.transaction():
+        if user_key is None:
+            await conn.execute("DELETE FROM skin_trend_tbl")
+            status = await conn.execute(REBUILD_ALL_SQL, list(TREND_PERIODS))
+        else:
+            await conn.execute("DELETE FROM skin_trend_tbl WHERE skin_trend_user_key = $1", user_key)
+            status = await conn.execute(REBUILD_USER_SQL, list(TREND_PERIODS), user_key)
+    # "INSERT 0 N"
+    return int(status.split()[-1])
+
+
+async def run(user_key: str):
+    from allDAO.db.dbPool import DBPool
+
+    db = DBPool(min_size=1, max_size=1)
+    await db.open()
+    conn = await db.acquire()
+    try:
+        print(f"[Backfill] 집계 {await backfill(conn, user_key)}행")
+    finally:
+        await db.release(conn)
+        await db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("command", choices=["backfill"])
+    parser.add_argument("--user-key", help="한 사용자만 다시 계산")
+    args = parser.parse_args()
+    asyncio.run(run(args.user_key))
+
+
+if __name__ == "__main__":
+    main()
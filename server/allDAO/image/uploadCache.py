@@ -0,0 +1,133 @@
+import os
+import json
+import asyncio
+from allDAO.cache.lruCache import LRUCache
+
+# L1은 Redis가 없는 단일 프로세스에서만, 재시도 구간만 덮도록 짧게 / Redis는 워커 간 공유용으로 길게
+UPLOAD_CACHE_SIZE = int(os.getenv("UPLOAD_CACHE_SIZE", "1024"))
+UPLOAD_CACHE_L1_TTL = int(os.getenv("UPLOAD_CACHE_L1_TTL", "60"))
+UPLOAD_CACHE_TTL = int(os.getenv("UPLOAD_CACHE_TTL", str(24 * 60 * 60)))
+# 다른 워커가 같은 사진을 처리 중일 때 결과를 기다리는 최대 시간
+UPLOAD_LOCK_TTL = int(os.getenv("UPLOAD_LOCK_TTL", "120"))
+UPLOAD_LOCK_POLL = 0.2
+
+
+class UploadCache:
+    """
+    (user_key, date)별 마지막 업로드의 사진 해시와 응답을 저장해 같은 사진 재업로드 시 분석을 건너뜀
+    같은 사진이 동시에 들어오면 처리 중인 작업 하나의 결과를 함께 기다림
+    """
+    def __init__(self, redis_conn=None):
+        self.redis = redis_conn
+        # Redis가 있으면 다른 워커가 같은 (user, date)에 새 사진을 저장했을 수 있으므로 프로세스 캐시를 믿지 않음
+        self.l1 = LRUCache(UPLOAD_CACHE_SIZE, UPLOAD_CACHE_L1_TTL) if redis_conn is None else None
+        self.inflight = {}
+
+        # 지표
+        self.hits = 0
+        self.misses = 0
+        self.joined = 0
+
+    def _key(self, user_key: str, date: str) -> str:
+        return f"upload:{user_key}:{date}"
+
+    async def _get(self, key: str, digest: str):
+        entry = None
+        if self.l1 is not None:
+            entry = self.l1.get(key)
+        else:
+            try:
+                raw = await self.redis.get(key)
+                entry = json.loads(raw) if raw else None
+            except Exception as e:
+                print(f"[WARN] 업로드 캐시 Redis 조회 실패: {e}")
+        # 같은 날짜에 다른 사진이 올라왔다면 예전 결과는 쓰지 않음
+        if entry is None or entry["digest"] != digest:
+            return None
+        return entry["response"]
+
+    async def _set(self, key: str, digest: str, response: dict):
+        entry = {"digest": digest, "response": response}
+        if self.l1 is not None:
+            self.l1.set(key, entry)
+        else:
+            try:
+                await self.redis.set(key, json.dumps(entry), ex=UPLOAD_CACHE_TTL)
+            except Exception as e:
+                print(f"[WARN] 업로드 캐시 Redis 저장 실패: {e}")
+
+    async def _acquire_lock(self, lock_key: str) -> bool:
+        if self.redis is None:
+            return True
+        try:
+            return bool(await self.redis.set(lock_key, "1", nx=True, ex=UPLOAD_LOCK_TTL))
+        except Exception as e:
+            print(f"[WARN] 업로드 잠금 실패, 그대로 처리합니다: {e}")
+            return True
+
+    async def _release_lock(self, lock_key: str):
+        if self.redis is not None:
+            try:
+                await self.redis.delete(lock_key)
+            except Exception as e:
+                print(f"[WARN] 업로드 잠금 해제 실패: {e}")
+
+    async def _wait_other_worker(self, key: str, digest: str, lock_key: str):
+        # 다른 워커가 같은 사진을 처리 중 → 결과가 저장되거나 잠금이 풀릴 때까지 대기
+        for _ in range(int(UPLOAD_LOCK_TTL / UPLOAD_LOCK_POLL)):
+            await asyncio.sleep(UPLOAD_LOCK_POLL)
+            response = await self._get(key, digest)
+            if response is not None:
+                return response
+            if not await self.redis.exists(lock_key):
+                return None
+        return None
+
+    async def run_once(self, user_key: str, date: str, digest: str, job):
+        """
+        캐시에 같은 사진의 응답이 있으면 그대로, 없으면 job()을 한 번만 실행
+        job()은 {"status_code", "content"}를 반환하고, 성공(200) 응답만 저장
+        """
+        key = self._key(user_key, date)
+        response = await self._get(key, digest)
+        if response is not None:
+            self.hits += 1
+            return response
+
+        inflight_key = f"{key}:{digest}"
+        if inflight_key in self.inflight:
+            self.joined += 1
+            return await asyncio.shield(self.inflight[inflight_key])
+
+        self.misses += 1
+        future = asyncio.get_running_loop().create_future()
+        self.inflight[inflight_key] = future
+        lock_key = f"{inflight_key}:lock"
+        try:
+            locked = await self._acquire_lock(lock_key)
+            response = None if locked else await self._wait_other_worker(key, digest, lock_key)
+            if response is None:
+                try:
+                    response = await job()
+                    if response["status_code"] == 200:
+                        await self._set(key, digest, response)
+                finally:
+                    if locked:
+                        await self._release_lock(lock_key)
+            future.set_result(response)
+            return response
+        except BaseException as e:
+            future.set_exception(e)
+            # 함께 기다리는 요청이 없어도 "exception was never retrieved" 경고가 뜨지 않도록
+            future.exception()
+            raise
+        finally:
+            del self.inflight[inflight_key]
+
+    def get_stats(self) -> dict:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "joined_inflight": self.joined,
+            "l1_size": len(self.l1) if self.l1 is not None else None,
+        }
@@ -0,0 +1,79 @@
+import time
+import asyncio
+from collections import deque
+
+
+class BatchScheduler:
+    """
+    짧은 시간 창(window_ms) 동안 들어온 요청을 모아 run_batch 한 번으로 처리하고
+    결과를 각 호출자에게 돌려주는 마이크로 배치 스케줄러
+    """
+    def __init__(self, run_batch, window_ms: float, max_batch: int):
+        self.run_batch = run_batch
+        self.window = window_ms / 1000
+        self.max_batch = max(1, max_batch)
+        self.queue = []
+        self.timer = None
+        self.tasks = set()
+
+        # 지표
+        self.batches = 0
+        self.items = 0
+        self.max_batch_size = 0
+        self.recent_waits = deque(maxlen=1000)
+
+    async def submit(self, item):
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self.queue.append((item, future, time.perf_counter()))
+
+        if len(self.queue) >= self.max_batch:
+            self._flush()
+        elif self.timer is None:
+            self.timer = loop.call_later(self.window, self._flush)
+
+        return await future
+
+    def _flush(self):
+        if self.timer is not None:
+            self.timer.cancel()
+            self.timer = None
+
+        while self.queue:
+            batch, self.queue = self.queue[:self.max_batch], self.queue[self.max_batch:]
+            task = asyncio.create_task(self._run(batch))
+            self.tasks.add(task)
+            task.add_done_callback(self.tasks.discard)
+
+    async def _run(self, batch):
+        now = time.perf_counter()
+        self.batches += 1
+        self.items += len(batch)
+        self.max_batch_size = max(self.max_batch_size, len(batch))
+        self.recent_waits.extend((now - enqueued) * 1000 for _, _, enqueued in batch)
+
+        try:
+            results = await self.run_batch([item for item, _, _ in batch])
+        except Exception as e:
+            for _, future, _ in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (_, future, _), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+    def get_stats(self) -> dict:
+        waits = sorted(self.recent_waits)
+        return {
+            "window_ms": self.window * 1000,
+            "max_batch": self.max_batch,
+            "batches": self.batches,
+            "items": self.items,
+            "avg_batch_size": round(self.items / self.batches, 2) if self.batches else 0.0,
+            "max_batch_size": self.max_batch_size,
+            "avg_queue_wait_ms": round(sum(waits) / len(waits), 2) if waits else 0.0,
+            "p95_queue_wait_ms": round(waits[min(len(waits) - 1, int(len(waits) * 0.95))], 2) if waits else 0.0,
+            "max_queue_wait_ms": round(waits[-1], 2) if waits else 0.0,
+        }
@@ -0,0 +1,141 @@
+import os
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from allDAO.model.modelRegistry import initialize_models
+from allDAO.check_face.check_face import Check_face
+from allDAO.inference.batchScheduler import BatchScheduler
+
+# 추론 워커 프로세스 수 / 워커가 모두 바쁠 때 추가로 기다릴 수 있는 요청 수
+INFERENCE_WORKERS = int(os.getenv("INFERENCE_WORKERS", "1"))
+INFERENCE_QUEUE_SIZE = int(os.getenv("INFERENCE_QUEUE_SIZE", "4"))
+INFERENCE_RETRY_AFTER = int(os.getenv("INFERENCE_RETRY_AFTER", "3"))
+# 동시 업로드를 모으는 시간 창 / 한 번에 워커로 보낼 최대 프레임 수
+INFERENCE_BATCH_WINDOW_MS = float(os.getenv("INFERENCE_BATCH_WINDOW_MS", "20"))
+INFERENCE_MAX_BATCH = int(os.getenv("INFERENCE_MAX_BATCH", "8"))
+
+
+class InferenceBusyError(Exception):
+    """워커와 대기열이 모두 가득 찬 경우"""
+
+
+class InferenceWorkerLostError(InferenceBusyError):
+    """워커 프로세스가 죽어 풀을 다시 만드는 중인 경우 - 해당 배치만 503"""
+
+
+# --- 워커 프로세스 전역 (프로세스마다 모델 1세트) ---
+_check_face = None
+
+
+def _init_worker():
+    global _check_face
+    registry = initialize_models()
+    _check_face = Check_face(registry)
+
+
+def _analyze_batch(frames):
+    return _check_face.check_faces(frames)
+
+
+def _model_stats():
+    return initialize_models().get_stats()
+
+
+class InferenceExecutor:
+    """
+    /upload/ 추론 파이프라인(얼굴 검출 → 홍조 → CLAHE → 여드름)을 이벤트 루프 밖 프로세스 풀에서 실행
+    """
+    def __init__(
+        self,
+        max_workers: int = INFERENCE_WORKERS,
+        max_queue: int = INFERENCE_QUEUE_SIZE,
+        batch_window_ms: float = INFERENCE_BATCH_WINDOW_MS,
+        max_batch: int = INFERENCE_MAX_BATCH,
+    ):
+        self.max_workers = max_workers
+        # 워커 하나가 한 번에 max_batch 장까지 처리
+        self.max_pending = max_workers * max(1, max_batch) + max_queue
+        self.scheduler = BatchScheduler(self._run_batch, batch_window_ms, max_batch)
+        self.retry_after = INFERENCE_RETRY_AFTER
+        self.pending = 0
+        self.rejected = 0
+        self.worker_stats = {}
+        self.restarts = 0
+        self.pool = None
+        self.restart_lock = asyncio.Lock()
+
+    async def _create_pool(self):
+        # torch 스레드 상태를 물려받지 않도록 spawn으로 워커 생성
+        pool = ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+        )
+        # 요청을 받기 전에 워커를 띄워 모델 로드/워밍업을 끝내 둠
+        loop = asyncio.get_running_loop()
+        results = await asyncio.gather(
+            *[loop.run_in_executor(pool, _model_stats) for _ in range(self.max_workers)]
+        )
+        self.worker_stats = {stats["pid"]: stats for stats in results}
+        return pool
+
+    async def start(self):
+        self.pool = await self._create_pool()
+        print(f"✅ [Inference] 추론 워커 {self.max_workers}개 준비 완료")
+
+    async def _restart(self, broken):
+        # 같은 풀에서 실패한 배치가 여러 개여도 한 번만 다시 만듦
+        async with self.restart_lock:
+            if self.pool is not broken:
+                return
+            broken.shutdown(wait=False, cancel_futures=True)
+            self.pool = await self._create_pool()
+            self.restarts += 1
+            print(f"✅ [Inference] 추론 워커 재시작 ({self.restarts}회)")
+
+    def is_busy(self) -> bool:
+        return self.pending >= self.max_pending
+
+    async def analyze(self, frame):
+        # 이벤트 루프 스레드에서만 호출되므로 카운터에 락이 필요 없음
+        if self.is_busy():
+            self.rejected += 1
+            raise InferenceBusyError(f"추론 대기열이 가득 찼습니다. ({self.pending}/{self.max_pending})")
+
+        self.pending += 1
+        try:
+            return await self.scheduler.submit(frame)
+        finally:
+            self.pending -= 1
+
+    async def _run_batch(self, frames):
+        loop = asyncio.get_running_loop()
+        pool = self.pool
+        try:
+            return await loop.run_in_executor(pool, _analyze_batch, frames)
+        except BrokenProcessPool as e:
+            # 워커가 OOM/네이티브 크래시로 죽으면 풀 전체가 깨짐 → 새 풀로 교체하고 이 배치는 재시도하도록 503
+            print(f"[ERROR] 추론 워커 종료: {e}")
+            try:
+                await self._restart(pool)
+            except Exception as restart_error:
+                # 재시작에 실패하면 풀이 그대로 깨져 있으므로 다음 배치가 다시 시도
+                print(f"[ERROR] 추론 워커 재시작 실패: {restart_error}")
+            raise InferenceWorkerLostError("추론 워커를 다시 시작했습니다. 잠시 후 다시 시도해주세요.") from e
+
+    def get_stats(self) -> dict:
+        return {
+            "workers": self.max_workers,
+            "max_pending": self.max_pending,
+            "pending": self.pending,
+            "rejected": self.rejected,
+            "restarts": self.restarts,
+            "batching": self.scheduler.get_stats(),
+            "worker_models": list(self.worker_stats.values()),
+        }
+
+    def shutdown(self):
+        if self.pool:
+            self.pool.shutdown(wait=True, cancel_futures=True)
+            self.pool = None
@@ -0,0 +1,283 @@
+import os
+import json
+import time
+import asyncio
+from allDAO.cache.lruCache import LRUCache
+
+# redis | memory (memory는 단일 프로세스 개발/벤치용)
+UPLOAD_JOB_BACKEND = os.getenv("UPLOAD_JOB_BACKEND", "redis")
+UPLOAD_JOB_QUEUE_SIZE = int(os.getenv("UPLOAD_JOB_QUEUE_SIZE", "100"))
+# 작업 상태/사진 보관 시간
+UPLOAD_JOB_TTL = int(os.getenv("UPLOAD_JOB_TTL", "3600"))
+# 꺼낸 작업의 임대 시간 - 단계가 바뀔 때마다 연장, 지나면 워커가 죽은 것으로 보고 다시 큐에 넣음
+UPLOAD_JOB_LEASE = int(os.getenv("UPLOAD_JOB_LEASE", "300"))
+# 임대 만료로 다시 넣는 최대 횟수 - 넘으면 실패 처리 (매번 워커를 죽이는 사진 방지)
+UPLOAD_JOB_MAX_ATTEMPTS = int(os.getenv("UPLOAD_JOB_MAX_ATTEMPTS", "3"))
+REDIS_QUEUE_KEY = "upload:jobs"
+# queued → decoding → analyzing → saving → done | failed
+TERMINAL_STAGES = ("done", "failed")
+REDIS_PROCESSING_KEY = "upload:jobs:processing"
+REDIS_LEASES_KEY = "upload:jobs:leases"
+
+# 대기열 길이 확인과 등록을 한 번에 - 동시 등록이 queue_size를 넘지 않도록
+ENQUEUE_IF_ROOM = """
+if redis.call('LLEN', KEYS[1]) >= tonumber(ARGV[1]) then
+    return 0
+end
+redis.call('SET', KEYS[2], ARGV[2], 'EX', ARGV[5])
+redis.call('SET', KEYS[3], ARGV[3], 'EX', ARGV[5])
+redis.call('LPUSH', KEYS[1], ARGV[4])
+return 1
+"""
+
+# 처리 목록에서 꺼낸 작업을 다시 대기열 맨 앞으로 (LREM이 성공한 한 곳만 실행)
+REQUEUE = """
+if redis.call('LREM', KEYS[1], 1, ARGV[1]) == 0 then
+    return 0
+end
+redis.call('ZREM', KEYS[3], ARGV[3])
+redis.call('RPUSH', KEYS[2], ARGV[2])
+return 1
+"""
+
+# 처리 목록/임대/사진 정리 (완료 또는 포기) - 임대가 끝나 다른 워커에게 넘어간 작업이면 건드리지 않음
+FINISH = """
+if redis.call('LREM', KEYS[1], 1, ARGV[1]) == 0 then
+    return 0
+end
+redis.call('ZREM', KEYS[2], ARGV[2])
+redis.call('DEL', KEYS[3])
+return 1
+"""
+
+
+class JobQueueFullError(Exception):
+    pass
+
+
+class MemoryJobStore:
+    """
+    프로세스 내 작업 큐 + 상태 저장소 (Redis 없이 로컬에서 사용)
+    """
+    def __init__(self, queue_size: int = UPLOAD_JOB_QUEUE_SIZE, ttl: int = UPLOAD_JOB_TTL):
+        self.queue = asyncio.Queue(queue_size)
+        self.states = LRUCache(queue_size * 10, ttl)
+        # {job_id: 구독 중인 watch()별 Event 집합} - 구독이 끝나면 제거
+        self.changed = {}
+
+    async def enqueue(self, job_id: str, meta: dict, data: bytes, state: dict):
+        if self.queue.full():
+            raise JobQueueFullError("업로드 작업 대기열이 가득 찼습니다.")
+        await self.put_state(job_id, state)
+        self.queue.put_nowait((job_id, meta, data))
+
+    async def dequeue(self, timeout: float):
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    async def finish(self, job_id: str):
+        pass
+
+    async def reap(self) -> int:
+        # 프로세스가 죽으면 큐도 함께 사라지므로 되살릴 작업이 없음
+        return 0
+
+    async def get_state(self, job_id: str):
+        return self.states.get(job_id)
+
+    async def put_state(self, job_id: str, state: dict):
+        self.states.set(job_id, state)
+        for event in self.changed.get(job_id, ()):
+            event.set()
+
+    async def watch(self, job_id: str, timeout: float):
+        """
+        상태가 바뀔 때마다 상태를, timeout 동안 변화가 없으면 None을 반환 (SSE keep-alive 용)
+        """
+        event = asyncio.Event()
+        watchers = self.changed.setdefault(job_id, set())
+        watchers.add(event)
+        try:
+            yield await self.get_state(job_id)
+            while True:
+                try:
+                    await asyncio.wait_for(event.wait(), timeout)
+                except asyncio.TimeoutError:
+                    yield None
+                    continue
+                event.clear()
+                yield await self.get_state(job_id)
+        finally:
+            watchers.discard(event)
+            if not watchers and self.changed.get(job_id) is watchers:
+                del self.changed[job_id]
+
+    async def depth(self) -> int:
+        return self.queue.qsize()
+
+    async def close(self):
+        pass
+
+
+class RedisJobStore:
+    """
+    Redis 작업 큐 - 여러 uvicorn 워커/서버가 같은 큐를 소비
+    상태는 job:{id}, 사진은 job:{id}:photo, 상태 변경 알림은 job:{id}:events 채널
+    꺼낸 작업은 처리 목록(upload:jobs:processing) + 임대(upload:jobs:leases)에 두고 finish()에서 정리
+    임대가 끝난 작업은 reap()이 다시 큐에 넣거나 실패 처리
+    """
+    def __init__(
+        self,
+        redis_conn,
+        queue_size: int = UPLOAD_JOB_QUEUE_SIZE,
+        ttl: int = UPLOAD_JOB_TTL,
+        lease: int = UPLOAD_JOB_LEASE,
+        max_attempts: int = UPLOAD_JOB_MAX_ATTEMPTS,
+    ):
+        # 사진 바이트를 그대로 저장하므로 decode_responses=False 연결을 사용
+        self.redis = redis_conn
+        self.queue_size = queue_size
+        self.ttl = ttl
+        self.lease = lease
+        self.max_attempts = max_attempts
+        self.enqueue_if_room = redis_conn.register_script(ENQUEUE_IF_ROOM)
+        self.requeue = redis_conn.register_script(REQUEUE)
+        self.finish_script = redis_conn.register_script(FINISH)
+        # 이 프로세스가 꺼낸 작업의 처리 목록 항목 {job_id: payload}
+        self.claimed = {}
+
+        # 지표
+        self.requeued = 0
+        self.abandoned = 0
+
+    async def enqueue(self, job_id: str, meta: dict, data: bytes, state: dict):
+        added = await self.enqueue_if_room(
+            keys=[REDIS_QUEUE_KEY, f"job:{job_id}", f"job:{job_id}:photo"],
+            args=[
+                self.queue_size,
+                json.dumps(state, ensure_ascii=False),
+                bytes(data),
+                json.dumps({"job_id": job_id, **meta}),
+                self.ttl,
+            ],
+        )
+        if not added:
+            raise JobQueueFullError("업로드 작업 대기열이 가득 찼습니다.")
+
+    async def dequeue(self, timeout: float):
+        # 꺼내는 즉시 처리 목록으로 옮겨 워커가 죽어도 작업이 남음
+        payload = await self.redis.blmove(REDIS_QUEUE_KEY, REDIS_PROCESSING_KEY, timeout, "RIGHT", "LEFT")
+        if payload is None:
+            return None
+        meta = json.loads(payload)
+        job_id = meta.pop("job_id")
+        meta.pop("attempts", None)
+        self.claimed[job_id] = payload
+        await self.redis.zadd(REDIS_LEASES_KEY, {job_id: time.time() + self.lease})
+        # 사진은 finish()까지 남겨 둠 - TTL로 사라졌다면 data는 None
+        data = await self.redis.get(f"job:{job_id}:photo")
+        return job_id, meta, data
+
+    async def finish(self, job_id: str):
+        payload = self.claimed.pop(job_id, None)
+        if payload is None:
+            return
+        await self.finish_script(
+            keys=[REDIS_PROCESSING_KEY, REDIS_LEASES_KEY, f"job:{job_id}:photo"], args=[payload, job_id]
+        )
+
+    async def reap(self) -> int:
+        """
+        임대가 끝난 작업을 다시 큐에 넣고, max_attempts를 넘으면 실패 상태로 정리 - 처리한 수 반환
+        """
+        now = time.time()
+        reaped = 0
+        for payload in await self.redis.lrange(REDIS_PROCESSING_KEY, 0, -1):
+            meta = json.loads(payload)
+            job_id = meta["job_id"]
+            expires = await self.redis.zscore(REDIS_LEASES_KEY, job_id)
+            if expires is None:
+                # BLMOVE 직후 임대를 기록하기 전에 죽은 경우 - 지금부터 임대 시간을 줌
+                await self.redis.zadd(REDIS_LEASES_KEY, {job_id: now + self.lease}, nx=True)
+                continue
+            if expires > now:
+                continue
+
+            state = await self.get_state(job_id)
+            if state is not None and state["stage"] in TERMINAL_STAGES:
+                # 결과는 저장했지만 정리 전에 죽은 경우
+                await self.finish_script(
+                    keys=[REDIS_PROCESSING_KEY, REDIS_LEASES_KEY, f"job:{job_id}:photo"], args=[payload, job_id]
+                )
+                continue
+
+            attempts = meta.get("attempts", 0) + 1
+            if attempts >= self.max_attempts:
+                removed = await self.finish_script(
+                    keys=[REDIS_PROCESSING_KEY, REDIS_LEASES_KEY, f"job:{job_id}:photo"], args=[payload, job_id]
+                )
+                if removed:
+                    state = state or {"job_id": job_id}
+                    state.update(
+                        stage="failed", status_code=500, updated_at=now,
+                        result={"result": "작업을 처리하던 서버가 여러 번 중단되어 분석하지 못했습니다."},
+                    )
+                    await self.put_state(job_id, state)
+                    self.abandoned += 1
+                    reaped += 1
+                continue
+
+            requeued = await self.requeue(
+                keys=[REDIS_PROCESSING_KEY, REDIS_QUEUE_KEY, REDIS_LEASES_KEY],
+                args=[payload, json.dumps({**meta, "attempts": attempts}), job_id],
+            )
+            if requeued:
+                state = state or {"job_id": job_id}
+                state.update(stage="queued", updated_at=now)
+                await self.put_state(job_id, state)
+                self.requeued += 1
+                reaped += 1
+        return reaped
+
+    async def get_state(self, job_id: str):
+        raw = await self.redis.get(f"job:{job_id}")
+        return json.loads(raw) if raw else None
+
+    async def put_state(self, job_id: str, state: dict):
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.set(f"job:{job_id}", json.dumps(state, ensure_ascii=False), ex=self.ttl)
+            pipe.publish(f"job:{job_id}:events", state["stage"])
+            # 이 프로세스가 처리 중인 작업이면 단계가 바뀔 때마다 임대 연장
+            if job_id in self.claimed:
+                pipe.zadd(REDIS_LEASES_KEY, {job_id: time.time() + self.lease}, xx=True)
+            await pipe.execute()
+
+    async def watch(self, job_id: str, timeout: float):
+        pubsub = self.redis.pubsub()
+        # 상태를 읽기 전에 구독해야 그 사이의 변경을 놓치지 않음
+        await pubsub.subscribe(f"job:{job_id}:events")
+        try:
+            yield await self.get_state(job_id)
+            while True:
+                message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=timeout)
+                yield await self.get_state(job_id) if message else None
+        finally:
+            await pubsub.unsubscribe()
+            await pubsub.aclose()
+
+    async def depth(self) -> int:
+        return await self.redis.llen(REDIS_QUEUE_KEY)
+
+    async def close(self):
+        await self.redis.aclose()
+
+
+def create_job_store(redis_config: dict, kind: str = UPLOAD_JOB_BACKEND):
+    if kind == "memory":
+        return MemoryJobStore()
+    if kind == "redis":
+        import redis.asyncio as aioredis
+        return RedisJobStore(aioredis.Redis(**redis_config))
+    raise ValueError(f"지원하지 않는 UPLOAD_JOB_BACKEND: {kind} (redis|memory)")
@@ -0,0 +1,177 @@
+import os
+import time
+import uuid
+import asyncio
+from collections import deque
+from allDAO.jobs.jobStore import JobQueueFullError, TERMINAL_STAGES
+from allDAO.image.photoIngest import PendingPhoto
+
+# 이 프로세스에서 동시에 처리할 업로드 작업 수
+UPLOAD_JOB_WORKERS = int(os.getenv("UPLOAD_JOB_WORKERS", "2"))
+# SSE keep-alive 간격(초)
+UPLOAD_JOB_HEARTBEAT = float(os.getenv("UPLOAD_JOB_HEARTBEAT", "15"))
+# 임대가 끝난(처리하던 워커가 죽은) 작업을 확인하는 주기(초)
+UPLOAD_JOB_REAP_INTERVAL = float(os.getenv("UPLOAD_JOB_REAP_INTERVAL", "30"))
+DEQUEUE_TIMEOUT = 1
+
+
+class UploadJobs:
+    """
+    /upload/ 비동기 모드: 사진을 큐에 넣고 job_id를 바로 반환, 워커가 process(meta, photo, report)로 처리
+    photo는 PendingPhoto - 디코딩 직후 압축 원본을 놓음
+    report(stage)로 단계가 바뀔 때마다 상태를 저장해 /jobs/{id}, SSE로 전달
+    """
+    def __init__(self, store, process, workers: int = UPLOAD_JOB_WORKERS):
+        self.store = store
+        self.process = process
+        self.workers = workers
+        self.tasks = []
+
+        # 지표
+        self.submitted = 0
+        self.rejected = 0
+        self.completed = 0
+        self.failed = 0
+        self.reaped = 0
+        self.recent_waits = deque(maxlen=1000)
+        self.recent_runs = deque(maxlen=1000)
+
+    async def submit(self, meta: dict, data: bytes) -> dict:
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        state = {"job_id": job_id, "stage": "queued", "created_at": now, "updated_at": now}
+        try:
+            await self.store.enqueue(job_id, {**meta, "enqueued_at": now}, data, state)
+        except JobQueueFullError:
+            self.rejected += 1
+            raise
+        self.submitted += 1
+        return state
+
+    async def get(self, job_id: str):
+        return await self.store.get_state(job_id)
+
+    async def watch(self, job_id: str, heartbeat: float = UPLOAD_JOB_HEARTBEAT):
+        """
+        단계가 바뀔 때마다 상태, heartbeat 동안 변화가 없으면 None - 완료/실패 상태 후 종료
+        """
+        watcher = self.store.watch(job_id, heartbeat)
+        try:
+            async for state in watcher:
+                yield state
+                if state is not None and state["stage"] in TERMINAL_STAGES:
+                    break
+        finally:
+            await watcher.aclose()
+
+    async def _update(self, job_id: str, stage: str, **fields):
+        state = await self.store.get_state(job_id) or {"job_id": job_id}
+        state.update(fields, stage=stage, updated_at=time.time())
+        await self.store.put_state(job_id, state)
+
+    async def _finish(self, job_id: str):
+        # 실패해도 결과 상태는 이미 저장됨 - 남은 처리 목록/사진은 reap이 정리
+        try:
+            await self.store.finish(job_id)
+        except Exception as e:
+            print(f"[WARN] 업로드 작업 {job_id} 정리 실패: {e}")
+
+    async def _already_finished(self, job_id: str) -> bool:
+        try:
+            state = await self.store.get_state(job_id)
+        except Exception:
+            return False
+        return state is not None and state["stage"] in TERMINAL_STAGES
+
+    async def _run(self, job_id: str, meta: dict, photo):
+        started = time.time()
+        self.recent_waits.append((started - meta.pop("enqueued_at", started)) * 1000)
+
+        # 임대가 끝나 다시 들어온 작업을 이전 워커가 늦게라도 끝냈다면 다시 처리하지 않음
+        if await self._already_finished(job_id):
+            await self._finish(job_id)
+            return
+
+        async def report(stage: str, **fields):
+            await self._update(job_id, stage, **fields)
+
+        try:
+            if photo is None:
+                raise RuntimeError("사진 보관 시간이 지나 작업을 처리할 수 없습니다.")
+            result = await self.process(meta, photo, report)
+            stage = "done" if result["status_code"] == 200 else "failed"
+            await self._update(job_id, stage, status_code=result["status_code"], result=result["content"])
+        except asyncio.CancelledError:
+            await self._update(job_id, "failed", status_code=503, result={"result": "서버가 종료되어 작업이 중단되었습니다."})
+            await self._finish(job_id)
+            raise
+        except Exception as e:
+            print(f"[ERROR] 업로드 작업 {job_id} 실패: {e}")
+            stage = "failed"
+            await self._update(job_id, stage, status_code=500, result={"result": "분석 중 오류: " + str(e)})
+        await self._finish(job_id)
+
+        if stage == "done":
+            self.completed += 1
+        else:
+            self.failed += 1
+        self.recent_runs.append((time.time() - started) * 1000)
+
+    async def _worker(self):
+        while True:
+            try:
+                item = await self.store.dequeue(DEQUEUE_TIMEOUT)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"[WARN] 업로드 작업 큐 조회 실패: {e}")
+                await asyncio.sleep(DEQUEUE_TIMEOUT)
+                continue
+            if item is not None:
+                # 큐에서 꺼낸 bytes는 PendingPhoto만 들고 있도록 (디코딩 후 바로 해제)
+                job_id, meta, data = item
+                photo = None if data is None else PendingPhoto(data)
+                del item, data
+                await self._run(job_id, meta, photo)
+
+    async def _reaper(self, interval: float):
+        # 처리하던 워커가 죽어 임대가 끝난 작업을 다시 큐에 넣거나 실패 처리
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                self.reaped += await self.store.reap()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"[WARN] 업로드 작업 임대 확인 실패: {e}")
+
+    def start(self, reap_interval: float = UPLOAD_JOB_REAP_INTERVAL):
+        self.tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+        self.tasks.append(asyncio.create_task(self._reaper(reap_interval)))
+
+    async def shutdown(self):
+        for task in self.tasks:
+            task.cancel()
+        await asyncio.gather(*self.tasks, return_exceptions=True)
+        self.tasks = []
+        await self.store.close()
+
+    async def get_stats(self):
+        def avg(values):
+            return round(sum(values) / len(values), 2) if values else None
+
+        try:
+            depth = await self.store.depth()
+        except Exception:
+            depth = None
+        return {
+            "workers": self.workers,
+            "queue_depth": depth,
+            "submitted": self.submitted,
+            "rejected": self.rejected,
+            "completed": self.completed,
+            "failed": self.failed,
+            "reaped": self.reaped,
+            "avg_queue_wait_ms": avg(self.recent_waits),
+            "avg_run_ms": avg(self.recent_runs),
+        }
@@ -0,0 +1,40 @@
+"""
+.pt 가중치를 ONNX Runtime / OpenVINO용으로 export
+
+사용법 (server 디렉터리에서):
+    python -m allDAO.model.exportModels --backend onnx
+    python -m allDAO.model.exportModels --backend openvino --models acne redness
+"""
+import os
+import argparse
+from ultralytics import YOLO
+from allDAO.model.modelRegistry import MODEL_DIR, MODEL_SPECS
+from allDAO.model.modelBackend import weights_for
+
+
+def export_model(name: str, backend: str, model_dir: str = MODEL_DIR) -> str:
+    spec = MODEL_SPECS[name]
+    pt_path = os.path.join(model_dir, spec["weights"])
+
+    # 마이크로 배치 / coarse(640)·full(1280) 검출을 위해 배치와 해상도 축을 dynamic으로 export
+    exported = YOLO(pt_path).export(format=backend, imgsz=spec["imgsz"], dynamic=True)
+
+    expected = weights_for(pt_path, backend)
+    assert os.path.abspath(str(exported)) == os.path.abspath(expected), f"예상 경로와 다릅니다: {exported}"
+    print(f"✅ [Export] {name}: {pt_path} → {exported}")
+    return str(exported)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--backend", required=True, choices=["onnx", "openvino"])
+    parser.add_argument("--models", nargs="+", default=list(MODEL_SPECS), choices=list(MODEL_SPECS))
+    parser.add_argument("--model-dir", default=MODEL_DIR)
+    args = parser.parse_args()
+
+    for name in args.models:
+        export_model(name, args.backend, args.model_dir)
+
+
+if __name__ == "__main__":
+    main()
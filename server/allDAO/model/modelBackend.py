@@ -0,0 +1,99 @@
+import os
+import glob
+from functools import partial
+from contextlib import contextmanager
+
+# 추론 백엔드: torch(.pt) | onnx(ONNX Runtime) | openvino
+BACKENDS = ("torch", "onnx", "openvino")
+INFERENCE_BACKEND = os.getenv("INFERENCE_BACKEND", "torch")
+# 정밀도: fp32 | int8 (int8은 quantizeModels로 만든 ONNX, ONNX Runtime으로 실행)
+PRECISIONS = ("fp32", "int8")
+
+
+def backend_for(name: str, default: str = None) -> str:
+    """
+    명시한 default > 모델별 백엔드 (예: ACNE_MODEL_BACKEND=onnx) > INFERENCE_BACKEND
+    """
+    backend = default or os.getenv(f"{name.upper()}_MODEL_BACKEND", INFERENCE_BACKEND)
+    assert backend in BACKENDS, f"지원하지 않는 추론 백엔드입니다: {backend}"
+    return backend
+
+
+def precision_for(name: str, default: str = None) -> str:
+    """
+    명시한 default > 모델별 정밀도 (예: ACNE_MODEL_PRECISION=int8) > fp32
+    """
+    precision = default or os.getenv(f"{name.upper()}_MODEL_PRECISION", "fp32")
+    assert precision in PRECISIONS, f"지원하지 않는 정밀도입니다: {precision}"
+    return precision
+
+
+def weights_for(pt_path: str, backend: str, precision: str = "fp32") -> str:
+    """
+    .pt 경로 → 해당 백엔드로 export된 가중치 경로 (ultralytics export 기본 이름 규칙)
+    """
+    stem = os.path.splitext(pt_path)[0]
+    if precision == "int8":
+        assert backend == "onnx", "int8 모델은 onnx 백엔드로만 실행합니다."
+        return f"{stem}_int8.onnx"
+    if backend == "onnx":
+        return f"{stem}.onnx"
+    if backend == "openvino":
+        return f"{stem}_openvino_model"
+    return pt_path
+
+
+def device_for(backend: str) -> str:
+    if backend == "torch":
+        import torch
+        return "0" if torch.cuda.is_available() else "cpu"
+    # ONNX Runtime / OpenVINO는 CPU 노드 기준
+    return "cpu"
+
+
+@contextmanager
+def torch_threads(num_threads: int):
+    """
+    블록 안에서만 torch intra-op 스레드 수를 바꿈 (프로세스 전역 설정이므로 끝나면 되돌림)
+    """
+    import torch
+    previous = torch.get_num_threads()
+    torch.set_num_threads(max(1, num_threads))
+    try:
+        yield
+    finally:
+        torch.set_num_threads(previous)
+
+
+def _runtime_holder(autobackend, attr: str):
+    # ultralytics 버전에 따라 런타임 객체가 AutoBackend 또는 AutoBackend.backend 에 있음
+    for holder in (getattr(autobackend, "backend", None), autobackend):
+        if holder is not None and attr in vars(holder):
+            return holder
+    raise RuntimeError(f"ultralytics AutoBackend에서 {attr}를 찾지 못했습니다.")
+
+
+def limit_session_threads(autobackend, backend: str, weights: str, num_threads: int):
+    """
+    ultralytics가 만든 ONNX Runtime 세션 / OpenVINO 컴파일 모델을 intra-op 스레드 수를 지정해 다시 만듦
+    (해당 모델에만 적용, torch는 세션 단위 설정이 없어 torch_threads 사용)
+    """
+    num_threads = max(1, num_threads)
+    if backend == "onnx":
+        import onnxruntime
+        holder = _runtime_holder(autobackend, "session")
+        options = onnxruntime.SessionOptions()
+        options.intra_op_num_threads = num_threads
+        holder.session = onnxruntime.InferenceSession(weights, options, providers=holder.session.get_providers())
+    elif backend == "openvino":
+        import openvino as ov
+        holder = _runtime_holder(autobackend, "ov_compiled_model")
+        core = ov.Core()
+        ov_model = core.read_model(glob.glob(os.path.join(weights, "*.xml"))[0])
+        shape = holder.ov_compiled_model.input().get_partial_shape()
+        if ov_model.input().get_partial_shape() != shape:
+            ov_model.reshape(shape)
+        config = {"PERFORMANCE_HINT": "LATENCY", "INFERENCE_NUM_THREADS": num_threads}
+        # 입력 크기가 바뀌면 다시 컴파일하는 버전도 같은 설정을 쓰도록 함께 교체
+        holder.compile_model = partial(core.compile_model, device_name="CPU", config=config)
+        holder.ov_compiled_model = holder.compile_model(ov_model)
@@ -0,0 +1,130 @@
+import os
+import time
+import resource
+import numpy as np
+from contextlib import contextmanager, nullcontext
+from ultralytics import YOLO
+from allDAO.model.modelBackend import (
+    backend_for, precision_for, weights_for, device_for, torch_threads, limit_session_threads,
+)
+
+# 가중치 파일 위치 (배포 서버 기본 경로)
+MODEL_DIR = os.getenv("MODEL_DIR", "/home/skinview/allDAO")
+
+# 모델 이름 → 가중치 경로 / 워밍업 해상도
+MODEL_SPECS = {
+    "face": {"weights": "check_face/check_face_best.pt", "imgsz": 1280},
+    "acne": {"weights": "analysis_image/analysis_best.pt", "imgsz": 640},
+    "redness": {"weights": "analysis_image/redness_best.pt", "imgsz": 640},
+}
+
+
+class ModelRegistry:
+    """
+    프로세스당 한 번만 YOLO 모델을 로드하고 워밍업까지 끝내 두는 레지스트리
+    """
+    def __init__(
+        self,
+        model_dir: str = MODEL_DIR,
+        warmup: bool = True,
+        backend: str = None,
+        precision: str = None,
+        names: list = None,
+    ):
+        self.model_dir = model_dir
+        # backend / precision을 주면 모든 모델에 적용 (parity·양자화 비교용), 없으면 모델별 환경변수
+        self.backend = backend
+        self.precision = precision
+        self.models = {}
+        self.devices = {}
+        self.stats = {}
+
+        for name in names or MODEL_SPECS:
+            self._load(name, MODEL_SPECS[name], warmup)
+
+    def _load(self, name: str, spec: dict, warmup: bool):
+        precision = precision_for(name, self.precision)
+        # int8 가중치는 ONNX Runtime 전용
+        backend = "onnx" if precision == "int8" else backend_for(name, self.backend)
+        path = weights_for(os.path.join(self.model_dir, spec["weights"]), backend, precision)
+        device = device_for(backend)
+
+        start = time.perf_counter()
+        model = YOLO(path)
+        load_ms = (time.perf_counter() - start) * 1000
+
+        # 첫 요청이 fuse / 메모리 할당 비용을 떠안지 않도록 더미 이미지로 한 번 추론
+        warmup_ms = None
+        if warmup:
+            start = time.perf_counter()
+            self._predict_dummy(model, spec["imgsz"], device)
+            warmup_ms = (time.perf_counter() - start) * 1000
+
+        self.models[name] = model
+        self.devices[name] = device
+        self.stats[name] = {
+            "backend": backend,
+            "precision": precision,
+            "device": device,
+            "weights": path,
+            "load_ms": round(load_ms, 2),
+            "warmup_ms": round(warmup_ms, 2) if warmup_ms is not None else None,
+        }
+        print(f"[INFO] 모델 로드 완료: {name} (load {load_ms:.1f}ms, warmup {warmup_ms or 0:.1f}ms)")
+
+    def get(self, name: str):
+        return self.models[name]
+
+    def get_device(self, name: str) -> str:
+        return self.devices[name]
+
+    @staticmethod
+    def _predict_dummy(model, imgsz: int, device: str):
+        dummy = np.zeros((imgsz, imgsz, 3), dtype=np.uint8)
+        model.predict(source=dummy, imgsz=imgsz, save=False, verbose=False, device=device)
+
+    def set_session_threads(self, names, num_threads: int):
+        """
+        ONNX Runtime / OpenVINO 모델의 intra-op 스레드 수를 세션 단위로 지정 (다른 모델에는 영향 없음)
+        """
+        for name in names:
+            stats = self.stats[name]
+            if stats["backend"] == "torch":
+                continue
+            model, imgsz = self.models[name], MODEL_SPECS[name]["imgsz"]
+            # 세션은 첫 predict 때 만들어짐
+            if model.predictor is None:
+                self._predict_dummy(model, imgsz, stats["device"])
+            limit_session_threads(model.predictor.model, stats["backend"], stats["weights"], num_threads)
+            self._predict_dummy(model, imgsz, stats["device"])
+            stats["intra_op_threads"] = num_threads
+
+    @contextmanager
+    def torch_threads(self, names, num_threads: int):
+        """
+        names 중 torch 모델이 있으면 블록 안에서만 torch 스레드 수를 바꿈 (얼굴 검출 등 블록 밖은 그대로)
+        """
+        torch_models = any(self.stats[name]["backend"] == "torch" for name in names)
+        with torch_threads(num_threads) if torch_models else nullcontext():
+            yield
+
+    def get_stats(self) -> dict:
+        return {
+            "pid": os.getpid(),
+            # 리눅스 기준 KB 단위 최대 RSS
+            "max_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+            "models": self.stats,
+        }
+
+
+model_registry = None
+
+
+def initialize_models():
+    global model_registry
+
+    if model_registry is None:
+        print("🚀 [Model] 모델 레지스트리를 초기화합니다.")
+        model_registry = ModelRegistry()
+
+    return model_registry
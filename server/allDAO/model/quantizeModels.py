@@ -0,0 +1,106 @@
+"""
+여드름 / 홍조 모델의 INT8 정적 양자화 (ONNX Runtime, 로컬 얼굴 crop 폴더로 calibration)
+
+사용법 (server 디렉터리에서):
+    python -m allDAO.model.quantizeModels --crops ./face_crops
+    python -m allDAO.model.quantizeModels --crops ./face_crops --models acne --limit 200
+
+결과 가중치는 <이름>_int8.onnx 로 저장되고, ACNE_MODEL_PRECISION=int8 / REDNESS_MODEL_PRECISION=int8 로 선택
+"""
+import os
+import argparse
+import numpy as np
+import cv2
+import onnx
+import onnxruntime as ort
+from onnxruntime.quantization import CalibrationDataReader, QuantFormat, QuantType, quantize_static
+from allDAO.model.modelRegistry import MODEL_DIR, MODEL_SPECS
+from allDAO.model.modelBackend import weights_for
+from allDAO.model.exportModels import export_model
+from allDAO.image.iPPC import Preprocess_img
+from allDAO.image.sampleImages import load_images
+
+QUANTIZABLE_MODELS = ("acne", "redness")
+
+
+def letterbox(image, size):
+    """
+    ultralytics 추론 전처리와 같은 방식: 비율 유지 리사이즈 + 114 패딩 → RGB, CHW, 0~1
+    """
+    h, w = image.shape[:2]
+    scale = min(size / h, size / w)
+    new_w, new_h = round(w * scale), round(h * scale)
+    resized = cv2.resize(image, (new_w, new_h), interpolation=cv2.INTER_LINEAR)
+
+    top, left = (size - new_h) // 2, (size - new_w) // 2
+    padded = np.full((size, size, 3), 114, dtype=np.uint8)
+    padded[top:top + new_h, left:left + new_w] = resized
+
+    blob = padded[:, :, ::-1].transpose(2, 0, 1).astype(np.float32) / 255.0
+    return blob[None]
+
+
+class CropCalibrationReader(CalibrationDataReader):
+    def __init__(self, crops, input_name, size, transform=None):
+        self.samples = iter(
+            {input_name: letterbox(transform(crop) if transform else crop, size)} for crop in crops
+        )
+
+    def get_next(self):
+        return next(self.samples, None)
+
+
+def quantize_model(name: str, crops, model_dir: str = MODEL_DIR) -> str:
+    spec = MODEL_SPECS[name]
+    pt_path = os.path.join(model_dir, spec["weights"])
+    fp32_path = weights_for(pt_path, "onnx")
+    int8_path = weights_for(pt_path, "onnx", "int8")
+
+    if not os.path.exists(fp32_path):
+        export_model(name, "onnx", model_dir)
+
+    input_name = ort.InferenceSession(fp32_path, providers=["CPUExecutionProvider"]).get_inputs()[0].name
+    # 여드름 모델은 CLAHE/화이트밸런스가 적용된 crop을 입력으로 받음
+    transform = Preprocess_img.preprocess if name == "acne" else None
+    reader = CropCalibrationReader(crops, input_name, spec["imgsz"], transform)
+
+    # Conv만 INT8로, 박스 디코딩/NMS 전 후처리는 FP32로 남겨 좌표 정밀도 유지
+    quantize_static(
+        fp32_path,
+        int8_path,
+        reader,
+        quant_format=QuantFormat.QDQ,
+        op_types_to_quantize=["Conv"],
+        per_channel=True,
+        activation_type=QuantType.QUInt8,
+        weight_type=QuantType.QInt8,
+    )
+
+    # ultralytics가 읽는 메타데이터(names, stride, task, imgsz)를 FP32 모델에서 복사
+    fp32_model = onnx.load(fp32_path)
+    int8_model = onnx.load(int8_path)
+    del int8_model.metadata_props[:]
+    int8_model.metadata_props.extend(fp32_model.metadata_props)
+    onnx.save(int8_model, int8_path)
+
+    print(f"✅ [Quantize] {name}: {fp32_path} → {int8_path} (calibration {len(crops)}장)")
+    return int8_path
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--crops", required=True, help="calibration용 얼굴 crop 폴더")
+    parser.add_argument("--models", nargs="+", default=list(QUANTIZABLE_MODELS), choices=list(QUANTIZABLE_MODELS))
+    parser.add_argument("--limit", type=int, default=300, help="calibration에 쓸 최대 crop 수")
+    parser.add_argument("--model-dir", default=MODEL_DIR)
+    args = parser.parse_args()
+
+    crops = load_images(args.crops, args.limit)
+    assert crops, f"{args.crops} 에 이미지가 없습니다."
+
+    for name in args.models:
+        quantize_model(name, crops, args.model_dir)
+
+
+if __name__ == "__main__":
+    main()
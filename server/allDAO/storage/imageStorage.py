@@ -0,0 +1,153 @@
+import os
+import uuid
+import asyncio
+import datetime
+from abc import ABC, abstractmethod
+from urllib.parse import urlparse
+
+# azure | local
+IMAGE_STORAGE = os.getenv("IMAGE_STORAGE", "azure")
+# local 백엔드: 파일 저장 위치와 FastAPI 정적 라우트
+LOCAL_STORAGE_DIR = os.getenv("LOCAL_STORAGE_DIR", "/home/skinview/images")
+LOCAL_STORAGE_ROUTE = os.getenv("LOCAL_STORAGE_ROUTE", "/images")
+# 클라이언트가 접근할 공개 주소 (예: http://서버:8000/images) - DB에 저장되므로 절대 URL이어야 함
+LOCAL_STORAGE_URL = os.getenv("LOCAL_STORAGE_URL")
+
+
+class ImageStorage(ABC):
+    """
+    분석 이미지 저장소 인터페이스 - container/name 단위로 저장, 삭제, 목록, 공개 URL 제공
+    """
+    @abstractmethod
+    async def put(self, container: str, name: str, data: bytes, content_type: str = "image/jpeg"):
+        ...
+
+    @abstractmethod
+    async def delete(self, container: str, name: str):
+        # 이미 없는 파일이어도 예외 없이 성공 처리 (삭제 재시도가 안전하도록)
+        ...
+
+    @abstractmethod
+    def list(self, container: str):
+        # (파일 이름, 마지막 수정 시각(UTC))을 내는 비동기 제너레이터
+        ...
+
+    @abstractmethod
+    def url(self, container: str, name: str) -> str:
+        ...
+
+    def name_from_url(self, container: str, url: str) -> str:
+        # DB에 저장된 URL에서 파일 이름 복원 (쿼리스트링 제거)
+        return url.split(f"/{container}/")[-1].split("?")[0]
+
+    async def close(self):
+        pass
+
+
+class AzureImageStorage(ImageStorage):
+    def __init__(self, connect_str: str = None):
+        # 사용하는 백엔드일 때만 import
+        from azure.storage.blob.aio import BlobServiceClient
+        from azure.storage.blob import ContentSettings
+
+        connect_str = connect_str or os.getenv("AZURE_STORAGE_CONNECTION_STRING")
+        assert connect_str, "AZURE_STORAGE_CONNECTION_STRING 환경변수를 설정하세요."
+
+        # 비동기 클라이언트 - 업로드 중에도 이벤트 루프가 다른 요청을 처리
+        self.client = BlobServiceClient.from_connection_string(connect_str)
+        self.content_settings = ContentSettings
+
+    async def put(self, container, name, data, content_type="image/jpeg"):
+        blob_client = self.client.get_blob_client(container=container, blob=name)
+        await blob_client.upload_blob(
+            data, overwrite=True, content_settings=self.content_settings(content_type=content_type)
+        )
+
+    async def delete(self, container, name):
+        from azure.core.exceptions import ResourceNotFoundError
+        try:
+            await self.client.get_blob_client(container=container, blob=name).delete_blob()
+        except ResourceNotFoundError:
+            pass
+
+    async def list(self, container):
+        async for blob in self.client.get_container_client(container).list_blobs():
+            yield blob.name, blob.last_modified
+
+    def url(self, container, name):
+        return f"https://{self.client.account_name}.blob.core.windows.net/{container}/{name}"
+
+    async def close(self):
+        await self.client.close()
+
+
+class LocalImageStorage(ImageStorage):
+    """
+    로컬 디스크 저장소 - 임시 파일에 쓴 뒤 os.replace로 교체해서 읽는 쪽이 반쯤 쓰인 파일을 보지 않음
+    파일은 main.py에서 LOCAL_STORAGE_ROUTE에 StaticFiles로 마운트
+    """
+    def __init__(self, root: str = LOCAL_STORAGE_DIR, base_url: str = LOCAL_STORAGE_URL):
+        # 앱이 DB에 저장된 URL을 그대로 불러오므로 상대 경로(/images)는 허용하지 않음
+        assert base_url and urlparse(base_url).scheme in ("http", "https") and urlparse(base_url).netloc, \
+            "IMAGE_STORAGE=local 이면 LOCAL_STORAGE_URL을 절대 URL로 설정하세요. (예: http://서버:8000/images)"
+        self.root = os.path.abspath(root)
+        self.base_url = base_url.rstrip("/")
+        os.makedirs(self.root, exist_ok=True)
+
+    def _path(self, container, name):
+        path = os.path.abspath(os.path.join(self.root, container, name))
+        if os.path.dirname(path) != os.path.join(self.root, container):
+            raise ValueError(f"잘못된 파일 이름: {container}/{name}")
+        return path
+
+    def _write(self, container, name, data):
+        path = self._path(container, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        try:
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def _remove(self, container, name):
+        try:
+            os.remove(self._path(container, name))
+        except FileNotFoundError:
+            pass
+
+    def _scan(self, container):
+        directory = os.path.join(self.root, container)
+        if not os.path.isdir(directory):
+            return []
+        return [
+            (entry.name, datetime.datetime.fromtimestamp(entry.stat().st_mtime, datetime.timezone.utc))
+            for entry in os.scandir(directory)
+            if entry.is_file() and not entry.name.endswith(".tmp")
+        ]
+
+    async def put(self, container, name, data, content_type="image/jpeg"):
+        await asyncio.to_thread(self._write, container, name, data)
+
+    async def delete(self, container, name):
+        await asyncio.to_thread(self._remove, container, name)
+
+    async def list(self, container):
+        for item in await asyncio.to_thread(self._scan, container):
+            yield item
+
+    def url(self, container, name):
+        return f"{self.base_url}/{container}/{name}"
+
+
+def create_storage(kind: str = IMAGE_STORAGE) -> ImageStorage:
+    if kind == "azure":
+        return AzureImageStorage()
+    if kind == "local":
+        return LocalImageStorage()
+    raise ValueError(f"지원하지 않는 IMAGE_STORAGE: {kind} (azure|local)")
@@ -0,0 +1,70 @@
+"""
+CPU에서 한 장씩 처리하는 기존 경로와 마이크로 배치 경로의 처리량 비교
+배치 결과가 한 장씩 처리한 결과와 하나라도 다르면 실패 (exit 1)
+
+사용법 (server 디렉터리에서):
+    python -m bench.bench_batching --images ./samples --batch 8 --rounds 3
+"""
+import sys
+import time
+import argparse
+from allDAO.model.modelRegistry import ModelRegistry
+from allDAO.check_face.check_face import Check_face
+from allDAO.image.sampleImages import load_images
+
+
+def run_sequential(check_face, frames):
+    return [check_face.check_face(frame.copy()) for frame in frames]
+
+
+def run_batched(check_face, frames, batch):
+    results = []
+    for i in range(0, len(frames), batch):
+        results.extend(check_face.check_faces([frame.copy() for frame in frames[i:i + batch]]))
+    return results
+
+
+def summarize(results):
+    return [None if r is None else (r["acne_count"], round(r["acne_area"], 2), round(r["redness_area"], 2)) for r in results]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--images", required=True, help="샘플 사진 폴더")
+    parser.add_argument("--batch", type=int, default=8)
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args()
+
+    frames = load_images(args.images)
+    assert frames, f"{args.images} 에 이미지가 없습니다."
+
+    check_face = Check_face(ModelRegistry())
+
+    timings = {"sequential": [], "batched": []}
+    for _ in range(args.rounds):
+        start = time.perf_counter()
+        sequential = run_sequential(check_face, frames)
+        timings["sequential"].append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        batched = run_batched(check_face, frames, args.batch)
+        timings["batched"].append(time.perf_counter() - start)
+
+    print(f"\n이미지 {len(frames)}장, batch={args.batch}, rounds={args.rounds}")
+    for mode, values in timings.items():
+        best = min(values)
+        print(f"{mode:>10}: {best:.3f}s  ({len(frames) / best:.2f} img/s)")
+    print(f"speedup: {min(timings['sequential']) / min(timings['batched']):.2f}x")
+
+    # 배치 경로가 같은 수치를 내는지 확인 (acne_count, acne_area, redness_area)
+    mismatches = [(i, a, b) for i, (a, b) in enumerate(zip(summarize(sequential), summarize(batched))) if a != b]
+    print(f"결과 불일치: {len(mismatches)}/{len(frames)}")
+    if mismatches:
+        for i, a, b in mismatches:
+            print(f"  #{i}: sequential {a} != batched {b}")
+        print("❌ 배치 결과가 한 장씩 처리한 결과와 다름")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""
+얼굴 검출 adaptive(저해상도 → 1280 fallback) 모드와 기존 1280 고정 모드의 지연/일치도 비교
+
+사용법 (server 디렉터리에서):
+    python -m bench.bench_face_detection --images ./samples
+"""
+import time
+import argparse
+import numpy as np
+from allDAO.model.modelRegistry import ModelRegistry
+from allDAO.check_face.check_face import Check_face, select_faces
+from allDAO.image.sampleImages import load_images
+
+
+def iou(a, b):
+    x1, y1 = max(a[0], b[0]), max(a[1], b[1])
+    x2, y2 = min(a[2], b[2]), min(a[3], b[3])
+    inter = max(0, x2 - x1) * max(0, y2 - y1)
+    union = (a[2] - a[0]) * (a[3] - a[1]) + (b[2] - b[0]) * (b[3] - b[1]) - inter
+    return inter / union if union > 0 else 0.0
+
+
+def primary_box(frame, detection):
+    xyxy, conf = detection
+    selected = select_faces(xyxy, conf, frame.shape, policy="largest")
+    return xyxy[selected[0]] if selected else None
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--images", required=True, help="샘플 사진 폴더")
+    parser.add_argument("--iou", type=float, default=0.5, help="같은 얼굴로 볼 최소 IoU")
+    args = parser.parse_args()
+
+    frames = load_images(args.images)
+    assert frames, f"{args.images} 에 이미지가 없습니다."
+
+    check_face = Check_face(ModelRegistry())
+
+    latencies = {"full": [], "adaptive": []}
+    agree, ious = 0, []
+    for frame in frames:
+        boxes = {}
+        for mode in latencies:
+            start = time.perf_counter()
+            detection = check_face.detect_faces([frame], mode=mode)[0]
+            latencies[mode].append((time.perf_counter() - start) * 1000)
+            boxes[mode] = primary_box(frame, detection)
+
+        full, adaptive = boxes["full"], boxes["adaptive"]
+        if full is None and adaptive is None:
+            agree += 1
+        elif full is not None and adaptive is not None:
+            overlap = iou(full, adaptive)
+            ious.append(overlap)
+            agree += overlap >= args.iou
+
+    print(f"\n이미지 {len(frames)}장")
+    for mode, values in latencies.items():
+        print(f"{mode:>9}: mean {np.mean(values):.1f}ms  p95 {np.percentile(values, 95):.1f}ms")
+    print(f"대표 얼굴 일치: {agree}/{len(frames)} (IoU >= {args.iou})")
+    if ious:
+        print(f"평균 IoU: {np.mean(ious):.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+CLAHE + 화이트밸런스 전처리: 기존 구현 대비 속도 및 픽셀 차이 확인 (허용치 초과 시 exit 1)
+기존 구현과 픽셀 단위로 같은지는 tests/test_preprocess.py 가 synthetic 입력으로 검사
+
+사용법 (server 디렉터리에서):
+    python -m bench.bench_preprocess --crops ./face_crops
+    python -m bench.bench_preprocess --synthetic 20 --size 640
+"""
+import sys
+import time
+import argparse
+import numpy as np
+import cv2
+from allDAO.image.iPPC import Preprocess_img
+from allDAO.image.sampleImages import load_images
+
+
+def reference_preprocess(photo):
+    """
+    기존 Preprocess_img 구현 (float32 LAB 복사본 + split/merge + 호출마다 CLAHE 생성)
+    """
+    lab = cv2.cvtColor(photo, cv2.COLOR_BGR2LAB).astype(np.float32)
+    avg_a = lab[:, :, 1].mean()
+    avg_b = lab[:, :, 2].mean()
+
+    lab[:, :, 1] -= ((avg_a - 128) * (lab[:, :, 0] / 255.0) * 1.1)
+    lab[:, :, 2] -= ((avg_b - 128) * (lab[:, :, 0] / 255.0) * 1.1)
+    lab = np.clip(lab, 0, 255).astype(np.uint8)
+
+    l, a, b = cv2.split(lab)
+    clahe = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8, 8))
+    cl = clahe.apply(l)
+    final = cv2.merge((cl, a, b))
+    return cv2.cvtColor(final, cv2.COLOR_LAB2BGR)
+
+
+def synthetic_crops(count, size):
+    rng = np.random.default_rng(0)
+    crops = []
+    for _ in range(count):
+        h, w = rng.integers(size // 2, size * 2, size=2)
+        noise = rng.integers(0, 256, size=(h, w, 3), dtype=np.uint8)
+        crops.append(cv2.GaussianBlur(noise, (0, 0), 5))
+    return crops
+
+
+def timed(fn, crops, rounds):
+    best = float("inf")
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for crop in crops:
+            fn(crop)
+        best = min(best, time.perf_counter() - start)
+    return best / len(crops) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--crops", help="얼굴 crop 폴더 (없으면 synthetic)")
+    parser.add_argument("--synthetic", type=int, default=20)
+    parser.add_argument("--size", type=int, default=640)
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--max-diff", type=int, default=1, help="허용 최대 픽셀 차이")
+    args = parser.parse_args()
+
+    crops = load_images(args.crops) if args.crops else synthetic_crops(args.synthetic, args.size)
+    assert crops, "전처리할 이미지가 없습니다."
+
+    max_diff, changed = 0, 0
+    total = 0
+    for crop in crops:
+        diff = cv2.absdiff(reference_preprocess(crop), Preprocess_img.preprocess(crop))
+        max_diff = max(max_diff, int(diff.max()))
+        changed += int(np.count_nonzero(diff))
+        total += diff.size
+
+    reference_ms = timed(reference_preprocess, crops, args.rounds)
+    fast_ms = timed(Preprocess_img.preprocess, crops, args.rounds)
+
+    print(f"\ncrop {len(crops)}장")
+    print(f"reference: {reference_ms:.2f}ms/crop")
+    print(f"     fast: {fast_ms:.2f}ms/crop  ({reference_ms / fast_ms:.2f}x)")
+    print(f"픽셀 차이: max {max_diff}, 다른 값 비율 {changed / total:.6f}")
+
+    if max_diff > args.max_diff:
+        print(f"❌ 최대 픽셀 차이 {max_diff} > {args.max_diff}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""
+ONNX Runtime / OpenVINO 백엔드가 torch 경로와 같은 결과를 내는지 확인 (허용 오차 초과 시 exit 1)
+
+사용법 (server 디렉터리에서, exportModels로 가중치를 먼저 export):
+    python -m bench.check_backend_parity --backend onnx --images ./samples
+"""
+import sys
+import argparse
+import numpy as np
+from allDAO.model.modelRegistry import ModelRegistry
+from allDAO.check_face.check_face import Check_face, select_faces
+from allDAO.image.sampleImages import load_images
+from bench.bench_face_detection import iou
+
+
+def match_ratio(boxes_a, boxes_b, threshold):
+    """
+    boxes_a 중 boxes_b에 IoU >= threshold로 짝지어지는 비율 (greedy)
+    """
+    if len(boxes_a) == 0 and len(boxes_b) == 0:
+        return 1.0
+    if len(boxes_a) == 0 or len(boxes_b) == 0:
+        return 0.0
+    used, matched = set(), 0
+    for a in boxes_a:
+        scores = [(iou(a, b), j) for j, b in enumerate(boxes_b) if j not in used]
+        if scores:
+            best, j = max(scores)
+            if best >= threshold:
+                used.add(j)
+                matched += 1
+    return matched / max(len(boxes_a), len(boxes_b))
+
+
+def union_mask(model, crop, device):
+    result = model.predict(
+        source=crop, imgsz=640, conf=0.5, iou=0.6, save=False, verbose=False, device=device, rect=False, retina_masks=True
+    )[0]
+    if result.masks is None or len(result.masks.data) == 0:
+        return np.zeros((1, 1), dtype=bool)
+    return result.masks.data.amax(dim=0).cpu().numpy() > 0
+
+
+def mask_iou(a, b):
+    if a.shape != b.shape:
+        return 0.0
+    union = np.logical_or(a, b).sum()
+    return np.logical_and(a, b).sum() / union if union else 1.0
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--backend", required=True, choices=["onnx", "openvino"])
+    parser.add_argument("--images", required=True, help="샘플 사진 폴더")
+    parser.add_argument("--box-iou", type=float, default=0.9, help="얼굴 박스 최소 IoU")
+    parser.add_argument("--acne-match", type=float, default=0.9, help="여드름 박스 최소 일치 비율")
+    parser.add_argument("--mask-iou", type=float, default=0.9, help="홍조 마스크 최소 IoU")
+    parser.add_argument("--count-tol", type=int, default=1, help="acne_count 허용 차이")
+    parser.add_argument("--area-tol", type=float, default=0.5, help="acne_area / redness_area 허용 차이 (%p)")
+    args = parser.parse_args()
+
+    frames = load_images(args.images)
+    assert frames, f"{args.images} 에 이미지가 없습니다."
+
+    # backend/precision을 명시해서 *_MODEL_BACKEND, *_MODEL_PRECISION 환경변수와 상관없이 비교
+    registries = {
+        "torch": ModelRegistry(backend="torch", precision="fp32"),
+        args.backend: ModelRegistry(backend=args.backend, precision="fp32"),
+    }
+    pipelines = {name: Check_face(registry) for name, registry in registries.items()}
+    reference, candidate = "torch", args.backend
+
+    failures = []
+    for idx, frame in enumerate(frames):
+        # 1) 얼굴 박스
+        primaries = {}
+        for name, pipeline in pipelines.items():
+            xyxy, conf = pipeline.detect_faces([frame], mode="full")[0]
+            selected = select_faces(xyxy, conf, frame.shape, policy="largest")
+            primaries[name] = xyxy[selected[0]] if selected else None
+        ref_box, cand_box = primaries[reference], primaries[candidate]
+        if (ref_box is None) != (cand_box is None) or (ref_box is not None and iou(ref_box, cand_box) < args.box_iou):
+            failures.append(f"[{idx}] 얼굴 박스 불일치: {ref_box} vs {cand_box}")
+            continue
+        if ref_box is None:
+            continue
+
+        # 2) 같은 crop에 대한 홍조 마스크 / 여드름 박스
+        xmin, ymin, xmax, ymax = ref_box
+        crop = frame[ymin:ymax, xmin:xmax]
+        masks = {name: union_mask(r.get("redness"), crop, r.get_device("redness")) for name, r in registries.items()}
+        overlap = mask_iou(masks[reference], masks[candidate])
+        if overlap < args.mask_iou:
+            failures.append(f"[{idx}] 홍조 마스크 IoU {overlap:.3f}")
+
+        processed = pipelines[reference].preprocess_photo.preprocess(crop)
+        acne_boxes = {
+            name: r.get("acne").predict(
+                source=processed, imgsz=640, conf=0.2, iou=0.6, save=False, verbose=False, device=r.get_device("acne")
+            )[0].boxes.xyxy.cpu().numpy()
+            for name, r in registries.items()
+        }
+        ratio = match_ratio(acne_boxes[reference], acne_boxes[candidate], 0.5)
+        if ratio < args.acne_match:
+            failures.append(f"[{idx}] 여드름 박스 일치 비율 {ratio:.2f}")
+
+        # 3) 최종 수치
+        # 얼굴 박스 비교와 같은 full 검출로 실행 (adaptive는 축소본 결과에 따라 None일 수 있음)
+        results = {name: pipeline.check_face(frame.copy(), mode="full") for name, pipeline in pipelines.items()}
+        ref, cand = results[reference], results[candidate]
+        if ref is None or cand is None:
+            failures.append(f"[{idx}] 분석 결과 없음: {reference}={ref is not None}, {candidate}={cand is not None}")
+            continue
+        if abs(ref["acne_count"] - cand["acne_count"]) > args.count_tol:
+            failures.append(f"[{idx}] acne_count {ref['acne_count']} vs {cand['acne_count']}")
+        for key in ("acne_area", "redness_area"):
+            if abs(ref[key] - cand[key]) > args.area_tol:
+                failures.append(f"[{idx}] {key} {ref[key]:.2f} vs {cand[key]:.2f}")
+
+    print(f"\n이미지 {len(frames)}장, {reference} vs {candidate}")
+    for failure in failures:
+        print("❌", failure)
+    if failures:
+        sys.exit(1)
+    print("✅ 허용 오차 내 일치")
+
+
+if __name__ == "__main__":
+    main()
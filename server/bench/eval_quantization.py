@@ -0,0 +1,79 @@
+"""
+INT8 양자화 모델의 지연(mean / p95)과 FP32 대비 acne_count / acne_area / redness_area 변화량 리포트
+
+사용법 (server 디렉터리에서, quantizeModels로 INT8 가중치를 먼저 생성):
+    python -m bench.eval_quantization --crops ./face_crops
+    python -m bench.eval_quantization --crops ./face_crops --reference-backend onnx
+"""
+import time
+import argparse
+import numpy as np
+from allDAO.model.modelRegistry import ModelRegistry
+from allDAO.model.quantizeModels import QUANTIZABLE_MODELS
+from allDAO.image.sampleImages import load_images
+from allDAO.analysis_image.analysis_acne_image import Analysis_acne_image
+from allDAO.analysis_image.analysis_redness_image import Analysis_redness_image
+from allDAO.image.iPPC import Preprocess_img
+
+
+def run_acne(registry, crops):
+    analyzer = Analysis_acne_image(registry)
+    latencies, metrics = [], []
+    for crop in crops:
+        area = crop.shape[0] * crop.shape[1]
+        processed = Preprocess_img.preprocess(crop)
+        start = time.perf_counter()
+        _, acne_count, acne_area = analyzer.analysis_acne_image(crop.copy(), processed, area)
+        latencies.append((time.perf_counter() - start) * 1000)
+        metrics.append({"acne_count": acne_count, "acne_area": acne_area})
+    return latencies, metrics
+
+
+def run_redness(registry, crops):
+    analyzer = Analysis_redness_image(registry)
+    latencies, metrics = [], []
+    for crop in crops:
+        area = crop.shape[0] * crop.shape[1]
+        start = time.perf_counter()
+        _, redness_area = analyzer.analysis_redness_image(crop, area)
+        latencies.append((time.perf_counter() - start) * 1000)
+        metrics.append({"redness_area": float(redness_area)})
+    return latencies, metrics
+
+
+RUNNERS = {"acne": run_acne, "redness": run_redness}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--crops", required=True, help="평가용 얼굴 crop 폴더")
+    parser.add_argument("--models", nargs="+", default=list(QUANTIZABLE_MODELS), choices=list(QUANTIZABLE_MODELS))
+    parser.add_argument("--reference-backend", default="torch", choices=["torch", "onnx", "openvino"])
+    parser.add_argument("--limit", type=int, default=None)
+    args = parser.parse_args()
+
+    crops = load_images(args.crops, args.limit)
+    assert crops, f"{args.crops} 에 이미지가 없습니다."
+
+    for name in args.models:
+        fp32 = ModelRegistry(backend=args.reference_backend, precision="fp32", names=[name])
+        int8 = ModelRegistry(precision="int8", names=[name])
+
+        fp32_latency, fp32_metrics = RUNNERS[name](fp32, crops)
+        int8_latency, int8_metrics = RUNNERS[name](int8, crops)
+
+        print(f"\n[{name}] crop {len(crops)}장")
+        for label, values in (("fp32 " + args.reference_backend, fp32_latency), ("int8 onnx", int8_latency)):
+            print(f"  {label:>14}: mean {np.mean(values):.1f}ms  p95 {np.percentile(values, 95):.1f}ms")
+        print(f"  speedup (mean): {np.mean(fp32_latency) / np.mean(int8_latency):.2f}x")
+
+        for key in fp32_metrics[0]:
+            diffs = np.array([b[key] - a[key] for a, b in zip(fp32_metrics, int8_metrics)], dtype=float)
+            print(
+                f"  {key:>13} drift: mean {diffs.mean():+.3f}  mean|Δ| {np.abs(diffs).mean():.3f}  "
+                f"max|Δ| {np.abs(diffs).max():.3f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
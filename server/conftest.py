@@ -0,0 +1 @@
+# server 디렉터리를 import 경로에 넣어 tests/ 에서 allDAO, bench를 바로 import
@@ -1,5 +1,15 @@
-from allDAO.check_face.check_face import Check_face
+from allDAO.image.photoIngest import PhotoIngest, PendingPhoto, PhotoTooLargeError, PhotoDecodeError, probe_photo
+from allDAO.image.uploadCache import UploadCache
+from allDAO.cache.userReadCache import UserReadCache
+from allDAO.jobs.jobStore import create_job_store, JobQueueFullError
+from allDAO.jobs.uploadJobs import UploadJobs
+from allDAO.storage.imageStorage import create_storage, LocalImageStorage, LOCAL_STORAGE_ROUTE
+from allDAO.inference.inferenceExecutor import InferenceExecutor, InferenceBusyError
 from allDAO.image.imageDAO import ImageDAO
+from allDAO.image.blobSweeper import BlobSweeper
+from allDAO.db.migrate import run_migrations
+from allDAO.db.dbConfig import PSYCOPG2_DB_CONFIG as DB_CONFIG
+from allDAO.db.dbPool import DBPool
 from allDAO.chatbot.chatDAO import ChatDAO
 from allDAO.home.product.productDAO import ProductDAO
 from allDAO.chatbot.chatRequest import  UserKeyRequest, ChatRequest, ResetRequest, initialize_resources
@@ -8,13 +18,18 @@ from allDAO.home.product.productRequest import Product
 from allDAO.login.loginRequest import UserKeyData, UpdateAddress, UpdatePassword
 from allDAO.routine.routine_crud import DeleteRoutineRequest, RoutineRequest
 from fastapi import FastAPI, UploadFile, Request, File, Form, HTTPException
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.staticfiles import StaticFiles
 from openai import AzureOpenAI
-from allDAO.image.iPPC import Preprocess_img
+from contextlib import asynccontextmanager
 from datetime import datetime
+import os
 import uuid
+import json
+import asyncio
 import psycopg2
+import redis.asyncio as aioredis
 import re
 
 
@@ -30,13 +45,6 @@ assert AZURE_CONFIG["azure_endpoint"], "AZURE_OPENAI_ENDPOINT 환경변수를 
 EMBEDDING_MODEL_NAME = os.getenv("EMBEDDING_MODEL_NAME", "biniffy-embedding")
 DEPLOYMENT_NAME = os.getenv("DEPLOYMENT_NAME", "gpt-4o-mini")
 
-DB_CONFIG = {
-    "dbname": os.getenv("DB_NAME", "ai_skinview"),
-    "user": os.getenv("DB_USER", "admin"),
-    "password": os.getenv("DB_PASSWORD"),
-    "host": os.getenv("DB_HOST", "localhost"),
-    "port": int(os.getenv("DB_PORT", "5432")),
-}
 assert DB_CONFIG["password"], "DB_PASSWORD 환경변수를 설정하세요."
 
 REDIS_CONFIG = {
@@ -48,11 +56,41 @@ REDIS_CONFIG = {
 }
 
 client = AzureOpenAI(**AZURE_CONFIG)
-app = FastAPI()
-pDAO = ProductDAO(client, EMBEDDING_MODEL_NAME)
-iDAO = ImageDAO()
-check_face = Check_face()
-process_img = Preprocess_img()
+# asyncpg 공유 풀 - 연결은 lifespan에서 생성
+db_pool = DBPool()
+pDAO = ProductDAO(client, EMBEDDING_MODEL_NAME, db_pool)
+image_storage = create_storage()
+redis_conn = aioredis.Redis(**REDIS_CONFIG, decode_responses=True)
+read_cache = UserReadCache(redis_conn)
+iDAO = ImageDAO(db_pool, image_storage, read_cache=read_cache)
+blob_sweeper = BlobSweeper(image_storage, db_pool, iDAO.blob_columns())
+inference_executor = InferenceExecutor()
+photo_ingest = PhotoIngest()
+upload_cache = UploadCache(redis_conn)
+
+# --- 앱 시작 시 추론 워커를 띄우고 모델을 한 번만 로드/워밍업 ---
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # 스키마(삭제 대기열 등)를 먼저 맞춘 뒤 워커 시작
+    if os.getenv("DB_AUTO_MIGRATE", "1") == "1":
+        await run_migrations(db_pool.db_config)
+    await db_pool.open()
+    await inference_executor.start()
+    upload_jobs.start()
+    blob_sweeper.start()
+    yield
+    await blob_sweeper.stop()
+    await upload_jobs.shutdown()
+    inference_executor.shutdown()
+    await iDAO.close()
+    await db_pool.close()
+    await redis_conn.aclose()
+
+app = FastAPI(lifespan=lifespan)
+
+# 로컬 저장소를 쓰면 분석 이미지를 이 서버가 직접 서빙
+if isinstance(image_storage, LocalImageStorage):
+    app.mount(LOCAL_STORAGE_ROUTE, StaticFiles(directory=image_storage.root), name="images")
 
 # --- FastAPI 앱 및 리소스 변수 초기화 ---
 chat_dao = None
@@ -83,37 +121,197 @@ async def upload_camera(
     photo: UploadFile = File(...),
     user_key: str = Form(...),
     date: str = Form(...),
+    async_job: bool = Form(False),
 ):
-    check_result = await check_face.check_face(photo)
-
-    if check_result is not None:
-        acne_image, redness_image, acne_count, acne_area, redness_area = check_result
-        acne_area = round(acne_area, 2)
-        redness_area = round(redness_area, 2)
-        print(f"[INFO] 여드름 개수: {acne_count}, 비율: {acne_area}")
-        return await iDAO.regImage(acne_image, redness_image, user_key, date, acne_count, acne_area, redness_area)
-    else:
+    try:
+        data, digest = await photo_ingest.read(photo)
+    except PhotoTooLargeError as e:
+        return JSONResponse(status_code=413, content={"result": str(e)})
+
+    # 비동기 모드: 헤더만 검사하고 큐에 넣은 뒤 job_id를 바로 반환
+    if async_job:
+        return await submit_upload_job(data, digest, user_key, date)
+
+    # 같은 사진 재시도는 저장된 분석 결과를 그대로 반환, 동시에 들어온 중복은 처리 중인 작업 하나를 기다림
+    # 클로저가 압축 원본을 붙잡지 않도록 디코딩하면 bytes를 놓는 래퍼로 넘김
+    pending = PendingPhoto(data)
+    del data
+    result = await upload_cache.run_once(
+        user_key, date, digest, lambda: analyze_upload(pending, user_key, date)
+    )
+    return JSONResponse(status_code=result["status_code"], content=result["content"], headers=result.get("headers"))
+
+async def no_report(stage: str, **fields):
+    pass
+
+async def analyze_upload(pending: PendingPhoto, user_key: str, date: str, report=no_report) -> dict:
+    # 워커/대기열이 가득 차면 디코딩 전에 바로 거절
+    if inference_executor.is_busy():
+        return busy_result()
+
+    await report("decoding")
+    try:
+        decode_image = await photo_ingest.decode_pending(pending)
+    except PhotoDecodeError as e:
+        return {"status_code": 400, "content": {"result": str(e)}}
+
+    await report("analyzing")
+    try:
+        check_result = await inference_executor.analyze(decode_image)
+    except InferenceBusyError:
+        # 재시도할 수 있도록 프레임은 남겨 둠
+        return busy_result()
+    # 분석이 끝나면 저장 단계에서는 결과 이미지만 필요
+    pending.release()
+    del decode_image
+
+    if check_result is None:
         print("Error!")
-        return await error_send()
+        return {"status_code": 400, "content": {"result": "얼굴을 찾지 못했습니다. 다시 촬영해주세요."}}
+
+    acne_count = check_result["acne_count"]
+    acne_area = round(check_result["acne_area"], 2)
+    redness_area = round(check_result["redness_area"], 2)
+    print(f"[INFO] 여드름 개수: {acne_count}, 비율: {acne_area}")
+    metrics = {"acne_count": acne_count, "acne_area": acne_area, "redness_area": redness_area}
+
+    await report("saving", **metrics)
+    response = await iDAO.regImage(
+        check_result["acne_image"], check_result["redness_image"], user_key, date,
+        acne_count, acne_area, redness_area, faces=check_result.get("faces"),
+    )
+    content = json.loads(response.body)
+    if response.status_code == 200:
+        content.update(metrics)
+    return {"status_code": response.status_code, "content": content}
+
+def busy_result():
+    return {
+        "status_code": 503,
+        "content": {"result": "분석 요청이 많습니다. 잠시 후 다시 시도해주세요."},
+        "headers": {"Retry-After": str(inference_executor.retry_after)},
+    }
+
+async def submit_upload_job(data, digest: str, user_key: str, date: str):
+    if probe_photo(data) is None:
+        return JSONResponse(status_code=400, content={"result": "사진 형식을 읽을 수 없습니다."})
+    try:
+        state = await upload_jobs.submit({"user_key": user_key, "date": date, "digest": digest}, data)
+    except JobQueueFullError as e:
+        return JSONResponse(status_code=503, content={"result": str(e)}, headers={"Retry-After": str(inference_executor.retry_after)})
+    except Exception as e:
+        print(f"[ERROR] 업로드 작업 등록 실패: {e}")
+        return JSONResponse(status_code=503, content={"result": "업로드 작업을 등록하지 못했습니다."})
+
+    job_id = state["job_id"]
+    return JSONResponse(
+        status_code=202,
+        content={**state, "status_url": f"/jobs/{job_id}", "events_url": f"/jobs/{job_id}/events"},
+    )
+
+async def process_upload_job(meta: dict, photo: PendingPhoto, report):
+    user_key, date, digest = meta["user_key"], meta["date"], meta["digest"]
+    # 작업 워커 수로 동시성이 제한되므로 추론 대기열이 가득 차면 거절하지 않고 기다렸다가 재시도
+    while True:
+        result = await upload_cache.run_once(
+            user_key, date, digest, lambda: analyze_upload(photo, user_key, date, report)
+        )
+        if result["status_code"] != 503:
+            return result
+        await report("queued")
+        await asyncio.sleep(inference_executor.retry_after)
+
+upload_jobs = UploadJobs(create_job_store(REDIS_CONFIG), process_upload_job)
+
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    state = await upload_jobs.get(job_id)
+    if state is None:
+        return JSONResponse(status_code=404, content={"result": "해당 작업 없음"})
+    return state
+
+# 단계가 바뀔 때마다 event: <stage>, 완료/실패 후 스트림 종료
+@app.get("/jobs/{job_id}/events")
+async def job_events(job_id: str):
+    if await upload_jobs.get(job_id) is None:
+        return JSONResponse(status_code=404, content={"result": "해당 작업 없음"})
+
+    async def events():
+        async for state in upload_jobs.watch(job_id):
+            if state is None:
+                yield ": keep-alive\n\n"
+            else:
+                yield f"event: {state['stage']}\ndata: {json.dumps(state, ensure_ascii=False)}\n\n"
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 @app.post("/get.data/")
 async def getData(
     date: str = Form(...),
-    user_key: str = Form(...)
+    user_key: str = Form(...),
+    variant: str = Form("full"),
 ):
-    return await iDAO.select(user_key, date)
+    return await iDAO.select(user_key, date, variant)
+
+# 캘린더/분석 화면용 통합 조회 - If-None-Match가 같으면 304
+@app.get("/dashboard/")
+async def get_dashboard(request: Request, user_key: str, date: str = None):
+    return await iDAO.get_dashboard(user_key, date, request.headers.get("if-none-match"))
 
+# from_date/to_date: 날짜 범위, limit/cursor: 최신순 keyset 페이지 (응답의 next_cursor를 다음 요청 cursor로), format=ndjson: 스트림
 @app.post("/dates/")
-async def get_dates(user_key: str = Form()):
-    return await iDAO.get_dates_by_user(user_key)
+async def get_dates(
+    user_key: str = Form(),
+    from_date: str = Form(None),
+    to_date: str = Form(None),
+    cursor: str = Form(None),
+    limit: int = Form(None),
+    format: str = Form("json"),
+):
+    return await iDAO.get_dates_by_user(user_key, from_date, to_date, cursor, limit, format == "ndjson")
 
 @app.post("/get.acne/")
 async def getAcne(user_key: str = Form(), date: str = Form()):
     return await iDAO.get_acne(user_key, date)
 
 @app.post("/get.dates_acne/")
-async def getAcne(user_key: str = Form()):
-    return await iDAO.get_dates_with_acne_info(user_key)
+async def getAcne(
+    user_key: str = Form(),
+    from_date: str = Form(None),
+    to_date: str = Form(None),
+    cursor: str = Form(None),
+    limit: int = Form(None),
+    format: str = Form("json"),
+):
+    return await iDAO.get_dates_with_acne_info(user_key, from_date, to_date, cursor, limit, format == "ndjson")
+
+# 주/월 단위 추이 (period=week|month, from_date/to_date: 기간 범위)
+@app.post("/trends/")
+async def get_trends(
+    user_key: str = Form(),
+    period: str = Form("week"),
+    from_date: str = Form(None),
+    to_date: str = Form(None),
+):
+    return await iDAO.get_trends(user_key, period, from_date, to_date)
+
+# 모델 로드 시간 / 워밍업 지연 / 워커 RSS / 추론 대기열 / 디코딩 지표 확인용
+@app.get("/models/status/")
+async def get_model_status():
+    return {
+        **inference_executor.get_stats(),
+        "ingest": photo_ingest.get_stats(),
+        "upload_cache": upload_cache.get_stats(),
+        "read_cache": read_cache.get_stats(),
+        "upload_jobs": await upload_jobs.get_stats(),
+        "encoder": iDAO.encoder.get_stats(),
+        "blob_sweeper": blob_sweeper.get_stats(),
+        "db_pool": db_pool.get_stats(),
+    }
 
 ####################################################################################################
 
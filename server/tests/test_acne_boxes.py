@@ -0,0 +1,65 @@
+import numpy as np
+import cv2
+import pytest
+from allDAO.analysis_image.analysis_acne_image import box_area_sum, box_union_area, draw_boxes
+
+
+def random_boxes(rng, count, h, w):
+    # 일부는 crop 밖으로 벗어나고 서로 겹치는 float 박스 (YOLO xyxy와 같은 형식)
+    x1 = rng.uniform(-10, w, count)
+    y1 = rng.uniform(-10, h, count)
+    x2 = x1 + rng.uniform(1, w / 3, count)
+    y2 = y1 + rng.uniform(1, h / 3, count)
+    return np.stack([x1, y1, x2, y2], axis=1).astype(np.float32)
+
+
+def rectangles(image, xyxy, box_color, thickness):
+    # 기존 구현: 박스마다 int 변환 후 cv2.rectangle
+    for box in xyxy:
+        x1, y1, x2, y2 = map(int, box)
+        cv2.rectangle(image, (x1, y1), (x2, y2), box_color, thickness)
+    return image
+
+
+def union_reference(xyxy, shape):
+    mask = np.zeros(shape[:2], dtype=bool)
+    for x1, y1, x2, y2 in np.rint(xyxy).astype(int):
+        mask[max(y1, 0):max(y2, 0), max(x1, 0):max(x2, 0)] = True
+    return int(mask.sum())
+
+
+@pytest.mark.parametrize("seed", range(5))
+@pytest.mark.parametrize("thickness", [1, 2, 5])
+def test_draw_boxes_matches_rectangles(seed, thickness):
+    rng = np.random.default_rng(seed)
+    xyxy = random_boxes(rng, 12, 240, 180)
+    base = rng.integers(0, 256, size=(240, 180, 3), dtype=np.uint8)
+    expected = rectangles(base.copy(), xyxy, (0, 255, 0), thickness)
+    assert np.array_equal(draw_boxes(base.copy(), xyxy, (0, 255, 0), thickness), expected)
+
+
+def test_draw_boxes_without_boxes_returns_image_unchanged():
+    image = np.zeros((10, 10, 3), dtype=np.uint8)
+    assert draw_boxes(image, np.zeros((0, 4), dtype=np.float32)) is image
+    assert not image.any()
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_box_union_area_is_exact(seed):
+    rng = np.random.default_rng(seed)
+    shape = (200, 150, 3)
+    xyxy = random_boxes(rng, 25, *shape[:2])
+    assert box_union_area(xyxy, shape) == union_reference(xyxy, shape)
+
+
+def test_box_union_area_counts_overlap_once():
+    xyxy = np.array([[0, 0, 10, 10], [5, 5, 15, 15], [0, 0, 10, 10]], dtype=np.float32)
+    assert box_union_area(xyxy, (20, 20)) == 100 + 100 - 25
+    assert box_union_area(np.zeros((0, 4)), (20, 20)) == 0
+
+
+def test_box_area_sum_matches_per_box_loop():
+    xyxy = random_boxes(np.random.default_rng(0), 30, 300, 300)
+    expected = sum((x2 - x1) * (y2 - y1) for x1, y1, x2, y2 in xyxy.tolist())
+    assert box_area_sum(xyxy) == pytest.approx(expected, rel=1e-5)
+    assert box_area_sum(np.zeros((0, 4))) == 0.0
@@ -0,0 +1,308 @@
+"""
+ImageDAO.regImage 를 실제 PostgreSQL 에서 확인 (임시 스키마에 최소 테이블 + 마이그레이션 적용 후 삭제)
+
+RUN_DB_TESTS=1 과 DB_NAME / DB_USER / DB_PASSWORD / DB_HOST / DB_PORT 를 설정하면 실행, 아니면 건너뜀
+    RUN_DB_TESTS=1 DB_NAME=postgres DB_USER=postgres python -m pytest tests/test_image_dao_db.py
+"""
+import os
+import uuid
+import time
+import shutil
+import asyncio
+import numpy as np
+import pytest
+
+if os.getenv("RUN_DB_TESTS") != "1":
+    pytest.skip("RUN_DB_TESTS=1 일 때만 실행", allow_module_level=True)
+
+asyncpg = pytest.importorskip("asyncpg")
+pytest.importorskip("fastapi")
+
+from allDAO.db.dbConfig import DB_CONFIG
+from allDAO.db.dbPool import DBPool
+from allDAO.db.migrate import MIGRATIONS_DIR, migrate
+from allDAO.image.blobSweeper import BlobSweeper
+from allDAO.image.imageDAO import ImageDAO
+from allDAO.storage.imageStorage import LocalImageStorage
+
+# 저장소에 없는 기존 테이블은 조회에 쓰는 컬럼만 최소로 생성
+BASE_SCHEMA = """
+    CREATE EXTENSION IF NOT EXISTS vector SCHEMA public;
+    CREATE TABLE analysis_photo_tbl (
+        analysis_photo_id SERIAL PRIMARY KEY,
+        analysis_photo_user_key TEXT NOT NULL,
+        analysis_photo_date DATE NOT NULL,
+        analysis_photo_acne_url TEXT,
+        analysis_photo_redness_url TEXT,
+        analysis_photo_acne_count INTEGER,
+        analysis_photo_acne_area NUMERIC,
+        analysis_photo_redness_area NUMERIC
+    );
+    CREATE TABLE survey_tbl (
+        survey_id SERIAL PRIMARY KEY,
+        survey_user_key TEXT NOT NULL,
+        survey_skin_do REAL, survey_skin_sr REAL, survey_skin_pn REAL, survey_skin_wt REAL,
+        survey_skin_type TEXT,
+        survey_skin_combination_type BOOLEAN
+    );
+    CREATE TABLE user_tbl (
+        user_key TEXT PRIMARY KEY, user_id TEXT, user_email TEXT, user_phone_number TEXT, user_password TEXT
+    );
+    CREATE TABLE products_tbl (
+        product_id SERIAL PRIMARY KEY, product_name TEXT, product_type TEXT, product_image TEXT,
+        product_embedding public.vector(3)
+    );
+    CREATE TABLE preset_tbl (
+        preset_id SERIAL PRIMARY KEY, preset_user_key TEXT, preset_product_name TEXT, preset_date DATE
+    );
+"""
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+@pytest.fixture
+def base_config():
+    """
+    기존 테이블만 있는 임시 스키마 (마이그레이션 적용 전)
+    """
+    schema = f"test_{uuid.uuid4().hex[:12]}"
+    config = {**DB_CONFIG, "server_settings": {"search_path": f"{schema}, public"}}
+
+    async def setup():
+        conn = await asyncpg.connect(**config)
+        try:
+            await conn.execute(f"CREATE SCHEMA {schema}")
+            await conn.execute(BASE_SCHEMA)
+        finally:
+            await conn.close()
+
+    async def teardown():
+        conn = await asyncpg.connect(**DB_CONFIG)
+        try:
+            await conn.execute(f"DROP SCHEMA {schema} CASCADE")
+        finally:
+            await conn.close()
+
+    try:
+        run(setup())
+    except OSError as e:
+        pytest.skip(f"테스트 DB에 연결할 수 없음: {e}")
+    except asyncpg.PostgresError as e:
+        run(teardown())
+        pytest.skip(f"테스트 스키마를 준비할 수 없음: {e}")
+    yield config
+    run(teardown())
+
+
+async def execute(config, sql, *args):
+    conn = await asyncpg.connect(**config)
+    try:
+        return await conn.execute(sql, *args)
+    finally:
+        await conn.close()
+
+
+async def apply_migrations(config, directory=MIGRATIONS_DIR):
+    conn = await asyncpg.connect(**config)
+    try:
+        return await migrate(conn, directory)
+    finally:
+        await conn.close()
+
+
+@pytest.fixture
+def db_config(base_config):
+    run(apply_migrations(base_config))
+    return base_config
+
+
+def make_dao_factory(config, tmp_path):
+    """
+    async with dao_factory() as (dao, db): ... - 테스트마다 풀을 열고 닫음
+    """
+    class Context:
+        async def __aenter__(self):
+            self.db = DBPool(config, min_size=1, max_size=2)
+            await self.db.open()
+            self.dao = ImageDAO(self.db, LocalImageStorage(str(tmp_path), "http://test/images"))
+            return self.dao, self.db
+
+        async def __aexit__(self, *exc):
+            await self.dao.close()
+            await self.db.close()
+
+    return Context
+
+
+@pytest.fixture
+def dao_factory(db_config, tmp_path):
+    return make_dao_factory(db_config, tmp_path)
+
+
+def photo(seed: int):
+    return np.random.default_rng(seed).integers(0, 256, size=(64, 48, 3), dtype=np.uint8)
+
+
+async def upload(dao, user_key, date, acne_count, acne_area, redness_area, seed=0):
+    response = await dao.regImage(photo(seed), photo(seed + 1), user_key, date, acne_count, acne_area, redness_area)
+    assert response.status_code == 200, response.body
+    return response.body.decode()
+
+
+async def fetch_row(db, sql, *args):
+    conn = await db.acquire()
+    try:
+        return await conn.fetchrow(sql, *args)
+    finally:
+        await db.release(conn)
+
+
+def test_reupload_same_day_takes_update_path(dao_factory):
+    async def scenario():
+        async with dao_factory() as (dao, db):
+            first = await upload(dao, "u1", "2025-03-04", 3, 1.5, 2.0)
+            assert "추가 성공" in first
+            before = await fetch_row(db, "SELECT * FROM analysis_photo_tbl WHERE analysis_photo_user_key = 'u1'")
+
+            second = await upload(dao, "u1", "2025-03-04", 5, 2.5, 4.0, seed=10)
+            assert "업데이트 성공" in second
+            after = await fetch_row(db, "SELECT * FROM analysis_photo_tbl WHERE analysis_photo_user_key = 'u1'")
+            assert after["analysis_photo_acne_url"] != before["analysis_photo_acne_url"]
+            assert after["analysis_photo_acne_count"] == 5
+
+            # 업서트가 돌려준 이전 URL로 이전 이미지가 삭제 대기열에 올라감
+            conn = await db.acquire()
+            try:
+                queued = {row["blob_delete_name"] for row in await conn.fetch("SELECT blob_delete_name FROM blob_delete_tbl")}
+            finally:
+                await db.release(conn)
+            for container, column in dao.blob_columns().items():
+                old_names = {name for _, name in dao._variant_blobs(container, before[column])}
+                assert old_names <= queued
+
+    run(scenario())
+
+
+def test_unique_key_migration_refuses_duplicates_until_deduped(base_config, tmp_path):
+    migrations = tmp_path / "migrations"
+    migrations.mkdir()
+    for name in sorted(os.listdir(MIGRATIONS_DIR)):
+        if name.startswith("0001_"):
+            shutil.copy(os.path.join(MIGRATIONS_DIR, name), migrations)
+    run(apply_migrations(base_config, str(migrations)))
+
+    # 유니크 키 이전 경쟁으로 생긴 같은 날 중복 행 - 기본 키가 가장 큰 행만 남아야 함
+    storage = LocalImageStorage(str(tmp_path), "http://test/images")
+    urls = [
+        (photo_id, user_key, storage.url("acneimage", f"{stem}.jpg"), storage.url("rednessimage", f"{stem}.jpg"))
+        for photo_id, user_key, stem in [(1, "u1", "old-1"), (3, "u1", "new"), (2, "u1", "old-2"), (4, "u2", "u2")]
+    ]
+    run(execute(base_config, """
+        INSERT INTO analysis_photo_tbl
+            (analysis_photo_id, analysis_photo_user_key, analysis_photo_date, analysis_photo_acne_url, analysis_photo_redness_url)
+        SELECT id, user_key, '2025-03-04', acne_url, redness_url
+        FROM unnest($1::int[], $2::text[], $3::text[], $4::text[]) AS t(id, user_key, acne_url, redness_url)
+    """, *map(list, zip(*urls))))
+    run(execute(base_config, "INSERT INTO survey_tbl (survey_id, survey_user_key, survey_skin_type) VALUES (1, 'u1', 'old'), (2, 'u1', 'new')"))
+
+    for name in sorted(os.listdir(MIGRATIONS_DIR)):
+        if name.startswith("0002_"):
+            shutil.copy(os.path.join(MIGRATIONS_DIR, name), migrations)
+    with pytest.raises(asyncpg.RaiseError, match="중복 행"):
+        run(apply_migrations(base_config, str(migrations)))
+
+    async def scenario():
+        async with make_dao_factory(base_config, tmp_path)() as (dao, db):
+            sweeper = BlobSweeper(dao.storage, db, dao.blob_columns())
+            assert await sweeper.dedupe(dry_run=True) == 2
+            assert (await fetch_row(db, "SELECT count(*) AS n FROM analysis_photo_tbl"))["n"] == 4
+
+            assert await sweeper.dedupe() == 2
+            rows = await fetch_row(db, "SELECT array_agg(analysis_photo_id ORDER BY analysis_photo_id) AS ids FROM analysis_photo_tbl")
+            assert rows["ids"] == [3, 4]
+            survey = await fetch_row(db, "SELECT array_agg(survey_skin_type) AS types FROM survey_tbl")
+            assert survey["types"] == ["new"]
+
+            conn = await db.acquire()
+            try:
+                queued = {row["blob_delete_name"] for row in await conn.fetch("SELECT blob_delete_name FROM blob_delete_tbl")}
+            finally:
+                await db.release(conn)
+            expected = set()
+            for container in dao.blob_columns():
+                for stem in ("old-1", "old-2"):
+                    expected |= {name for _, name in dao._variant_blobs(container, dao.storage.url(container, f"{stem}.jpg"))}
+            assert queued == expected
+
+    run(scenario())
+    assert 2 in run(apply_migrations(base_config, str(migrations)))
+
+
+def test_reupload_same_day_rebuilds_trends_from_latest_row(dao_factory):
+    async def scenario():
+        async with dao_factory() as (dao, db):
+            await upload(dao, "u1", "2025-03-04", 3, 1.5, 2.0)
+            await upload(dao, "u1", "2025-03-04", 5, 2.5, 4.0, seed=10)
+            await upload(dao, "u1", "2025-03-04", 7, 0.5, 1.0, seed=20)
+
+            conn = await db.acquire()
+            try:
+                trends = await conn.fetch("""
+                    SELECT * FROM skin_trend_tbl WHERE skin_trend_user_key = 'u1' ORDER BY skin_trend_period
+                """)
+            finally:
+                await db.release(conn)
+
+            # 같은 날 재업로드는 더해지지 않고 마지막 행 하나로 다시 계산
+            assert [row["skin_trend_period"] for row in trends] == ["month", "week"]
+            for row in trends:
+                assert row["skin_trend_days"] == 1
+                assert row["skin_trend_acne_count_sum"] == 7
+                assert float(row["skin_trend_acne_area_sum"]) == pytest.approx(0.5)
+                assert float(row["skin_trend_redness_area_sum"]) == pytest.approx(1.0)
+                assert row["skin_trend_acne_count_min"] == row["skin_trend_acne_count_max"] == 7
+
+            # 다른 날짜는 기존 집계에 더해짐
+            await upload(dao, "u1", "2025-03-05", 1, 1.0, 1.0, seed=30)
+            week = await fetch_row(db, """
+                SELECT * FROM skin_trend_tbl WHERE skin_trend_user_key = 'u1' AND skin_trend_period = 'week'
+            """)
+            assert week["skin_trend_days"] == 2
+            assert week["skin_trend_acne_count_sum"] == 8
+
+    run(scenario())
+
+
+def test_running_sweeper_reconciles_orphans_periodically(dao_factory, tmp_path):
+    async def scenario():
+        async with dao_factory() as (dao, db):
+            await upload(dao, "u1", "2025-03-04", 3, 1.5, 2.0)
+            kept = await fetch_row(db, "SELECT analysis_photo_acne_url FROM analysis_photo_tbl")
+            container = dao.acne_container_name
+
+            # DB 기록 없이 남은 오래된 이미지 (업로드 도중 서버가 죽은 경우)
+            await dao.storage.put(container, "orphan.jpg", b"orphan", "image/jpeg")
+            old = time.time() - 2 * 3600
+            orphan_path = tmp_path / container / "orphan.jpg"
+            for path in (tmp_path / container).iterdir():
+                os.utime(path, (old, old))
+
+            sweeper = BlobSweeper(dao.storage, db, dao.blob_columns())
+            sweeper.start(interval=0.02, reconcile_interval=0.05)
+            try:
+                for _ in range(200):
+                    if sweeper.get_stats()["reconciles"] and not orphan_path.exists():
+                        break
+                    await asyncio.sleep(0.02)
+            finally:
+                await sweeper.stop()
+
+            stats = sweeper.get_stats()
+            assert stats["reconciles"] >= 1 and stats["last_error"] is None
+            assert not orphan_path.exists()
+            # 참조 중인 이미지는 그대로
+            assert dao.storage.name_from_url(container, kept["analysis_photo_acne_url"]) in os.listdir(tmp_path / container)
+
+    run(scenario())
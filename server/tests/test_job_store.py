@@ -0,0 +1,109 @@
+"""
+RedisJobStore 큐/임대 동작을 fakeredis(Lua 포함)로 확인 - 설치되어 있지 않으면 건너뜀
+    pip install "fakeredis[lua]"
+"""
+import asyncio
+import pytest
+
+fakeredis = pytest.importorskip("fakeredis")
+pytest.importorskip("lupa")
+
+from allDAO.jobs.jobStore import (
+    RedisJobStore, JobQueueFullError, REDIS_QUEUE_KEY, REDIS_PROCESSING_KEY, REDIS_LEASES_KEY,
+)
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def state(job_id):
+    return {"job_id": job_id, "stage": "queued"}
+
+
+def test_concurrent_enqueue_never_exceeds_queue_size():
+    async def scenario():
+        store = RedisJobStore(fakeredis.FakeAsyncRedis(), queue_size=3)
+        results = await asyncio.gather(
+            *(store.enqueue(f"j{i}", {}, b"photo", state(f"j{i}")) for i in range(10)),
+            return_exceptions=True,
+        )
+        assert sum(r is None for r in results) == 3
+        assert all(isinstance(r, JobQueueFullError) for r in results if r is not None)
+        assert await store.depth() == 3
+
+    run(scenario())
+
+
+def test_crashed_worker_job_is_requeued_then_finished():
+    async def scenario():
+        redis = fakeredis.FakeAsyncRedis()
+        crashed = RedisJobStore(redis, lease=0)
+        await crashed.enqueue("j1", {"user_key": "u1"}, b"photo", state("j1"))
+
+        job_id, meta, data = await crashed.dequeue(1)
+        assert (job_id, meta, data) == ("j1", {"user_key": "u1"}, b"photo")
+        await crashed.put_state("j1", {"job_id": "j1", "stage": "analyzing"})
+        # 여기서 워커가 죽음 → 사진과 처리 목록 항목이 남아 있어야 함
+        assert await redis.llen(REDIS_PROCESSING_KEY) == 1
+        assert await redis.exists("job:j1:photo")
+
+        other = RedisJobStore(redis, lease=60)
+        await asyncio.sleep(0.01)
+        assert await other.reap() == 1
+        assert (await other.get_state("j1"))["stage"] == "queued"
+        assert await redis.llen(REDIS_PROCESSING_KEY) == 0
+
+        job_id, meta, data = await other.dequeue(1)
+        assert (job_id, data) == ("j1", b"photo")
+        # 임대가 남아 있으면 되살리지 않음
+        assert await other.reap() == 0
+
+        await other.finish("j1")
+        assert await redis.llen(REDIS_PROCESSING_KEY) == 0
+        assert await redis.zcard(REDIS_LEASES_KEY) == 0
+        assert not await redis.exists("job:j1:photo")
+        assert await redis.llen(REDIS_QUEUE_KEY) == 0
+
+    run(scenario())
+
+
+def test_job_that_keeps_crashing_is_marked_failed():
+    async def scenario():
+        redis = fakeredis.FakeAsyncRedis()
+        store = RedisJobStore(redis, lease=0, max_attempts=2)
+        await store.enqueue("j1", {}, b"photo", state("j1"))
+
+        await store.dequeue(1)
+        await asyncio.sleep(0.01)
+        assert await store.reap() == 1
+        assert (await store.get_state("j1"))["stage"] == "queued"
+
+        await store.dequeue(1)
+        await asyncio.sleep(0.01)
+        assert await store.reap() == 1
+        final = await store.get_state("j1")
+        assert final["stage"] == "failed" and final["status_code"] == 500
+        assert await redis.llen(REDIS_PROCESSING_KEY) == 0
+        assert await redis.llen(REDIS_QUEUE_KEY) == 0
+        assert not await redis.exists("job:j1:photo")
+
+    run(scenario())
+
+
+def test_finished_job_left_in_processing_is_cleaned_not_rerun():
+    async def scenario():
+        redis = fakeredis.FakeAsyncRedis()
+        store = RedisJobStore(redis, lease=0)
+        await store.enqueue("j1", {}, b"photo", state("j1"))
+        await store.dequeue(1)
+        # 결과는 저장했지만 finish() 전에 죽음
+        await store.put_state("j1", {"job_id": "j1", "stage": "done"})
+
+        await asyncio.sleep(0.01)
+        assert await RedisJobStore(redis).reap() == 0
+        assert (await store.get_state("j1"))["stage"] == "done"
+        assert await redis.llen(REDIS_PROCESSING_KEY) == 0
+        assert await redis.llen(REDIS_QUEUE_KEY) == 0
+
+    run(scenario())
@@ -0,0 +1,29 @@
+import asyncio
+import numpy as np
+import cv2
+from allDAO.image.photoIngest import PhotoIngest, PendingPhoto
+
+
+def jpeg(width=320, height=240):
+    frame = np.random.default_rng(0).integers(0, 256, size=(height, width, 3), dtype=np.uint8)
+    ok, encoded = cv2.imencode(".jpg", frame)
+    assert ok
+    return bytearray(encoded.tobytes())
+
+
+def test_decode_pending_drops_compressed_bytes_and_reuses_frame():
+    ingest = PhotoIngest()
+    pending = PendingPhoto(jpeg())
+    # run_once 클로저처럼 래퍼만 참조
+    job = lambda: ingest.decode_pending(pending)
+
+    frame = asyncio.run(job())
+    assert frame.shape == (240, 320, 3)
+    assert pending.data is None
+
+    # 503 후 재시도는 다시 디코딩하지 않음
+    assert asyncio.run(job()) is frame
+    assert ingest.photos == 1
+
+    pending.release()
+    assert pending.frame is None
@@ -0,0 +1,52 @@
+import numpy as np
+import cv2
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+from allDAO.image.iPPC import Preprocess_img
+from bench.bench_preprocess import reference_preprocess, synthetic_crops
+
+
+def solid(h, w, bgr):
+    return np.full((h, w, 3), bgr, dtype=np.uint8)
+
+
+@pytest.mark.parametrize("crop", synthetic_crops(6, 160) + [
+    solid(64, 48, (0, 0, 0)),
+    solid(64, 48, (255, 255, 255)),
+    solid(33, 71, (0, 0, 255)),
+    solid(17, 9, (255, 0, 0)),
+    np.random.default_rng(1).integers(0, 256, size=(101, 67, 3), dtype=np.uint8),
+])
+def test_preprocess_matches_reference(crop):
+    assert np.array_equal(Preprocess_img.preprocess(crop), reference_preprocess(crop))
+
+
+def test_preprocess_reuses_buffers_across_sizes():
+    # 버퍼가 커졌다 작은 crop에 재사용돼도 이전 값이 섞이지 않아야 함
+    crops = synthetic_crops(3, 200)
+    crops.sort(key=lambda crop: -crop.size)
+    for crop in crops + crops[::-1]:
+        assert np.array_equal(Preprocess_img.preprocess(crop), reference_preprocess(crop))
+
+
+def test_preprocess_does_not_modify_input():
+    crop = synthetic_crops(1, 120)[0]
+    before = crop.copy()
+    Preprocess_img.preprocess(crop)
+    assert np.array_equal(crop, before)
+
+
+def test_preprocess_thread_local_buffers():
+    crops = synthetic_crops(8, 120)
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        results = list(pool.map(Preprocess_img.preprocess, crops))
+    for crop, result in zip(crops, results):
+        assert np.array_equal(result, reference_preprocess(crop))
+
+
+def test_preprocess_returns_bgr_of_same_shape():
+    crop = synthetic_crops(1, 90)[0]
+    result = Preprocess_img.preprocess(crop)
+    assert result.shape == crop.shape and result.dtype == np.uint8
+    # 반환값은 스레드 버퍼가 아닌 새 배열
+    assert not np.shares_memory(result, Preprocess_img.preprocess(cv2.flip(crop, 1)))
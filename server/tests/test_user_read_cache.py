@@ -0,0 +1,59 @@
+import asyncio
+import allDAO.cache.userReadCache as userReadCache
+from allDAO.cache.userReadCache import UserReadCache
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def loader(value):
+    calls = []
+
+    async def load():
+        calls.append(value)
+        return value
+    return load, calls
+
+
+def test_invalidate_drops_only_that_users_fields():
+    async def scenario():
+        cache = UserReadCache()
+        for user_key in ("u1", "u2"):
+            for field in ("dates", "history"):
+                await cache.get_or_load(user_key, field, loader(f"{user_key}:{field}")[0])
+
+        await cache.invalidate("u1")
+
+        load, calls = loader("new")
+        assert await cache.get_or_load("u1", "dates", load) == "new"
+        assert await cache.get_or_load("u1", "history", load) == "new"
+        assert calls == ["new", "new"]
+
+        load, calls = loader("unused")
+        assert await cache.get_or_load("u2", "dates", load) == "u2:dates"
+        assert await cache.get_or_load("u2", "history", load) == "u2:history"
+        assert calls == []
+
+    run(scenario())
+
+
+def test_each_field_expires_on_its_own(monkeypatch):
+    async def scenario():
+        cache = UserReadCache()
+        now = [1000.0]
+        monkeypatch.setattr(userReadCache.time, "monotonic", lambda: now[0])
+        monkeypatch.setattr(cache.l1, "ttl", 3600)
+
+        await cache.get_or_load("u1", "dates", loader("old")[0])
+        now[0] += userReadCache.READ_CACHE_L1_TTL - 1
+        # 같은 사용자의 다른 필드를 저장해도 먼저 넣은 필드의 만료 시각은 그대로
+        await cache.get_or_load("u1", "history", loader("h")[0])
+        now[0] += 2
+
+        load, calls = loader("fresh")
+        assert await cache.get_or_load("u1", "dates", load) == "fresh"
+        assert calls == ["fresh"]
+        assert await cache.get_or_load("u1", "history", loader("unused")[0]) == "h"
+
+    run(scenario())